@@ -2,6 +2,7 @@ import asyncio
 import logging
 import socket
 from contextlib import asynccontextmanager
+from functools import partial
 from typing import Optional
 
 import tenacity
@@ -15,11 +16,19 @@ from genai_session.utils.context import GenAIContext
 from genai_session.utils.exceptions import RouterInaccessibleException
 from src.core.settings import get_settings
 from src.middleware.pagination import PaginationMiddleware
+from src.middleware.query_stats import QueryStatsMiddleware
 from src.routes.api import api_router
 from src.routes.files.routes import files_router
 from src.routes.websocket import ws_router
-from src.utils.jobs import run_startup_jobs
-from src.utils.message_handler_validator import message_handler_validator
+from src.utils.job_runner import job_runner
+from src.utils.jobs import register_backend_jobs, run_startup_jobs
+from src.utils.log_ingestion import log_ingestion_buffer
+from src.utils.message_handler_validator import (
+    message_handler_validator,
+    router_event_dispatcher,
+)
+from src.utils.query_stats import query_stats
+from src.utils.responses import FastJSONResponse
 from src.utils.setup_logger import init_logging
 
 init_logging()
@@ -47,6 +56,9 @@ async def lifespan(app: FastAPI):
     try:
         # set all agents as inactive on startup
         await run_startup_jobs()
+        log_ingestion_buffer.start()
+        register_backend_jobs(job_runner)
+        await job_runner.start()
 
         app.state.genai_session = session
         app.state.frontend_ws = None
@@ -65,19 +77,26 @@ async def lifespan(app: FastAPI):
             agent_input_schema: Optional[dict] = None,
             agent_jwt: Optional[str] = None,
         ):
-            await message_handler_validator(
-                session=session,
-                log_message=log_message,
-                log_level=log_level,
-                session_id=session_id,
-                request_id=request_id,
-                agent_name=agent_name,
-                agent_description=agent_description,
-                agent_input_schema=agent_input_schema or {},
-                agent_uuid=agent_uuid,
-                message_type=message_type,
-                state=app.state,
-                jwt_token=agent_jwt,
+            router_event_dispatcher.submit(
+                key=agent_uuid,
+                handler=query_stats.tracked(
+                    f"WS router event {message_type}",
+                    partial(
+                        message_handler_validator,
+                        session=session,
+                        log_message=log_message,
+                        log_level=log_level,
+                        session_id=session_id,
+                        request_id=request_id,
+                        agent_name=agent_name,
+                        agent_description=agent_description,
+                        agent_input_schema=agent_input_schema or {},
+                        agent_uuid=agent_uuid,
+                        message_type=message_type,
+                        state=app.state,
+                        jwt_token=agent_jwt,
+                    ),
+                ),
             )
 
         logger.info("GenAI Session started")
@@ -109,13 +128,18 @@ async def lifespan(app: FastAPI):
         yield
 
         events_task.cancel()
+        await router_event_dispatcher.join()
+        await job_runner.stop()
+        await log_ingestion_buffer.stop()
         await events_task
 
     except (asyncio.CancelledError, websockets.exceptions.ConnectionClosedError):
         pass
 
 
-app = FastAPI(title="GenAI Backend", lifespan=lifespan)
+app = FastAPI(
+    title="GenAI Backend", lifespan=lifespan, default_response_class=FastJSONResponse
+)
 app.include_router(api_router)
 app.include_router(ws_router)
 app.include_router(files_router)  # files router should not have the /api/ prefix
@@ -127,8 +151,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Next-Cursor",
+        "X-Previous-Cursor",
+        "X-Total-Count",
+        "X-DB-Query-Count",
+        "X-DB-Time-Ms",
+        "X-DB-N-Plus-One-Suspects",
+    ],
 )
 app.add_middleware(PaginationMiddleware)
+if query_stats.enabled:
+    app.add_middleware(QueryStatsMiddleware)
 
 
 @app.route("/")
@@ -0,0 +1,42 @@
+"""Keyset pagination keys
+
+Revision ID: 3c7a9e1d52b8
+Revises: ffed3f285cb7
+Create Date: 2025-07-16 09:41:27.530118
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c7a9e1d52b8"
+down_revision: Union[str, None] = "ffed3f285cb7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "files",
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+    )
+    op.create_index(
+        "ix_chatmessages_conversation_id_created_at_id",
+        "chatmessages",
+        ["conversation_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_chatmessages_conversation_id_created_at_id", table_name="chatmessages"
+    )
+    op.drop_column("files", "created_at")
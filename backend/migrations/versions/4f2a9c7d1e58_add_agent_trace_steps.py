@@ -0,0 +1,63 @@
+"""Add agent trace steps
+
+Revision ID: 4f2a9c7d1e58
+Revises: b8d3f6a2c417
+Create Date: 2025-07-28 10:41:17.592046
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4f2a9c7d1e58"
+down_revision: Union[str, None] = "b8d3f6a2c417"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "agenttracesteps",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("request_id", sa.UUID(), nullable=False),
+        sa.Column("session_id", sa.UUID(), nullable=False),
+        sa.Column("step_id", sa.String(), nullable=False),
+        sa.Column("step", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("args_digest", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("is_success", sa.Boolean(), nullable=True),
+        sa.Column("latency", sa.Float(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("creator_id", sa.UUID(), nullable=True),
+        sa.ForeignKeyConstraint(["creator_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "request_id", "step_id", name="uq_agenttracesteps_request_id_step_id"
+        ),
+    )
+    op.create_index(
+        op.f("ix_agenttracesteps_creator_id"),
+        "agenttracesteps",
+        ["creator_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_agenttracesteps_id"), "agenttracesteps", ["id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_agenttracesteps_id"), table_name="agenttracesteps")
+    op.drop_index(op.f("ix_agenttracesteps_creator_id"), table_name="agenttracesteps")
+    op.drop_table("agenttracesteps")
@@ -0,0 +1,32 @@
+"""Add file upload claims
+
+Revision ID: 4f7b2d9e6a15
+Revises: c5a83f0e1b47
+Create Date: 2025-08-01 10:17:52.336084
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4f7b2d9e6a15"
+down_revision: Union[str, None] = "c5a83f0e1b47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("fileuploads", sa.Column("claim_id", sa.UUID(), nullable=True))
+    op.add_column(
+        "fileuploads", sa.Column("claimed_until", sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("fileuploads", "claimed_until")
+    op.drop_column("fileuploads", "claim_id")
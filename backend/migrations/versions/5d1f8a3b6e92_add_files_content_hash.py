@@ -0,0 +1,34 @@
+"""Add files content hash
+
+Revision ID: 5d1f8a3b6e92
+Revises: 9b2e4d71c0a6
+Create Date: 2025-07-21 14:22:08.113675
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d1f8a3b6e92"
+down_revision: Union[str, None] = "9b2e4d71c0a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("files", sa.Column("content_hash", sa.String(), nullable=True))
+    op.add_column("files", sa.Column("size", sa.BigInteger(), nullable=True))
+    op.create_index(
+        op.f("ix_files_content_hash"), "files", ["content_hash"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_files_content_hash"), table_name="files")
+    op.drop_column("files", "size")
+    op.drop_column("files", "content_hash")
@@ -0,0 +1,117 @@
+"""Add resource versions
+
+Revision ID: 6d1e8b3f9a27
+Revises: 4f2a9c7d1e58
+Create Date: 2025-07-29 09:12:44.318205
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6d1e8b3f9a27"
+down_revision: Union[str, None] = "4f2a9c7d1e58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> versioned resource, names match src.utils.enums.CatalogResource
+VERSIONED_TABLES = {
+    "agents": "agents",
+    "agentworkflows": "agentflows",
+    "modelproviders": "llms",
+    "modelconfigs": "llms",
+    "mcpservers": "mcp",
+    "a2acards": "a2a",
+}
+
+BUMP_VERSION_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_user_resource_version(owner uuid, resource_name text)
+RETURNS void AS $$
+BEGIN
+    IF owner IS NULL THEN
+        RETURN;
+    END IF;
+    INSERT INTO resourceversions (user_id, resource, version)
+    VALUES (owner, resource_name, 1)
+    ON CONFLICT (user_id, resource)
+    DO UPDATE SET version = resourceversions.version + 1;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# TG_ARGV[0] is the resource of the table
+BUMP_VERSION_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_resource_version() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM bump_user_resource_version(OLD.creator_id, TG_ARGV[0]);
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'UPDATE' THEN
+        IF OLD.creator_id IS DISTINCT FROM NEW.creator_id THEN
+            PERFORM bump_user_resource_version(OLD.creator_id, TG_ARGV[0]);
+        END IF;
+    END IF;
+    PERFORM bump_user_resource_version(NEW.creator_id, TG_ARGV[0]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# tools have no owner of their own, they belong to the creator of the server
+BUMP_MCP_TOOLS_VERSION_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_mcp_tools_resource_version() RETURNS trigger AS $$
+DECLARE
+    server_id uuid;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        server_id := OLD.mcp_server_id;
+    ELSE
+        server_id := NEW.mcp_server_id;
+    END IF;
+    PERFORM bump_user_resource_version(
+        (SELECT creator_id FROM mcpservers WHERE id = server_id), 'mcp'
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "resourceversions",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("resource", sa.String(), nullable=False),
+        sa.Column("version", sa.BigInteger(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "resource"),
+    )
+    op.execute(BUMP_VERSION_FUNCTION)
+    op.execute(BUMP_VERSION_TRIGGER_FUNCTION)
+    op.execute(BUMP_MCP_TOOLS_VERSION_TRIGGER_FUNCTION)
+    for table, resource in VERSIONED_TABLES.items():
+        op.execute(
+            f"CREATE TRIGGER {table}_bump_resource_version "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION bump_resource_version('{resource}')"
+        )
+    op.execute(
+        "CREATE TRIGGER mcptools_bump_resource_version "
+        "AFTER INSERT OR UPDATE OR DELETE ON mcptools "
+        "FOR EACH ROW EXECUTE FUNCTION bump_mcp_tools_resource_version()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS mcptools_bump_resource_version ON mcptools")
+    for table in VERSIONED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_bump_resource_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_mcp_tools_resource_version()")
+    op.execute("DROP FUNCTION IF EXISTS bump_resource_version()")
+    op.execute("DROP FUNCTION IF EXISTS bump_user_resource_version(uuid, text)")
+    op.drop_table("resourceversions")
@@ -0,0 +1,58 @@
+"""Add file uploads
+
+Revision ID: 7e4c2b9a1f03
+Revises: 5d1f8a3b6e92
+Create Date: 2025-07-23 09:41:17.502316
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7e4c2b9a1f03"
+down_revision: Union[str, None] = "5d1f8a3b6e92"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "fileuploads",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("session_id", sa.UUID(), nullable=True),
+        sa.Column("request_id", sa.UUID(), nullable=True),
+        sa.Column("creator_id", sa.UUID(), nullable=True),
+        sa.Column("mimetype", sa.String(), nullable=False),
+        sa.Column("original_name", sa.String(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=True),
+        sa.Column(
+            "received_bytes", sa.BigInteger(), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["creator_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_fileuploads_creator_id"), "fileuploads", ["creator_id"], unique=False
+    )
+    op.create_index(op.f("ix_fileuploads_id"), "fileuploads", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_fileuploads_updated_at"), "fileuploads", ["updated_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_fileuploads_updated_at"), table_name="fileuploads")
+    op.drop_index(op.f("ix_fileuploads_id"), table_name="fileuploads")
+    op.drop_index(op.f("ix_fileuploads_creator_id"), table_name="fileuploads")
+    op.drop_table("fileuploads")
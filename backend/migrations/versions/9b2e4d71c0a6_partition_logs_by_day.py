@@ -0,0 +1,187 @@
+"""Partition logs by day
+
+Revision ID: 9b2e4d71c0a6
+Revises: 3c7a9e1d52b8
+Create Date: 2025-07-18 11:05:52.871402
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9b2e4d71c0a6"
+down_revision: Union[str, None] = "3c7a9e1d52b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# partitions are named logs_pYYYYMMDD and hold [day, day + 1)
+CREATE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_logs_partitions(from_day date, to_day date)
+RETURNS integer AS $$
+DECLARE
+    day date;
+    partition_name text;
+    created integer := 0;
+BEGIN
+    FOR day IN
+        SELECT generate_series(from_day, to_day, interval '1 day')::date
+    LOOP
+        partition_name := format('logs_p%s', to_char(day, 'YYYYMMDD'));
+        CONTINUE WHEN to_regclass(partition_name) IS NOT NULL;
+
+        -- rows of this day that already landed in the default partition are moved
+        -- first, otherwise attaching the new range would fail
+        EXECUTE format(
+            'CREATE TABLE %I (LIKE logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+            partition_name
+        );
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM logs_default WHERE created_at >= %L '
+            'AND created_at < %L RETURNING *) INSERT INTO %I SELECT * FROM moved',
+            day,
+            day + 1,
+            partition_name
+        );
+        EXECUTE format(
+            'ALTER TABLE logs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+            partition_name,
+            day,
+            day + 1
+        );
+        created := created + 1;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+DROP_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION drop_logs_partitions(retention_days integer)
+RETURNS integer AS $$
+DECLARE
+    partition_name text;
+    dropped integer := 0;
+BEGIN
+    FOR partition_name IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'logs'::regclass
+          AND child.relname ~ '^logs_p[0-9]{8}$'
+          AND to_date(substr(child.relname, 7), 'YYYYMMDD')
+              < current_date - retention_days
+    LOOP
+        EXECUTE format('DROP TABLE %I', partition_name);
+        dropped := dropped + 1;
+    END LOOP;
+
+    -- default partition only catches rows outside of the created ranges
+    DELETE FROM logs_default WHERE created_at < current_date - retention_days;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE logs RENAME TO logs_legacy")
+    op.execute("ALTER SEQUENCE logs_id_seq RENAME TO logs_legacy_id_seq")
+    op.execute("ALTER INDEX logs_pkey RENAME TO logs_legacy_pkey")
+    for index in ("agent_id", "creator_id", "id", "request_id", "session_id"):
+        op.drop_index(f"ix_logs_{index}", table_name="logs_legacy")
+
+    op.execute(
+        """
+        CREATE TABLE logs (
+            id SERIAL NOT NULL,
+            session_id UUID NOT NULL,
+            request_id UUID NOT NULL,
+            agent_id VARCHAR,
+            creator_id UUID REFERENCES users (id) ON DELETE CASCADE,
+            created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+            message VARCHAR NOT NULL,
+            log_level VARCHAR NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("CREATE TABLE logs_default PARTITION OF logs DEFAULT")
+    op.create_index("ix_logs_id", "logs", ["id"], unique=False)
+    op.create_index("ix_logs_agent_id", "logs", ["agent_id"], unique=False)
+    op.create_index("ix_logs_creator_id", "logs", ["creator_id"], unique=False)
+    op.create_index(
+        "ix_logs_session_id_created_at", "logs", ["session_id", "created_at"]
+    )
+    op.create_index(
+        "ix_logs_request_id_created_at", "logs", ["request_id", "created_at"]
+    )
+
+    op.execute(CREATE_PARTITIONS_FUNCTION)
+    op.execute(DROP_PARTITIONS_FUNCTION)
+    op.execute(
+        """
+        SELECT create_logs_partitions(
+            LEAST(
+                (SELECT min(created_at)::date FROM logs_legacy), current_date
+            ),
+            current_date + 3
+        )
+        """
+    )
+    op.execute("INSERT INTO logs SELECT * FROM logs_legacy")
+    op.execute(
+        "SELECT setval('logs_id_seq', COALESCE((SELECT max(id) FROM logs), 0) + 1, false)"
+    )
+    op.drop_table("logs_legacy")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE logs RENAME TO logs_partitioned")
+    op.execute("ALTER SEQUENCE logs_id_seq RENAME TO logs_partitioned_id_seq")
+    op.execute("ALTER INDEX logs_pkey RENAME TO logs_partitioned_pkey")
+    for index in (
+        "agent_id",
+        "creator_id",
+        "id",
+        "session_id_created_at",
+        "request_id_created_at",
+    ):
+        op.drop_index(f"ix_logs_{index}", table_name="logs_partitioned")
+
+    op.create_table(
+        "logs",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("session_id", sa.UUID(), nullable=False),
+        sa.Column("request_id", sa.UUID(), nullable=False),
+        sa.Column("agent_id", sa.String(), nullable=True),
+        sa.Column("creator_id", sa.UUID(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("message", sa.String(), nullable=False),
+        sa.Column("log_level", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["creator_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_logs_agent_id"), "logs", ["agent_id"], unique=False)
+    op.create_index(op.f("ix_logs_creator_id"), "logs", ["creator_id"], unique=False)
+    op.create_index(op.f("ix_logs_id"), "logs", ["id"], unique=False)
+    op.create_index(op.f("ix_logs_request_id"), "logs", ["request_id"], unique=False)
+    op.create_index(op.f("ix_logs_session_id"), "logs", ["session_id"], unique=False)
+
+    op.execute("INSERT INTO logs SELECT * FROM logs_partitioned")
+    op.execute(
+        "SELECT setval('logs_id_seq', COALESCE((SELECT max(id) FROM logs), 0) + 1, false)"
+    )
+    op.execute("DROP TABLE logs_partitioned")
+    op.execute("DROP FUNCTION IF EXISTS drop_logs_partitions(integer)")
+    op.execute("DROP FUNCTION IF EXISTS create_logs_partitions(date, date)")
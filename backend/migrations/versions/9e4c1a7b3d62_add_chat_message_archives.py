@@ -0,0 +1,63 @@
+"""Add chat message archives
+
+Revision ID: 9e4c1a7b3d62
+Revises: 6d1e8b3f9a27
+Create Date: 2025-07-30 09:15:03.774120
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9e4c1a7b3d62"
+down_revision: Union[str, None] = "6d1e8b3f9a27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "chatmessagearchives",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("conversation_id", sa.UUID(), nullable=False),
+        sa.Column("first_created_at", sa.DateTime(), nullable=False),
+        sa.Column("first_message_id", sa.UUID(), nullable=False),
+        sa.Column("last_created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_message_id", sa.UUID(), nullable=False),
+        sa.Column("message_count", sa.Integer(), nullable=False),
+        sa.Column("messages", sa.LargeBinary(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["conversation_id"], ["chatconversations.session_id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_chatmessagearchives_conversation_id_last_key",
+        "chatmessagearchives",
+        ["conversation_id", "last_created_at", "last_message_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_chatmessagearchives_id"), "chatmessagearchives", ["id"], unique=False
+    )
+    # blocks are already compressed, TOAST shouldn't try again
+    op.execute(
+        "ALTER TABLE chatmessagearchives ALTER COLUMN messages SET STORAGE EXTERNAL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_chatmessagearchives_id"), table_name="chatmessagearchives")
+    op.drop_index(
+        "ix_chatmessagearchives_conversation_id_last_key",
+        table_name="chatmessagearchives",
+    )
+    op.drop_table("chatmessagearchives")
@@ -0,0 +1,45 @@
+"""Add probe state
+
+Revision ID: b8d3f6a2c417
+Revises: 7e4c2b9a1f03
+Create Date: 2025-07-24 16:08:33.274519
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8d3f6a2c417"
+down_revision: Union[str, None] = "7e4c2b9a1f03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("mcpservers", "a2acards"):
+        op.add_column(table, sa.Column("content_hash", sa.String(), nullable=True))
+        op.add_column(table, sa.Column("etag", sa.String(), nullable=True))
+        op.add_column(
+            table,
+            sa.Column(
+                "probe_failures", sa.Integer(), server_default="0", nullable=False
+            ),
+        )
+        op.add_column(table, sa.Column("next_probe_at", sa.DateTime(), nullable=True))
+        op.create_index(
+            op.f(f"ix_{table}_next_probe_at"), table, ["next_probe_at"], unique=False
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("a2acards", "mcpservers"):
+        op.drop_index(op.f(f"ix_{table}_next_probe_at"), table_name=table)
+        op.drop_column(table, "next_probe_at")
+        op.drop_column(table, "probe_failures")
+        op.drop_column(table, "etag")
+        op.drop_column(table, "content_hash")
@@ -0,0 +1,101 @@
+"""Composite listing indexes
+
+Revision ID: c5a83f0e1b47
+Revises: 9e4c1a7b3d62
+Create Date: 2025-07-31 11:02:38.905611
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5a83f0e1b47"
+down_revision: Union[str, None] = "9e4c1a7b3d62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name, table, columns, partial index predicate
+INDEXES = [
+    (
+        "ix_agents_creator_id_created_at_id",
+        "agents",
+        ["creator_id", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_agents_active_creator_id_created_at_id",
+        "agents",
+        ["creator_id", "created_at", "id"],
+        "is_active",
+    ),
+    (
+        "ix_mcpservers_active_creator_id_created_at_id",
+        "mcpservers",
+        ["creator_id", "created_at", "id"],
+        "is_active",
+    ),
+    (
+        "ix_a2acards_creator_id_created_at_id",
+        "a2acards",
+        ["creator_id", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_a2acards_active_creator_id_created_at_id",
+        "a2acards",
+        ["creator_id", "created_at", "id"],
+        "is_active",
+    ),
+    (
+        "ix_files_creator_id_created_at_id",
+        "files",
+        ["creator_id", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_chatconversations_creator_id_created_at_session_id",
+        "chatconversations",
+        ["creator_id", "created_at", "session_id"],
+        None,
+    ),
+]
+
+# single column indexes that are a prefix of a composite one, only cost writes
+REDUNDANT_INDEXES = [
+    ("ix_agents_creator_id", "agents", ["creator_id"]),
+    ("ix_a2acards_creator_id", "a2acards", ["creator_id"]),
+    ("ix_files_creator_id", "files", ["creator_id"]),
+    ("ix_chatconversations_creator_id", "chatconversations", ["creator_id"]),
+    ("ix_chatmessages_conversation_id", "chatmessages", ["conversation_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # built concurrently, the tables stay writable while the indexes are built
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+            )
+        for name, table, _ in REDUNDANT_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in REDUNDANT_INDEXES:
+            op.create_index(
+                name, table, columns, unique=False, postgresql_concurrently=True
+            )
+        for name, table, _, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,57 @@
+"""Index agentworkflow flow members
+
+Revision ID: ffed3f285cb7
+Revises: 8403bb364491
+Create Date: 2025-07-14 10:12:41.218304
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "ffed3f285cb7"
+down_revision: Union[str, None] = "8403bb364491"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        "agentworkflows",
+        "flow",
+        existing_type=postgresql.JSON(astext_type=sa.Text()),
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        existing_nullable=False,
+        postgresql_using="flow::jsonb",
+    )
+    op.create_index(
+        "ix_agentworkflows_flow_members",
+        "agentworkflows",
+        ["flow"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"flow": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_agentworkflows_flow_members",
+        table_name="agentworkflows",
+        postgresql_using="gin",
+        postgresql_ops={"flow": "jsonb_path_ops"},
+    )
+    op.alter_column(
+        "agentworkflows",
+        "flow",
+        existing_type=postgresql.JSONB(astext_type=sa.Text()),
+        type_=postgresql.JSON(astext_type=sa.Text()),
+        existing_nullable=False,
+        postgresql_using="flow::json",
+    )
@@ -0,0 +1,148 @@
+"""
+Serialization cost of the active MCP tools listing, the largest catalog response.
+
+Compares the previous path (DTOs dumped to python, `jsonable_encoder`, stdlib json)
+with the fast path (orjson, serialized tool schemas reused while the version counter
+of the user doesn't change). No database is needed, rows are built in memory.
+
+    cd backend && python scripts/benchmark_catalog_serialization.py --tools 2000
+"""
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from src.models import MCPServer, MCPTool  # noqa: E402
+from src.repositories.agent import agent_repo  # noqa: E402
+from src.schemas.api.agent.dto import ActiveAgentsDTO  # noqa: E402
+from src.schemas.base import AgentDTOPayload  # noqa: E402
+from src.schemas.mcp.dto import MCPToolDTO  # noqa: E402
+from src.utils.enums import AgentType  # noqa: E402
+from src.utils.helpers import mcp_tool_to_json_schema  # noqa: E402
+from src.utils.responses import (  # noqa: E402
+    FastJSONResponse,
+    SchemaFragmentCache,
+)
+
+
+def build_catalog(tools: int, properties: int) -> list[MCPServer]:
+    now = datetime.now()
+    servers = []
+    for s in range(max(tools // 20, 1)):
+        server = MCPServer(
+            id=uuid.uuid4(),
+            server_url=f"http://mcp-{s}.example.com/mcp",
+            created_at=now,
+            updated_at=now,
+        )
+        server.mcp_tools = [
+            MCPTool(
+                id=uuid.uuid4(),
+                name=f"tool_{s}_{t}",
+                description="Looks things up. " * 20,
+                alias=f"tool_{s}_{t}",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        f"param_{p}": {
+                            "type": "string",
+                            "description": f"Parameter {p} of the tool. " * 5,
+                            "enum": [f"value_{v}" for v in range(10)],
+                        }
+                        for p in range(properties)
+                    },
+                    "required": [f"param_{p}" for p in range(properties)],
+                },
+                annotations=None,
+                mcp_server_id=server.id,
+                created_at=now,
+                updated_at=now,
+            )
+            for t in range(20)
+        ]
+        servers.append(server)
+    return servers
+
+
+def previous_path(servers: list[MCPServer]) -> bytes:
+    tools = []
+    for s in servers:
+        for t in s.mcp_tools:
+            tool = MCPToolDTO(**t.__dict__)
+            tools.append(
+                AgentDTOPayload(
+                    id=tool.id,
+                    name=tool.name,
+                    type=AgentType.mcp,
+                    url=s.server_url,
+                    agent_schema=mcp_tool_to_json_schema(
+                        tool=tool, aliased_title=tool.alias
+                    ),
+                    created_at=s.created_at,
+                    updated_at=s.updated_at,
+                ).model_dump(mode="json", exclude_none=True)
+            )
+    dto = ActiveAgentsDTO(count_active_connections=len(tools), active_connections=tools)
+    return JSONResponse(jsonable_encoder(dto)).body
+
+
+def fast_path(servers: list[MCPServer], cache: SchemaFragmentCache) -> bytes:
+    tools = [
+        cache.get_or_build(
+            key=("mcp_tools", t.id),
+            version=1,
+            build=lambda s=s, t=t: agent_repo._mcp_tool_to_dto(server=s, tool=t),
+        )
+        for s in servers
+        for t in s.mcp_tools
+    ]
+    return FastJSONResponse(
+        {"count_active_connections": len(tools), "active_connections": tools}
+    ).body
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tools", type=int, default=2000)
+    parser.add_argument("--properties", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    servers = build_catalog(tools=args.tools, properties=args.properties)
+    previous = previous_path(servers)
+
+    cold = timed(
+        lambda: fast_path(servers, SchemaFragmentCache(max_entries=args.tools)),
+        args.repeat,
+    )
+    cache = SchemaFragmentCache(max_entries=args.tools)
+    fast = fast_path(servers, cache)
+    warm = timed(lambda: fast_path(servers, cache), args.repeat)
+    baseline = timed(lambda: previous_path(servers), args.repeat)
+
+    assert json.loads(fast) == json.loads(previous), "responses differ"
+    print(f"{args.tools} tools, {len(previous) / 1024 / 1024:.1f} MiB response")
+    print(f"previous path:          {baseline * 1000:8.1f} ms")
+    print(f"fast path, cold cache:  {cold * 1000:8.1f} ms ({baseline / cold:.1f}x)")
+    print(f"fast path, warm cache:  {warm * 1000:8.1f} ms ({baseline / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
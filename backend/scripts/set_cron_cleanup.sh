@@ -1,11 +1,18 @@
 #!/bin/bash
 set -f # flag is required - otherwise shell will interpret '*' as glob expansion (will return all files from the folder)
 
+# logs table is partitioned by day, retention drops whole partitions instead of deleting rows.
+# backend runs the same maintenance on startup and hourly through its in-process JobRunner,
+# or in the standalone worker of the `jobs-worker` compose profile when JOBS_RUN_IN_BACKEND=false.
+# this job is only needed for deployments that run neither.
+RETENTION_DAYS=${LOGS_RETENTION_DAYS:-7}
+PARTITIONS_AHEAD_DAYS=${LOGS_PARTITIONS_AHEAD_DAYS:-3}
+
 PSQL_COMMAND="
 SELECT cron.schedule(
-    'clean-old-logs',
+    'maintain-logs-partitions',
     '0 1 * * *',
-    \$\$DELETE FROM logs WHERE timestamp < NOW() - INTERVAL '7 days' \$\$
+    \$\$SELECT create_logs_partitions(current_date, current_date + $PARTITIONS_AHEAD_DAYS); SELECT drop_logs_partitions($RETENTION_DAYS) \$\$
 );
 "
 echo $PSQL_COMMAND
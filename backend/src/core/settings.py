@@ -38,11 +38,94 @@ class Settings(BaseSettings):
     BACKEND_CORS_ORIGINS: Optional[str] = Field(default="[*]")
 
     DEFAULT_FILES_FOLDER_NAME: str = Field(default="files")
+    FILES_MAX_UPLOAD_SIZE_BYTES: int = Field(default=100 * 1024 * 1024)
+    FILES_UPLOAD_CHUNK_SIZE_BYTES: int = Field(default=1024 * 1024)
+    FILES_RESUMABLE_UPLOAD_MAX_SIZE_BYTES: int = Field(default=10 * 1024 * 1024 * 1024)
+    # resumable uploads not written to for this long are removed
+    FILES_UPLOAD_EXPIRATION_HOURS: int = Field(default=24)
+    # a chunk not confirmed within this time no longer blocks other writers
+    FILES_UPLOAD_CLAIM_TIMEOUT_SECONDS: int = Field(default=15 * 60)
+    FILES_UPLOAD_CLEANUP_INTERVAL_MINUTES: int = Field(default=30)
+    # "local" keeps files on the shared volume, "s3" in an S3 compatible bucket
+    # small files read repeatedly are served from memory, 0 disables the cache
+    FILES_CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024)
+    FILES_CACHE_MAX_FILE_BYTES: int = Field(default=1024 * 1024)
+    FILES_STORAGE_BACKEND: str = Field(default="local")
+    FILES_DOWNLOAD_URL_TTL_SECONDS: int = Field(default=900)
+    FILES_S3_BUCKET: str = Field(default="genai-files")
+    FILES_S3_ENDPOINT_URL: Optional[str] = None
+    FILES_S3_REGION: Optional[str] = None
+    FILES_S3_ACCESS_KEY_ID: Optional[str] = None
+    FILES_S3_SECRET_ACCESS_KEY: Optional[str] = None
 
-    REDIS_BROKER_URI: str = Field(default="redis://genai-redis:6379/0")
-    REDIS_BACKEND_URI: str = Field(default="redis://genai-redis:6379/0")
+    # background jobs run on the backend's event loop unless a separate worker is used
+    JOBS_RUN_IN_BACKEND: bool = Field(default=True)
+    JOBS_LOOKUP_INTERVAL_MINUTES: int = Field(default=1)
+    JOBS_HISTORY_SIZE: int = Field(default=50)
+    # shared jobs run in one process only, "redis" or "local" for a single process
+    JOBS_LEADER_LOCK_BACKEND: str = Field(default="redis")
+    JOBS_LEADER_LOCK_REDIS_URI: str = Field(default="redis://genai-redis:6379/0")
+    JOBS_LEADER_LOCK_TTL_SECONDS: float = Field(default=30.0)
 
-    CELERY_BEAT_INTERVAL_MINUTES: int = Field(default=1)
+    # database connections are pooled per process
+    DB_POOL_SIZE: int = Field(default=10)
+    DB_MAX_OVERFLOW: int = Field(default=10)
+
+    # MCP servers and A2A agents health probing, failing ones are backed off
+    PROBE_MAX_CONCURRENCY: int = Field(default=16)
+    PROBE_TIMEOUT_SECONDS: float = Field(default=30.0)
+    PROBE_MAX_BACKOFF_SECONDS: float = Field(default=3600.0)
+    PROBE_JITTER_RATIO: float = Field(default=0.2)
+
+    # password hashing, secret encryption and token signing run on a bounded thread
+    # pool, callers past the pending limit wait for a free slot
+    CPU_OFFLOAD_MAX_WORKERS: int = Field(default=4)
+    CPU_OFFLOAD_MAX_PENDING: int = Field(default=256)
+    # assembled resumable uploads are hashed on a separate pool of the same kind
+    FILE_HASHING_MAX_WORKERS: int = Field(default=2)
+    FILE_HASHING_MAX_PENDING: int = Field(default=64)
+
+    # serialized agent schemas of catalog listings kept in memory, 0 disables it
+    SCHEMA_FRAGMENT_CACHE_MAX_ENTRIES: int = Field(default=10_000)
+
+    # requests of one frontend websocket connection handled at the same time
+    FRONTEND_WS_MAX_CONCURRENT_REQUESTS: int = Field(default=8)
+
+    # router events run concurrently across agents, in order for the same agent
+    ROUTER_EVENTS_MAX_CONCURRENCY: int = Field(default=64)
+    # agent registers arriving together are written in one batch
+    AGENT_REGISTER_BATCH_SIZE: int = Field(default=50)
+    AGENT_REGISTER_BATCH_WINDOW_SECONDS: float = Field(default=0.05)
+
+    # agent logs are buffered in memory and written to postgres in batches
+    LOG_INGESTION_BATCH_SIZE: int = Field(default=500)
+    LOG_INGESTION_FLUSH_INTERVAL_SECONDS: float = Field(default=1.0)
+    LOG_INGESTION_MAX_QUEUE_SIZE: int = Field(default=10_000)
+
+    # logs are partitioned by day, partitions older than retention are dropped
+    LOGS_RETENTION_DAYS: int = Field(default=7)
+    LOGS_PARTITIONS_AHEAD_DAYS: int = Field(default=3)
+
+    # rolling window of recent chat messages, "memory" or "redis"
+    CHAT_CONTEXT_CACHE_BACKEND: str = Field(default="memory")
+    CHAT_CONTEXT_CACHE_REDIS_URI: str = Field(default="redis://genai-redis:6379/1")
+    CHAT_CONTEXT_WINDOW_SIZE: int = Field(default=50)
+    CHAT_CONTEXT_CACHE_MAX_SESSIONS: int = Field(default=10_000)
+    CHAT_CONTEXT_CACHE_TTL_SECONDS: int = Field(default=3600)
+
+    # oldest messages of long chats are moved into compressed blocks, keep the recent
+    # messages at least CHAT_CONTEXT_WINDOW_SIZE so cache warm ups stay on the hot table
+    CHAT_ARCHIVE_KEEP_RECENT_MESSAGES: int = Field(default=500)
+    CHAT_ARCHIVE_BLOCK_SIZE: int = Field(default=200)
+    CHAT_ARCHIVE_MAX_CHATS_PER_RUN: int = Field(default=100)
+    CHAT_ARCHIVE_INTERVAL_MINUTES: int = Field(default=60)
+
+    # SQL statements counted per request and websocket message, counts are returned in
+    # X-DB-* response headers when QUERY_STATS_HEADERS_ENABLED is on
+    QUERY_STATS_ENABLED: bool = Field(default=True)
+    QUERY_STATS_HEADERS_ENABLED: bool = Field(default=False)
+    QUERY_STATS_N_PLUS_ONE_THRESHOLD: int = Field(default=10)
+    QUERY_STATS_MAX_SUSPECTS: int = Field(default=20)
 
     @model_validator(mode="after")
     def build_database_uri(self) -> Self:
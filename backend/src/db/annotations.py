@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Annotated, Any, Dict, List
 
 from sqlalchemy import func
-from sqlalchemy.dialects.postgresql import JSON, UUID
+from sqlalchemy.dialects.postgresql import JSON, JSONB, UUID
 from sqlalchemy.orm import mapped_column
 
 int_pk = Annotated[
@@ -29,5 +29,7 @@ last_invoked_at = Annotated[
 
 not_null_json_column = Annotated[Dict[str, Any], mapped_column(JSON)]
 not_null_json_array_column = Annotated[List[Dict[str, str]], mapped_column(JSON)]
+# JSONB is required for containment (@>) lookups backed by GIN indexes
+not_null_jsonb_array_column = Annotated[List[Dict[str, str]], mapped_column(JSONB)]
 
 nullable_json_column = Annotated[Dict[str, Any], mapped_column(JSON, nullable=True)]
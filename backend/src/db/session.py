@@ -2,18 +2,21 @@ from typing import Annotated, AsyncGenerator
 
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
 from src.core.settings import get_settings
+from src.utils.query_stats import query_stats
 
 settings = get_settings()
 
 engine = create_async_engine(
     settings.SQLALCHEMY_ASYNC_DATABASE_URI,
-    poolclass=NullPool,
+    # all background jobs run on the app's event loop, connections can be reused
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     future=True,
     # echo=settings.DEBUG,
     pool_pre_ping=True,
 )
+query_stats.instrument(engine.sync_engine)
 async_session = async_sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
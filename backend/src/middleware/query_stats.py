@@ -0,0 +1,22 @@
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+from src.core.settings import get_settings
+from src.utils.query_stats import query_stats
+
+settings = get_settings()
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        with query_stats.track(f"{request.method} {request.url.path}") as scope:
+            response = await call_next(request)
+            # aggregated per route template, not per concrete path
+            route = request.scope.get("route")
+            if route is not None:
+                scope.name = f"{request.method} {route.path}"
+            if settings.QUERY_STATS_HEADERS_ENABLED:
+                response.headers.update(query_stats.headers(scope))
+        return response
@@ -1,7 +1,16 @@
 import uuid
+from datetime import datetime
 from typing import List
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import (
+    BigInteger,
+    ForeignKey,
+    Index,
+    LargeBinary,
+    UniqueConstraint,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -9,8 +18,8 @@ from src.db.annotations import (
     created_at,
     int_pk,
     last_invoked_at,
-    not_null_json_array_column,
     not_null_json_column,
+    not_null_jsonb_array_column,
     nullable_json_column,
     updated_at,
     uuid_pk,
@@ -128,8 +137,9 @@ class Agent(Base):
     description: Mapped[str] = mapped_column(nullable=False)
 
     jwt: Mapped[str] = mapped_column(unique=True)
+    # indexed by the composite indexes below
     creator_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=True
     )
     creator: Mapped["User"] = relationship(back_populates="agents")  # noqa: F821
 
@@ -144,6 +154,17 @@ class Agent(Base):
         secondary="agent_project_associations", back_populates="agents"
     )
 
+    __table_args__ = (
+        Index("ix_agents_creator_id_created_at_id", "creator_id", "created_at", "id"),
+        Index(
+            "ix_agents_active_creator_id_created_at_id",
+            "creator_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+    )
+
 
 class AgentWorkflow(Base):
     id: Mapped[uuid_pk]
@@ -152,7 +173,8 @@ class AgentWorkflow(Base):
     name: Mapped[str] = mapped_column(nullable=False)
     description: Mapped[str] = mapped_column(nullable=False)
 
-    flow: Mapped[not_null_json_array_column]
+    # list of {"id": ..., "type": ...} members, indexed for agent -> flows lookups
+    flow: Mapped[not_null_jsonb_array_column]
 
     creator_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True
@@ -167,6 +189,15 @@ class AgentWorkflow(Base):
         secondary="agentflow_project_associations", back_populates="flows"
     )
 
+    __table_args__ = (
+        Index(
+            "ix_agentworkflows_flow_members",
+            "flow",
+            postgresql_using="gin",
+            postgresql_ops={"flow": "jsonb_path_ops"},
+        ),
+    )
+
 
 class Project(Base):
     id: Mapped[uuid_pk]
@@ -198,24 +229,30 @@ class Team(Base):
 class Log(Base):
     id: Mapped[int_pk]
 
-    session_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), index=True, nullable=False
-    )
-    request_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), index=True, nullable=False
-    )
+    session_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    request_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
     agent_id: Mapped[str] = mapped_column(index=True, nullable=True)
     creator_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True
     )
     creator: Mapped["User"] = relationship(back_populates="logs")
 
-    created_at: Mapped[created_at]
+    # partition key, hence part of the primary key
+    created_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), primary_key=True
+    )
     updated_at: Mapped[updated_at]
 
     message: Mapped[str] = mapped_column(nullable=False)
     log_level: Mapped[str] = mapped_column(nullable=False)  # TODO: enum
 
+    # daily partitions are created and dropped by LogRepository.maintain_partitions
+    __table_args__ = (
+        Index("ix_logs_session_id_created_at", "session_id", "created_at"),
+        Index("ix_logs_request_id_created_at", "request_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
 
 class File(Base):
     id: Mapped[uuid_pk]
@@ -226,8 +263,9 @@ class File(Base):
     request_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), index=True, nullable=True
     )
+    # indexed by ix_files_creator_id_created_at_id
     creator_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=True
     )
     creator: Mapped["User"] = relationship(back_populates="files")
     mimetype: Mapped[str]
@@ -237,6 +275,44 @@ class File(Base):
         UUID(as_uuid=True), index=True, nullable=False
     )
     from_agent: Mapped[bool]
+    # sha256 of the content, identical uploads share the same stored blob
+    content_hash: Mapped[str] = mapped_column(nullable=True, index=True)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    created_at: Mapped[created_at]
+
+    __table_args__ = (
+        Index("ix_files_creator_id_created_at_id", "creator_id", "created_at", "id"),
+    )
+
+
+class FileUpload(Base):
+    """
+    Resumable upload in progress, chunks are assembled in a part file on the shared
+    volume until the upload is completed.
+    """
+
+    id: Mapped[uuid_pk]
+
+    session_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=True)
+    request_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=True)
+    creator_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+    mimetype: Mapped[str]
+    original_name: Mapped[str]
+    # declared by the client when known, checked on completion
+    size: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    received_bytes: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default="0"
+    )
+    # set while a chunk is written, only the claiming request may advance the offset
+    claim_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=True)
+    claimed_until: Mapped[datetime] = mapped_column(nullable=True)
+    created_at: Mapped[created_at]
+    updated_at: Mapped[updated_at]
+
+    # abandoned uploads are looked up by last write
+    __table_args__ = (Index("ix_fileuploads_updated_at", "updated_at"),)
 
 
 class ModelProvider(Base):
@@ -306,8 +382,21 @@ class MCPServer(Base):
 
     is_active: Mapped[bool]
 
+    # health probing state, see src/utils/probe_scheduler.py
+    content_hash: Mapped[str] = mapped_column(nullable=True)
+    etag: Mapped[str] = mapped_column(nullable=True)
+    probe_failures: Mapped[int] = mapped_column(default=0, server_default="0")
+    next_probe_at: Mapped[datetime] = mapped_column(nullable=True, index=True)
+
     __table_args__ = (
         UniqueConstraint("creator_id", "server_url", name="uq_mcp_server_url"),
+        Index(
+            "ix_mcpservers_active_creator_id_created_at_id",
+            "creator_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
     )
 
     def __repr__(self) -> str:
@@ -345,16 +434,31 @@ class A2ACard(Base):
 
     is_active: Mapped[bool]
 
+    # health probing state, see src/utils/probe_scheduler.py
+    content_hash: Mapped[str] = mapped_column(nullable=True)
+    etag: Mapped[str] = mapped_column(nullable=True)
+    probe_failures: Mapped[int] = mapped_column(default=0, server_default="0")
+    next_probe_at: Mapped[datetime] = mapped_column(nullable=True, index=True)
+
     created_at: Mapped[created_at]
     updated_at: Mapped[updated_at]
 
     creator: Mapped["User"] = relationship(back_populates="a2acards")  # noqa: F821
 
+    # indexed by ix_a2acards_creator_id_created_at_id
     creator_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=True
     )
     __table_args__ = (
         UniqueConstraint("creator_id", "server_url", name="uq_a2a_card_server_url"),
+        Index("ix_a2acards_creator_id_created_at_id", "creator_id", "created_at", "id"),
+        Index(
+            "ix_a2acards_active_creator_id_created_at_id",
+            "creator_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
     )
 
 
@@ -372,13 +476,82 @@ class ChatMessage(Base):
     created_at: Mapped[created_at]
     updated_at: Mapped[updated_at]
 
+    # indexed by ix_chatmessages_conversation_id_created_at_id
     conversation_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("chatconversations.session_id", ondelete="CASCADE"),
         nullable=True,
-        index=True,
     )
     conversation: Mapped["ChatConversation"] = relationship(back_populates="messages")
 
+    __table_args__ = (
+        Index(
+            "ix_chatmessages_conversation_id_created_at_id",
+            "conversation_id",
+            "created_at",
+            "id",
+        ),
+    )
+
+
+class ChatMessageArchive(Base):
+    """Block of the oldest messages of a chat, moved out of chatmessages compressed"""
+
+    id: Mapped[uuid_pk]
+
+    conversation_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("chatconversations.session_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # (created_at, id) keys of the first and last message, the keys history cursors use
+    first_created_at: Mapped[datetime]
+    first_message_id: Mapped[uuid.UUID]
+    last_created_at: Mapped[datetime]
+    last_message_id: Mapped[uuid.UUID]
+    message_count: Mapped[int]
+    # zlib compressed JSON array of the messages, oldest first
+    messages: Mapped[bytes] = mapped_column(LargeBinary)
+
+    created_at: Mapped[created_at]
+
+    __table_args__ = (
+        Index(
+            "ix_chatmessagearchives_conversation_id_last_key",
+            "conversation_id",
+            "last_created_at",
+            "last_message_id",
+        ),
+    )
+
+
+class AgentTraceStep(Base):
+    """Step of a master agent run, written live as the step starts and finishes"""
+
+    id: Mapped[uuid_pk]
+
+    request_id: Mapped[uuid.UUID] = mapped_column(nullable=False)
+    session_id: Mapped[uuid.UUID] = mapped_column(nullable=False)
+    # shared by the started and finished events of the step
+    step_id: Mapped[str]
+    step: Mapped[str]
+    name: Mapped[str]
+    args_digest: Mapped[str] = mapped_column(nullable=True)
+    status: Mapped[str]
+    is_success: Mapped[bool] = mapped_column(nullable=True)
+    latency: Mapped[float] = mapped_column(nullable=True)
+
+    created_at: Mapped[created_at]
+    updated_at: Mapped[updated_at]
+
+    creator_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "request_id", "step_id", name="uq_agenttracesteps_request_id_step_id"
+        ),
+    )
+
 
 class ChatConversation(Base):
     """Chat history"""
@@ -389,13 +562,24 @@ class ChatConversation(Base):
     created_at: Mapped[created_at]
     updated_at: Mapped[updated_at]
 
+    # indexed by ix_chatconversations_creator_id_created_at_session_id
     creator_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=True
     )
     creator: Mapped["User"] = relationship(back_populates="conversations")
 
+    # rows are removed by the ON DELETE CASCADE, deleting a chat doesn't load them
     messages: Mapped[List["ChatMessage"]] = relationship(
-        back_populates="conversation", cascade="all, delete"
+        back_populates="conversation", cascade="all, delete", passive_deletes=True
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_chatconversations_creator_id_created_at_session_id",
+            "creator_id",
+            "created_at",
+            "session_id",
+        ),
     )
 
 
@@ -414,3 +598,15 @@ class UserProfile(Base):
     user: Mapped["User"] = relationship(back_populates="profile", single_parent=True)
 
     # TODO: config fields, other credentials, etc
+
+
+class ResourceVersion(Base):
+    """
+    Per user change counter of a catalog resource, bumped by database triggers on
+    every write to the tables behind it. Used as the validator of conditional GETs.
+    """
+
+    # no foreign key, rows are written by the cascade deletes of a deleted user
+    user_id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    resource: Mapped[str] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
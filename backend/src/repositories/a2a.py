@@ -4,14 +4,15 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
+import orjson
 from aiohttp import ClientSession
 from fastapi import HTTPException
 from pydantic import AnyHttpUrl
-from sqlalchemy import and_, select, update
+from sqlalchemy import and_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.models import A2ACard, User
-from src.repositories.base import CRUDBase
+from src.repositories.base import CRUDBase, ProbeStateMixin
 from src.schemas.a2a.dto import A2ACardDTO
 from src.schemas.a2a.schemas import (
     A2AAgentCard,
@@ -26,56 +27,78 @@ from src.utils.helpers import (
     get_agent_description_from_skills,
     strip_endpoints_from_url,
 )
+from src.utils.responses import schema_fragment_cache
 
 logger = logging.getLogger(__name__)
 
 
 async def lookup_agent_well_known(
-    url: AnyHttpUrl | str, headers: Optional[dict] = None
-) -> Optional[A2AAgentCardSchema]:
-    url = strip_endpoints_from_url(url=url)
-    async with ClientSession(base_url=url, headers=headers) as session:
-        try:
-            async with session.get("/.well-known/agent.json", ssl=False) as resp:
-                if resp.status == 200:
-                    json_resp = await resp.json()
-                    card = A2AAgentCard(**json_resp)
-                    card.url = url
-                    return A2AAgentCardSchema(card=card, is_active=True)
+    url: AnyHttpUrl | str,
+    headers: Optional[dict] = None,
+    etag: Optional[str] = None,
+    session: Optional[ClientSession] = None,
+) -> A2AAgentCardSchema:
+    """
+    Fetches the agent card. With `etag` the request is conditional and an unchanged
+    card is reported as `not_modified` without being downloaded again.
 
-                return None
+    Background jobs pass their long lived `session`, otherwise one is opened per call.
+    """
+    url = strip_endpoints_from_url(url=url)
+    request_headers = {**(headers or {}), **({"If-None-Match": etag} if etag else {})}
+    card_url = f"{url.rstrip('/')}/.well-known/agent.json"
+    owns_session = session is None
+    session = session or ClientSession()
+    try:
+        async with session.get(card_url, ssl=False, headers=request_headers) as resp:
+            if resp.status == 304:
+                return A2AAgentCardSchema(is_active=True, etag=etag, not_modified=True)
+            if resp.status == 200:
+                json_resp = await resp.json()
+                card = A2AAgentCard(**json_resp)
+                card.url = url
+                return A2AAgentCardSchema(
+                    card=card, is_active=True, etag=resp.headers.get("ETag")
+                )
 
-        except OSError:
-            logger.warning(f"Could not connect to agent on {url}")
+            logger.warning(f"Agent card on {url} returned status {resp.status}")
             return A2AAgentCardSchema(is_active=False)
 
+    except OSError:
+        logger.warning(f"Could not connect to agent on {url}")
+        return A2AAgentCardSchema(is_active=False)
+    finally:
+        if owns_session:
+            await session.close()
 
-class A2ARepository(CRUDBase[A2ACard, A2AAgentCard, A2AAgentCard]):
-    async def get_all_card_server_urls(self, db: AsyncSession) -> list[Optional[str]]:
-        q = await db.scalars(select(self.model.server_url))
-        return q.all()
-
-    async def get_card_by_server_url(
-        self, db: AsyncSession, server_url: str
-    ) -> A2ACard:
-        q = await db.scalars(
-            select(self.model).where(self.model.server_url == server_url)
-        )
-        return q.first()
 
-    async def update_card(
-        self, db: AsyncSession, server_url: str, card_in: A2AAgentCardSchema
-    ):
-        card = await self.get_card_by_server_url(db=db, server_url=server_url)
+def split_card_content(card: A2AAgentCard) -> dict:
+    """
+    Card fields stored in their own columns are taken out of `card_content`.
+    """
+    card_content = card.model_dump(mode="json", exclude_none=True)
+    return {
+        "name": card_content.pop("name"),
+        "description": card_content.pop("description"),
+        "server_url": card_content.pop("url"),
+        "card_content": card_content,
+    }
 
-        if card_in.card:
-            setattr(card, "card_content", card_in.card.model_dump(mode="json"))
-            setattr(card, "is_active", card_in.is_active)
 
-            db.add(card)
-            await db.commit()
-            await db.refresh(card)
-        return card
+class A2ARepository(ProbeStateMixin, CRUDBase[A2ACard, A2AAgentCard, A2AAgentCard]):
+    async def update_cards(
+        self, db: AsyncSession, card_ids: list[str], card_in: A2AAgentCardSchema
+    ) -> None:
+        """
+        Writes the card of one remote agent to every card row registered with its
+        url in a single UPDATE.
+        """
+        columns = split_card_content(card_in.card)
+        # server_url identifies the card of the user, it is never rewritten
+        columns.pop("server_url")
+        await self.bulk_update(
+            db=db, ids=card_ids, values={**columns, "is_active": card_in.is_active}
+        )
 
     async def add_url(
         self, db: AsyncSession, user_model: User, data_in: A2ACreateAgentSchema
@@ -88,21 +111,11 @@ class A2ARepository(CRUDBase[A2ACard, A2AAgentCard, A2AAgentCard]):
                 status_code=400,
             )
 
-        a2a_card = a2a_card_dto.card
-        # full card content, including name, descr, agent card url
-        card_content = a2a_card.model_dump(mode="json", exclude_none=True)
-
-        # values for separate columns
-        card_name = card_content.pop("name")
-        card_description = card_content.pop("description")
-        card_url = card_content.pop("url")
+        columns = split_card_content(a2a_card_dto.card)
         try:
             a2a_agent = A2ACard(
-                name=card_name,
-                alias=generate_alias(card_name),
-                description=card_description,
-                server_url=card_url,
-                card_content=card_content,
+                **columns,
+                alias=generate_alias(columns["name"]),
                 creator_id=user_id,
                 is_active=a2a_card_dto.is_active,
             )
@@ -139,6 +152,9 @@ class A2ARepository(CRUDBase[A2ACard, A2AAgentCard, A2AAgentCard]):
         return A2ACardDTO(**agent.__dict__).model_dump(mode="json", exclude_none=True)
 
     async def _orm_card_to_dto(self, card: A2ACardDTO) -> dict:
+        return self._card_to_dto(card=card)
+
+    def _card_to_dto(self, card: A2ACardDTO) -> dict:
         return a2a_repo.agent_card_to_dto(
             agent_card=A2AAgentCard(
                 **card.card_content,
@@ -155,8 +171,9 @@ class A2ARepository(CRUDBase[A2ACard, A2AAgentCard, A2AAgentCard]):
         return [await self._orm_card_to_dto(card=c) for c in cards]
 
     async def list_active_cards(
-        self, db: AsyncSession, user_id: UUID, limit: int, offset: int
-    ):
+        self, db: AsyncSession, user_id: UUID, limit: int, offset: int, version: int
+    ) -> list[orjson.Fragment]:
+        """`version` is the user's a2a version counter, cached cards of it are reused."""
         q = await db.scalars(
             select(self.model)
             .where(
@@ -169,8 +186,14 @@ class A2ARepository(CRUDBase[A2ACard, A2AAgentCard, A2AAgentCard]):
             .limit(limit=limit)
             .offset(offset=offset)
         )
-        cards = [A2ACardDTO(**c.__dict__) for c in q.all()]
-        return await self._orm_cards_to_dto(cards=cards)
+        return [
+            schema_fragment_cache.get_or_build(
+                key=("a2a_cards", c.id),
+                version=version,
+                build=lambda c=c: self._card_to_dto(card=A2ACardDTO(**c.__dict__)),
+            )
+            for c in q.all()
+        ]
 
     async def list_all_cards(
         self, db: AsyncSession, user_id: UUID, limit: int, offset: int
@@ -230,14 +253,5 @@ class A2ARepository(CRUDBase[A2ACard, A2AAgentCard, A2AAgentCard]):
             is_active=True,
         )
 
-    async def set_as_inactive(self, db: AsyncSession, server_url: str):
-        await db.execute(
-            update(self.model)
-            .where(self.model.server_url == server_url)
-            .values({"is_active": False})
-        )
-        await db.commit()
-        logger.info(f"Set {server_url} as inactive")
-
 
 a2a_repo = A2ARepository(A2ACard)
@@ -1,21 +1,22 @@
+from functools import partial
 from typing import Optional, Union
 from uuid import UUID
 
+import orjson
 from fastapi import HTTPException
 from mcp.types import Tool, ToolAnnotations
-from pydantic import BaseModel
-from sqlalchemy import and_, select, text, update
+from sqlalchemy import and_, select, text, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.auth.jwt import TokenLifespanType, create_access_token, validate_token
-from src.models import A2ACard, Agent, AgentWorkflow, MCPTool, User
+from src.models import A2ACard, Agent, AgentWorkflow, MCPServer, MCPTool, User
 from src.repositories.a2a import a2a_repo
 from src.repositories.base import CRUDBase
 from src.repositories.mcp import mcp_repo
-from src.schemas.a2a.dto import A2AFirstAgentInFlow, ActiveA2ACardDTO
+from src.repositories.resource_version import resource_version_repo
+from src.schemas.a2a.dto import A2AFirstAgentInFlow
 from src.schemas.a2a.schemas import A2AAgentCard
 from src.schemas.api.agent.dto import (
     ActiveAgentsDTO,
-    ActiveGenAIAgentDTO,
     AgentDTOWithJWT,
     MLAgentJWTDTO,
     MLAgentSchema,
@@ -23,8 +24,9 @@ from src.schemas.api.agent.dto import (
 from src.schemas.api.agent.schemas import AgentCreate, AgentRegister, AgentUpdate
 from src.schemas.api.flow.schemas import AgentFlowAlias, FlowAgentId, FlowSchema
 from src.schemas.base import AgentDTOPayload
-from src.schemas.mcp.dto import ActiveMCPToolDTO, MCPToolDTO
-from src.utils.enums import ActiveAgentTypeFilter, AgentType
+from src.schemas.mcp.dto import MCPToolDTO
+from src.utils.cpu_offload import cpu_offload
+from src.utils.enums import ActiveAgentTypeFilter, AgentType, CatalogResource
 from src.utils.filters import AgentFilter
 from src.utils.helpers import (
     FlowValidator,
@@ -33,6 +35,8 @@ from src.utils.helpers import (
     map_genai_agent_to_unified_dto,
     mcp_tool_to_json_schema,
 )
+from src.utils.pagination import CursorPage, CursorPaginator
+from src.utils.responses import schema_fragment_cache
 
 
 class AgentRepository(CRUDBase[Agent, AgentCreate, AgentUpdate]):
@@ -106,7 +110,8 @@ class AgentRepository(CRUDBase[Agent, AgentCreate, AgentUpdate]):
         db_obj: Optional[Agent] = await self._insert_new_agent(
             user_model=user_model, obj_in=obj_in
         )
-        jwt = create_access_token(
+        jwt = await cpu_offload.run(
+            create_access_token,
             subject=str(db_obj.id),
             lifespan_type=TokenLifespanType.cli,
             user_id=str(db_obj.creator_id),
@@ -269,40 +274,48 @@ class AgentRepository(CRUDBase[Agent, AgentCreate, AgentUpdate]):
         )
         return q.scalars().first()  # one jwt per one agent per user
 
-    async def get_agent_by_id(
-        self, db: AsyncSession, agent_id: UUID, user_model: User
-    ) -> Optional[Agent]:
+    async def get_agents_by_jwts(
+        self, db: AsyncSession, agent_jwts: list[str]
+    ) -> dict[str, Agent]:
+        """
+        Batched `validate_agent_by_jwt`, returns agents by their valid JWTs.
+        """
+        payloads = {}
+        for agent_jwt in agent_jwts:
+            payload = validate_token(
+                token=agent_jwt, lifespan_type=TokenLifespanType.cli
+            )
+            if payload:
+                payloads[agent_jwt] = (payload.sub, str(payload.user_id))
+        if not payloads:
+            return {}
+
         q = await db.execute(
             select(self.model).where(
-                and_(
-                    self.model.id == str(agent_id),
-                    self.model.creator_id == str(user_model.id),
+                tuple_(self.model.id, self.model.creator_id).in_(
+                    list(set(payloads.values()))
                 )
             )
         )
-        return q.scalars().first()
+        agents = {(str(a.id), str(a.creator_id)): a for a in q.scalars().all()}
+        return {
+            agent_jwt: agents[key]
+            for agent_jwt, key in payloads.items()
+            if key in agents
+        }
 
-    async def list_agents_by_name(
-        self,
-        db: AsyncSession,
-        agent_name: str,
-        user_model: User,
-        limit: int = 100,
-        offset: int = 0,
-    ) -> list[Optional[Agent]]:
+    async def get_agent_by_id(
+        self, db: AsyncSession, agent_id: UUID, user_model: User
+    ) -> Optional[Agent]:
         q = await db.execute(
-            select(self.model)
-            .where(
+            select(self.model).where(
                 and_(
-                    self.model.name == agent_name,
+                    self.model.id == str(agent_id),
                     self.model.creator_id == str(user_model.id),
                 )
             )
-            .limit(limit=limit)
-            .offset(offset=offset)
-            .order_by(self.model.created_at.desc())
         )
-        return q.scalars().all()
+        return q.scalars().first()
 
     async def find_agent_by_description(
         self, db: AsyncSession, description_query: str, user_model: User
@@ -317,46 +330,6 @@ class AgentRepository(CRUDBase[Agent, AgentCreate, AgentUpdate]):
         )
         return q.scalars().first()
 
-    async def search_agents_by_description(
-        self,
-        db: AsyncSession,
-        description_query: str,
-        user_model: User,
-        limit: int = 100,
-        offset: int = 0,
-    ):
-        q = await db.execute(
-            select(self.model)
-            .where(
-                and_(
-                    self.model.description.ilike(f"%{description_query}%"),
-                    self.model.creator_id == str(user_model.id),
-                )
-            )
-            .limit(limit=limit)
-            .offset(offset=offset)
-            .order_by(self.model.created_at.desc())
-        )
-        return q.scalars().all()
-
-    async def filter_out_empty_agents(
-        self, db: AsyncSession, user_model: User, limit: int, offset: int
-    ):
-        q = await db.scalars(
-            select(self.model)
-            .where(
-                and_(
-                    self.model.name != "",
-                    self.model.description != "",
-                    self.model.creator_id == user_model.id,
-                )
-            )
-            .order_by(self.model.created_at)
-            .limit(limit=limit)
-            .offset(offset=offset)
-        )
-        return q.all()
-
     async def query_by_filter(
         self,
         db: AsyncSession,
@@ -364,30 +337,30 @@ class AgentRepository(CRUDBase[Agent, AgentCreate, AgentUpdate]):
         filter_field: AgentFilter,
         limit: int = 0,
         offset: int = 0,
-    ):
+        cursor: Optional[str] = None,
+    ) -> CursorPage:
+        conditions = [self.model.creator_id == str(user_model.id)]
         if filter_field.name:
-            agents = await self.list_agents_by_name(
-                db=db,
-                agent_name=filter_field.name,
-                user_model=user_model,
-                limit=limit,
-                offset=offset,
-            )
-            return agents
-
-        if filter_field.description:
-            agents = await self.search_agents_by_description(
-                db=db,
-                description_query=filter_field.description,
-                user_model=user_model,
-                limit=limit,
-                offset=offset,
+            conditions.append(self.model.name == filter_field.name)
+        elif filter_field.description:
+            conditions.append(
+                self.model.description.ilike(f"%{filter_field.description}%")
             )
-            return agents
-
-        return await self.filter_out_empty_agents(
-            db=db, user_model=user_model, limit=limit, offset=offset
+        else:
+            conditions.extend((self.model.name != "", self.model.description != ""))
+
+        paginator = CursorPaginator(
+            db,
+            select(self.model).where(and_(*conditions)),
+            limit,
+            cursor,
+            created_at_column=self.model.created_at,
+            id_column=self.model.id,
+            # unfiltered listing has always been returned oldest first
+            descending=bool(filter_field.name or filter_field.description),
+            offset=offset,
         )
+        return await paginator.get_page()
 
     async def query_all_platform_agents(
         self, db: AsyncSession, user_id: UUID, offset: int, limit: int
@@ -607,172 +580,154 @@ LIMIT :limit OFFSET :offset;
         )
         return all(q.all())
 
+    def _platform_agent_to_dto(self, agent_type: str, col: dict) -> dict:
+        """Unified DTO of a row of `query_all_platform_agents`."""
+        if agent_type == "mcptools":
+            tool_schema = mcp_tool_to_json_schema(
+                Tool(
+                    name=col["name"],
+                    description=col["description"],
+                    inputSchema=col["json_data1"],
+                    annotations=ToolAnnotations(**col["json_data2"])
+                    if col["json_data2"]
+                    else None,
+                ),
+                aliased_title=col["alias"],
+            )
+            dto = AgentDTOPayload(
+                id=col["id"],
+                name=tool_schema["title"],
+                type=AgentType.mcp,
+                url=col["server_url"],
+                agent_schema=tool_schema,
+                created_at=col["created_at"],
+                updated_at=col["updated_at"],
+                is_active=True,
+            )
+
+        elif agent_type == "a2acards":
+            card_content: dict = col["json_data1"]
+            card_content.pop("name", None)
+            description = card_content.pop("description", None)
+            url = card_content.pop("url", None)
+            alias = col["alias"]
+            agent_schema = A2AAgentCard(
+                **card_content,
+                name=alias if alias else col["alias"],
+                description=description if description else col["description"],
+                url=url if url else col["server_url"],
+            )
+            dto = a2a_repo.agent_card_to_dto(
+                agent_card=agent_schema,
+                created_at=col["created_at"],
+                updated_at=col["updated_at"],
+                id_=col["id"],
+            )
+
+        else:
+            input_params = col["json_data1"]
+            alias = col["alias"]
+            if input_params:
+                input_params["function"]["name"] = alias
+            dto = AgentDTOPayload(
+                id=str(col["id"]),
+                name=alias,
+                type=AgentType.genai,
+                agent_schema=input_params,
+                created_at=col["created_at"],
+                updated_at=col["updated_at"],
+                is_active=col["is_active"],
+            )
+
+        return dto.model_dump(mode="json", exclude_none=True)
+
     async def map_agents_to_dto_models(
         self, db: AsyncSession, user_id: UUID, offset: int, limit: int
-    ):
+    ) -> dict:
+        """
+        Serialized schemas of unchanged agents, tools and cards are reused, the result
+        is meant for `json_response` as it holds `orjson.Fragment`s.
+        """
+        resources = (CatalogResource.agents, CatalogResource.mcp, CatalogResource.a2a)
+        versions = dict(
+            zip(
+                ("agents", "mcptools", "a2acards"),
+                await resource_version_repo.get_versions(
+                    db=db, user_id=user_id, resources=resources
+                ),
+            )
+        )
         result = await self.query_all_platform_agents(
             db=db, user_id=user_id, limit=limit, offset=offset
         )
-        columns = [row._asdict() for row in result]
         flows = await self._get_all_active_flows_by_user(db=db, user_id=user_id)
 
-        response: list[
-            Optional[ActiveA2ACardDTO | ActiveGenAIAgentDTO | ActiveMCPToolDTO]
-        ] = []
-        if flows:
-            response.extend(flows)
-        for col in columns:
+        response: list[dict | orjson.Fragment] = [
+            flow.model_dump(mode="json", exclude_none=True) for flow in flows if flow
+        ]
+        for row in result:
+            col = row._asdict()
             agent_type = col.pop("table_source")
-            if agent_type == "mcptools":
-                fields_to_pop = [
-                    "jwt",
-                    "last_invoked_at",
-                ]
-                for field in fields_to_pop:
-                    col.pop(field)
-
-                created_at = col.pop("created_at")
-                updated_at = col.pop("updated_at")
-
-                tool_schema = mcp_tool_to_json_schema(
-                    Tool(
-                        name=col["name"],
-                        description=col["description"],
-                        inputSchema=col["json_data1"],
-                        annotations=ToolAnnotations(**col["json_data2"])
-                        if col["json_data2"]
-                        else None,
-                    ),
-                    aliased_title=col["alias"],
+            response.append(
+                schema_fragment_cache.get_or_build(
+                    key=("platform_agents", agent_type, col["id"]),
+                    version=versions[agent_type],
+                    build=partial(self._platform_agent_to_dto, agent_type, col),
                 )
-                mcp_tool = AgentDTOPayload(
-                    id=col["id"],
-                    name=tool_schema["title"],
-                    type=AgentType.mcp,
-                    url=col["server_url"],
-                    agent_schema=tool_schema,
-                    created_at=created_at,
-                    updated_at=updated_at,
-                    is_active=True,
-                )
-
-                response.append(mcp_tool)
-
-            if agent_type == "a2acards":
-                fields_to_pop = [
-                    "jwt",
-                    "last_invoked_at",
-                ]
-                for field in fields_to_pop:
-                    col.pop(field)
-
-                created_at = col.pop("created_at")
-                updated_at = col.pop("updated_at")
-
-                card_content: dict = col["json_data1"]
-                card_content.pop("name", None)
-                description = card_content.pop("description", None)
-                url = card_content.pop("url", None)
-                alias = col["alias"]
-                agent_schema = A2AAgentCard(
-                    **card_content,
-                    name=alias if alias else col["alias"],
-                    description=description if description else col["description"],
-                    url=url if url else col["server_url"],
-                )
-
-                agent_card = a2a_repo.agent_card_to_dto(
-                    agent_card=agent_schema,
-                    created_at=created_at,
-                    updated_at=updated_at,
-                    id_=col["id"],
-                )
-
-                response.append(agent_card)
-
-            if agent_type == "agents":
-                fields_to_pop = [
-                    "server_url",
-                ]
-                for field in fields_to_pop:
-                    col.pop(field)
-
-                input_params = col["json_data1"]
-                alias = col["alias"]
-                if input_params:
-                    input_params["function"]["name"] = alias
-                agent = ActiveGenAIAgentDTO(
-                    agent_id=str(col["id"]),
-                    agent_name=alias,
-                    agent_description=col["description"],
-                    agent_schema=input_params,
-                    agent_jwt=col["jwt"],
-                    agent_alias=alias,
-                    is_active=col["is_active"],
-                    created_at=col["created_at"],
-                    updated_at=col["updated_at"],
-                )
-                agent_dto = AgentDTOPayload(
-                    id=agent.agent_id,
-                    name=agent.agent_name,
-                    type=AgentType.genai,
-                    agent_schema=agent.agent_schema,
-                    created_at=agent.created_at,
-                    updated_at=agent.updated_at,
-                    is_active=agent.is_active,
-                )
-                response.append(agent_dto)
+            )
 
-        return ActiveAgentsDTO(
-            count_active_connections=len(response),
-            active_connections=[
-                resp_model.model_dump(exclude_none=True)
-                if isinstance(resp_model, BaseModel)
-                else resp_model
-                for resp_model in response
-            ],
-        )
+        return {
+            "count_active_connections": len(response),
+            "active_connections": response,
+        }
 
     async def list_all_mcp_tools(
         self, db: AsyncSession, user_id: UUID, limit: int, offset: int
-    ):
+    ) -> dict:
+        (version,) = await resource_version_repo.get_versions(
+            db=db, user_id=user_id, resources=(CatalogResource.mcp,)
+        )
         mcp_servers = await mcp_repo.list_active_mcp_servers(
             db=db, user_id=user_id, limit=limit, offset=offset
         )
         tools = []
         for s in mcp_servers:
             for tool in s.mcp_tools:
-                tool_schema = mcp_tool_to_json_schema(
-                    tool=tool, aliased_title=tool.alias
-                )
-
                 tools.append(
-                    AgentDTOPayload(
-                        id=tool.id,
-                        name=tool.name,
-                        type=AgentType.mcp,
-                        url=s.server_url,
-                        agent_schema=tool_schema,
-                        created_at=s.created_at,
-                        updated_at=s.updated_at,
-                    ).model_dump(mode="json", exclude_none=True)
+                    schema_fragment_cache.get_or_build(
+                        key=("mcp_tools", tool.id),
+                        version=version,
+                        build=partial(self._mcp_tool_to_dto, server=s, tool=tool),
+                    )
                 )
 
-        return ActiveAgentsDTO(
-            count_active_connections=len(tools),
-            active_connections=tools,
-        )
+        return {"count_active_connections": len(tools), "active_connections": tools}
+
+    @staticmethod
+    def _mcp_tool_to_dto(server: MCPServer, tool: MCPTool) -> dict:
+        tool_dto = MCPToolDTO(**tool.__dict__)
+        return AgentDTOPayload(
+            id=tool_dto.id,
+            name=tool_dto.name,
+            type=AgentType.mcp,
+            url=server.server_url,
+            agent_schema=mcp_tool_to_json_schema(
+                tool=tool_dto, aliased_title=tool_dto.alias
+            ),
+            created_at=server.created_at,
+            updated_at=server.updated_at,
+        ).model_dump(mode="json", exclude_none=True)
 
     async def list_all_a2a_cards(
         self, db: AsyncSession, user_id: UUID, limit: int, offset: int
-    ):
-        result = await a2a_repo.list_active_cards(
-            db=db, user_id=user_id, limit=limit, offset=offset
+    ) -> dict:
+        (version,) = await resource_version_repo.get_versions(
+            db=db, user_id=user_id, resources=(CatalogResource.a2a,)
         )
-        return ActiveAgentsDTO(
-            count_active_connections=len(result),
-            active_connections=result,
+        result = await a2a_repo.list_active_cards(
+            db=db, user_id=user_id, limit=limit, offset=offset, version=version
         )
+        return {"count_active_connections": len(result), "active_connections": result}
 
     async def get_active_agents_by_filter(
         self,
@@ -1,12 +1,16 @@
-from typing import Any, Generic, Optional, Type, TypeVar, Union
+from datetime import datetime
+from typing import Any, Generic, Optional, Sequence, Type, TypeVar, Union
 from uuid import UUID
 
 from fastapi import HTTPException
 from pydantic import BaseModel
-from sqlalchemy import Result, and_, delete, select
+from sqlalchemy import Result, and_, delete, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.db.base import Base
 from src.models import User
+from src.utils.pagination import CursorPage, CursorPaginator
+from src.utils.probe_scheduler import ProbeTarget
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -95,6 +99,116 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.add_all(db_obj)
         await db.commit()
 
+    def _to_row(self, obj_in: Union[CreateSchemaType, dict[str, Any]]) -> dict:
+        if isinstance(obj_in, BaseModel):
+            return obj_in.model_dump(mode="json", exclude_unset=True)
+        return obj_in
+
+    async def _commit_returned(
+        self, db: AsyncSession, db_objs: list[ModelType], commit: bool
+    ) -> list[ModelType]:
+        if commit:
+            # detached objects keep the RETURNING state instead of being expired
+            for db_obj in db_objs:
+                db.expunge(db_obj)
+            await db.commit()
+        return db_objs
+
+    async def bulk_create(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, dict[str, Any]]],
+        commit: bool = True,
+    ) -> list[ModelType]:
+        """
+        Insert many rows in a single INSERT ... RETURNING round trip, returned objects
+        are fully loaded so no refresh is needed.
+        """
+        if not objs_in:
+            return await self._commit_returned(db=db, db_objs=[], commit=commit)
+        q = await db.scalars(
+            insert(self.model).returning(self.model),
+            [self._to_row(obj_in) for obj_in in objs_in],
+        )
+        return await self._commit_returned(db=db, db_objs=q.all(), commit=commit)
+
+    async def bulk_update(
+        self,
+        db: AsyncSession,
+        *,
+        ids: Sequence[Any],
+        values: dict[str, Any],
+        user_model: Optional[User] = None,
+        commit: bool = True,
+    ) -> list[ModelType]:
+        """
+        Set the same values on many rows in a single UPDATE ... RETURNING, optionally
+        limited to rows created by `user_model`. Returns the updated objects.
+        """
+        if not ids:
+            return await self._commit_returned(db=db, db_objs=[], commit=commit)
+        statement = update(self.model).where(self.model.id.in_([str(i) for i in ids]))
+        if user_model:
+            statement = statement.where(self.model.creator_id == str(user_model.id))
+        q = await db.scalars(
+            statement.values(**values).returning(self.model),
+            execution_options={"populate_existing": True},
+        )
+        return await self._commit_returned(db=db, db_objs=q.all(), commit=commit)
+
+    async def bulk_update_rows(
+        self,
+        db: AsyncSession,
+        *,
+        rows: Sequence[dict[str, Any]],
+        commit: bool = True,
+    ) -> None:
+        """
+        Set different values on many rows in one executemany UPDATE, matched by the
+        primary key, every row must contain `id`.
+        """
+        if rows:
+            if "updated_at" in self.model.__table__.c:
+                now = datetime.now()
+                rows = [{"updated_at": now, **row} for row in rows]
+            await db.execute(update(self.model), rows)
+        if commit:
+            await db.commit()
+
+    async def bulk_upsert(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, dict[str, Any]]],
+        index_elements: Sequence[str] = ("id",),
+        update_columns: Optional[Sequence[str]] = None,
+        commit: bool = True,
+    ) -> list[ModelType]:
+        """
+        Insert or update many rows in a single INSERT ... ON CONFLICT DO UPDATE ...
+        RETURNING. All rows must provide the same columns.
+
+        `update_columns` defaults to every provided column except the conflict target.
+        """
+        if not objs_in:
+            return await self._commit_returned(db=db, db_objs=[], commit=commit)
+        rows = [self._to_row(obj_in) for obj_in in objs_in]
+        statement = pg_insert(self.model).values(rows)
+        if update_columns is None:
+            update_columns = [c for c in rows[0] if c not in index_elements]
+        set_ = {c: statement.excluded[c] for c in update_columns}
+        # onupdate defaults are not applied by ON CONFLICT
+        if "updated_at" in self.model.__table__.c and "updated_at" not in set_:
+            set_["updated_at"] = datetime.now()
+        q = await db.scalars(
+            statement.on_conflict_do_update(
+                index_elements=index_elements, set_=set_
+            ).returning(self.model),
+            execution_options={"populate_existing": True},
+        )
+        return await self._commit_returned(db=db, db_objs=q.all(), commit=commit)
+
     async def update(
         self,
         db: AsyncSession,
@@ -171,6 +285,26 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         )
         return q.scalars().all()
 
+    async def get_page_by_user(
+        self,
+        db: AsyncSession,
+        *,
+        user_model: User,
+        per_page: int = 100,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+    ) -> CursorPage:
+        paginator = CursorPaginator(
+            db,
+            select(self.model).where(self.model.creator_id == str(user_model.id)),
+            per_page,
+            cursor,
+            created_at_column=self.model.created_at,
+            id_column=getattr(self.model, self.model.__mapper__.primary_key[0].key),
+            offset=offset,
+        )
+        return await paginator.get_page()
+
     async def get_multiple_by_user_id(
         self, db: AsyncSession, user_id: UUID | str, limit: int = 0, offset: int = 0
     ) -> list[Optional[ModelType]]:
@@ -234,3 +368,52 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             raise HTTPException(status_code=400, detail=f"Object {id_} was not found")
 
         return await self.update(db=db, db_obj=db_obj, obj_in=obj_in)
+
+
+class ProbeStateMixin:
+    """
+    Probe state of remote agents (MCP servers, A2A cards), see `ProbeScheduler`.
+    """
+
+    async def list_due_probe_targets(self, db: AsyncSession) -> list[ProbeTarget]:
+        q = await db.execute(
+            select(
+                self.model.id,
+                self.model.server_url,
+                self.model.is_active,
+                self.model.content_hash,
+                self.model.etag,
+                self.model.probe_failures,
+            ).where(
+                or_(
+                    self.model.next_probe_at.is_(None),
+                    self.model.next_probe_at <= datetime.now(),
+                )
+            )
+        )
+        return [
+            ProbeTarget(
+                id=str(row.id),
+                url=row.server_url,
+                is_active=row.is_active,
+                content_hash=row.content_hash,
+                etag=row.etag,
+                failures=row.probe_failures,
+            )
+            for row in q.all()
+        ]
+
+    async def save_probe_states(
+        self, db: AsyncSession, states: list[tuple[dict[str, Any], list[str]]]
+    ) -> None:
+        """
+        Writes probe results as (state, row ids) pairs, one set-based UPDATE per
+        distinct state, so rows sharing a remote url are updated together.
+        """
+        if not states:
+            return
+        for values, ids in states:
+            await db.execute(
+                update(self.model).where(self.model.id.in_(ids)).values(**values)
+            )
+        await db.commit()
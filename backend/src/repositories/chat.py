@@ -1,4 +1,4 @@
-import copy
+from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 from src.models import ChatConversation, ChatMessage, User
 from src.repositories.base import CRUDBase
+from src.repositories.chat_archive import ChatHistoryPaginator, chat_archive_repo
 from src.schemas.api.chat.dto import BaseChatDTO, ChatDetailsDTO, ListChatsDTO
 from src.schemas.api.chat.schemas import (
     BaseChatMessage,
@@ -16,43 +17,56 @@ from src.schemas.api.chat.schemas import (
     UpdateConversation,
 )
 from src.utils.helpers import prettify_integrity_error_details
-from src.utils.pagination import paginate
+from src.utils.chat_context_cache import chat_context_cache, to_context_message
+from src.utils.pagination import cursor_page_response
 
 
 class ChatRepository(
     CRUDBase[ChatConversation, CreateConversation, UpdateConversation]
 ):
     async def list_chats(
-        self, db: AsyncSession, user_model: User, offset: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        user_model: User,
+        offset: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
     ):
-        chats = await self.get_multiple_by_user(
-            db=db, user_model=user_model, offset=offset, limit=limit
+        page = await self.get_page_by_user(
+            db=db, user_model=user_model, per_page=limit, cursor=cursor, offset=offset
+        )
+        return ListChatsDTO(
+            chats=[BaseChatDTO(**chat.__dict__) for chat in page.items],
+            next_cursor=page.next_cursor,
+            previous_cursor=page.previous_cursor,
         )
-        return ListChatsDTO(chats=[BaseChatDTO(**chat.__dict__) for chat in chats])
 
     async def get_chat_history(
         self, db: AsyncSession, user_model: User, session_id: UUID
     ):
-        q = await db.execute(
-            select(self.model)
-            .options(joinedload(self.model.messages))
-            .where(
-                and_(
-                    self.model.session_id == session_id,
-                    self.model.creator_id == str(user_model.id),
-                )
-            )
+        chat = await self.get_chat_by_session_id(
+            db=db, user_model=user_model, session_id=session_id
         )
-        chat = q.scalars().first()
         if not chat:
             return
 
+        archived = await chat_archive_repo.read_messages(
+            db, conversation_id=session_id, user_id=user_model.id, older=False
+        )
+        hot = await db.scalars(
+            select(ChatMessage)
+            .where(ChatMessage.conversation_id == session_id)
+            .order_by(ChatMessage.created_at, ChatMessage.id)
+        )
         return ChatDetailsDTO(
             title=chat.title,
             created_at=chat.created_at,
             updated_at=chat.updated_at,
             session_id=chat.session_id,
-            messages=[GetChatMessage(**msg.__dict__) for msg in chat.messages],
+            messages=[
+                GetChatMessage.model_validate(msg, from_attributes=True)
+                for msg in [*archived, *hot]
+            ],
         )
 
     async def get_paginated_chat_history(
@@ -60,8 +74,10 @@ class ChatRepository(
         db: AsyncSession,
         user_id: UUID,
         session_id: UUID,
-        page: int,
         per_page: int,
+        cursor: Optional[str] = None,
+        with_total_count: bool = False,
+        offset: int = 0,
     ):
         q = (
             select(ChatMessage)
@@ -72,10 +88,51 @@ class ChatRepository(
                     self.model.creator_id == user_id,
                 )
             )
-            .order_by(ChatMessage.created_at.desc())
         )
-        return await paginate(
-            db=db, query=q, cast_to=GetChatMessage, page=page, per_page=per_page
+        if (
+            cursor
+            or offset
+            or with_total_count
+            or per_page > chat_context_cache.window_size
+        ):
+            paginator = ChatHistoryPaginator(
+                db,
+                q,
+                per_page,
+                cursor,
+                conversation_id=session_id,
+                user_id=user_id,
+                offset=offset,
+                with_total_count=with_total_count,
+            )
+            return await paginator.get_response(cast_to=GetChatMessage)
+
+        page = await chat_context_cache.get_page(
+            session_id=session_id, user_id=user_id, per_page=per_page
+        )
+        if page:
+            return cursor_page_response(page=page, cast_to=GetChatMessage)
+
+        # cache miss, load the whole window once so the following turns skip Postgres
+        window_page = await ChatHistoryPaginator(
+            db,
+            q,
+            chat_context_cache.window_size,
+            conversation_id=session_id,
+            user_id=user_id,
+        ).get_page()
+        if not window_page.items:
+            return cursor_page_response(page=window_page, cast_to=GetChatMessage)
+
+        window = await chat_context_cache.warm(
+            session_id=session_id,
+            user_id=user_id,
+            messages=[to_context_message(m) for m in reversed(window_page.items)],
+            complete=window_page.next_cursor is None,
+        )
+        return cursor_page_response(
+            page=chat_context_cache.window_page(window=window, per_page=per_page),
+            cast_to=GetChatMessage,
         )
 
     async def get_chat_by_session_id(
@@ -185,6 +242,7 @@ class ChatRepository(
             return None
         await db.delete(obj)
         await db.commit()
+        await chat_context_cache.invalidate(session_id=session_id)
         # result returns either cursor obj or None
         return obj
 
@@ -196,9 +254,7 @@ class ChatRepository(
         request_id: str,
         message_in: BaseChatMessage,
     ):
-        user = copy.deepcopy(user_model)
-
-        chat = await self.get_chat_history_by_session_id(
+        chat = await self.get_chat_by_session_id(
             db=db, user_model=user_model, session_id=session_id
         )
         if not chat:
@@ -216,10 +272,11 @@ class ChatRepository(
         db.add(new_message)
         await db.commit()
         await db.refresh(new_message)
-
-        return await self.get_chat_history(
-            db=db, user_model=user, session_id=session_id
+        await chat_context_cache.append(
+            session_id=session_id, message=to_context_message(new_message)
         )
 
+        return new_message
+
 
 chat_repo = ChatRepository(ChatConversation)
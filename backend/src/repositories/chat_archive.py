@@ -0,0 +1,307 @@
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+import orjson
+from sqlalchemy import Select, delete, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.models import ChatConversation, ChatMessage, ChatMessageArchive
+from src.utils.cpu_offload import cpu_offload
+from src.utils.enums import CursorDirection, SenderType
+from src.utils.pagination import CursorPaginator
+
+Key = tuple[datetime, UUID]
+
+ARCHIVED_COLUMNS = (
+    ChatMessage.id,
+    ChatMessage.request_id,
+    ChatMessage.sender_type,
+    ChatMessage.content,
+    ChatMessage.extra_metadata,
+    ChatMessage.created_at,
+    ChatMessage.updated_at,
+)
+
+
+@dataclass
+class ArchivedChatMessage:
+    """Message read back from an archived block, shaped like a `ChatMessage` row"""
+
+    id: UUID
+    request_id: Optional[UUID]
+    sender_type: SenderType
+    content: str
+    extra_metadata: Optional[Any]
+    created_at: datetime
+    updated_at: datetime
+
+    @property
+    def key(self) -> Key:
+        return self.created_at, self.id
+
+
+def compress_messages(messages: list[dict]) -> bytes:
+    return zlib.compress(orjson.dumps(messages))
+
+
+def decompress_messages(blob: bytes) -> list[ArchivedChatMessage]:
+    return [
+        ArchivedChatMessage(
+            id=UUID(m["id"]),
+            request_id=UUID(m["request_id"]) if m["request_id"] else None,
+            sender_type=SenderType(m["sender_type"]),
+            content=m["content"],
+            extra_metadata=m["extra_metadata"],
+            created_at=datetime.fromisoformat(m["created_at"]),
+            updated_at=datetime.fromisoformat(m["updated_at"]),
+        )
+        for m in orjson.loads(zlib.decompress(blob))
+    ]
+
+
+class ChatArchiveRepository:
+    """
+    The oldest messages of long chats are moved out of chatmessages into compressed
+    blocks, so the hot table and its indexes only hold the recent messages of every
+    chat. Archived messages are always older than the hot ones of their chat, reads
+    continue into the archive where the hot rows end.
+    """
+
+    async def list_candidates(
+        self, db: AsyncSession, keep_recent: int, block_size: int, limit: int
+    ) -> list[UUID]:
+        """Chats with at least one full block past their `keep_recent` newest messages"""
+        q = await db.execute(
+            select(ChatMessage.conversation_id)
+            .where(ChatMessage.conversation_id.is_not(None))
+            .group_by(ChatMessage.conversation_id)
+            .having(func.count() >= keep_recent + block_size)
+            .limit(limit)
+        )
+        return list(q.scalars())
+
+    async def archive_conversation(
+        self,
+        db: AsyncSession,
+        conversation_id: UUID,
+        keep_recent: int,
+        block_size: int,
+    ) -> int:
+        """
+        Moves the oldest messages of the chat into blocks of `block_size` messages
+        until only `keep_recent` (up to a block more) stay hot. Every block is
+        written in its own short transaction, the chat stays writable meanwhile.
+
+        Returns: number of archived messages
+        """
+        hot = await db.scalar(
+            select(func.count()).where(ChatMessage.conversation_id == conversation_id)
+        )
+        archived = 0
+        for _ in range((hot - keep_recent) // block_size):
+            moved = await self._archive_block(
+                db, conversation_id=conversation_id, block_size=block_size
+            )
+            if not moved:
+                break
+            archived += moved
+        return archived
+
+    async def _archive_block(
+        self, db: AsyncSession, conversation_id: UUID, block_size: int
+    ) -> int:
+        q = await db.execute(
+            select(*ARCHIVED_COLUMNS)
+            .where(ChatMessage.conversation_id == conversation_id)
+            .order_by(ChatMessage.created_at, ChatMessage.id)
+            .limit(block_size)
+            .with_for_update()
+        )
+        rows = [row._asdict() for row in q.all()]
+        if len(rows) < block_size:
+            await db.rollback()
+            return 0
+
+        blob = await cpu_offload.run(
+            compress_messages, rows, task_name="chat_archive_compress"
+        )
+        first, last = rows[0], rows[-1]
+        db.add(
+            ChatMessageArchive(
+                conversation_id=conversation_id,
+                first_created_at=first["created_at"],
+                first_message_id=first["id"],
+                last_created_at=last["created_at"],
+                last_message_id=last["id"],
+                message_count=len(rows),
+                messages=blob,
+            )
+        )
+        await db.execute(
+            delete(ChatMessage)
+            .where(ChatMessage.id.in_([row["id"] for row in rows]))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return len(rows)
+
+    def _blocks_query(self, conversation_id: UUID, user_id: UUID) -> Select:
+        return (
+            select(ChatMessageArchive)
+            .join(
+                ChatConversation,
+                ChatConversation.session_id == ChatMessageArchive.conversation_id,
+            )
+            .where(
+                ChatMessageArchive.conversation_id == conversation_id,
+                ChatConversation.creator_id == user_id,
+            )
+        )
+
+    async def read_messages(
+        self,
+        db: AsyncSession,
+        conversation_id: UUID,
+        user_id: UUID,
+        boundary: Optional[Key] = None,
+        older: bool = True,
+        limit: Optional[int] = None,
+    ) -> list[ArchivedChatMessage]:
+        """
+        Archived messages past the `(created_at, id)` boundary, newest first when
+        reading `older` messages and oldest first otherwise. Blocks are fetched and
+        decompressed one at a time, only as many as `limit` needs.
+        """
+        bound = boundary
+        first_key = tuple_(
+            ChatMessageArchive.first_created_at, ChatMessageArchive.first_message_id
+        )
+        last_key = tuple_(
+            ChatMessageArchive.last_created_at, ChatMessageArchive.last_message_id
+        )
+        columns = (
+            ChatMessageArchive.last_created_at,
+            ChatMessageArchive.last_message_id,
+        )
+        query = (
+            self._blocks_query(conversation_id=conversation_id, user_id=user_id)
+            .order_by(*(c.desc() if older else c.asc() for c in columns))
+            .limit(1)
+        )
+
+        messages: list[ArchivedChatMessage] = []
+        while limit is None or len(messages) < limit:
+            block_query = query
+            if bound:
+                block_query = query.where(
+                    first_key < bound if older else last_key > bound
+                )
+            block = await db.scalar(block_query)
+            if not block:
+                break
+
+            block_messages = await cpu_offload.run(
+                decompress_messages, block.messages, task_name="chat_archive_decompress"
+            )
+            if older:
+                block_messages.reverse()
+            messages += [
+                m
+                for m in block_messages
+                if not bound or (m.key < bound if older else m.key > bound)
+            ]
+            bound = (
+                (block.first_created_at, block.first_message_id)
+                if older
+                else (block.last_created_at, block.last_message_id)
+            )
+        return messages[:limit]
+
+    async def count_messages(
+        self, db: AsyncSession, conversation_id: UUID, user_id: UUID
+    ) -> int:
+        blocks = self._blocks_query(
+            conversation_id=conversation_id, user_id=user_id
+        ).subquery()
+        count = await db.scalar(select(func.sum(blocks.c.message_count)))
+        return count or 0
+
+
+class ChatHistoryPaginator(CursorPaginator):
+    """
+    Newest first history of a chat across chatmessages and its archived blocks.
+    Pages walking to older messages continue into the archive where the hot rows
+    end, pages walking back to newer ones start in the archive and continue into
+    the hot rows.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        query: Select,
+        per_page: int,
+        cursor: Optional[str] = None,
+        *,
+        conversation_id: UUID,
+        user_id: UUID,
+        offset: int = 0,
+        with_total_count: bool = False,
+    ):
+        super().__init__(
+            session,
+            query,
+            per_page,
+            cursor,
+            created_at_column=ChatMessage.created_at,
+            id_column=ChatMessage.id,
+            offset=offset,
+            with_total_count=with_total_count,
+        )
+        self.conversation_id = conversation_id
+        self.user_id = user_id
+
+    async def _read_archive(
+        self, boundary: Optional[tuple], older: bool, limit: int
+    ) -> list[ArchivedChatMessage]:
+        return await chat_archive_repo.read_messages(
+            self.session,
+            conversation_id=self.conversation_id,
+            user_id=self.user_id,
+            boundary=boundary,
+            older=older,
+            limit=limit,
+        )
+
+    async def _fetch_rows(self, direction: CursorDirection) -> list:
+        limit = self.per_page + 1
+        older = direction == CursorDirection.next
+        if older:
+            rows = await super()._fetch_rows(direction)
+        else:
+            rows = await self._read_archive(self._boundary(), older=False, limit=limit)
+        if len(rows) >= limit:
+            return rows
+
+        boundary = (rows[-1].created_at, rows[-1].id) if rows else self._boundary()
+        if older:
+            # an offset past all hot rows continues that far into the archive
+            skip = 0
+            if self.offset and not rows and not self.cursor:
+                skip = max(self.offset - await super()._count(), 0)
+            archived = await self._read_archive(
+                boundary, older=True, limit=skip + limit - len(rows)
+            )
+            return rows + archived[skip:]
+        query = self._build_query(direction, boundary=boundary, limit=limit - len(rows))
+        return rows + list(await self.session.scalars(query))
+
+    async def _count(self) -> int:
+        archived = await chat_archive_repo.count_messages(
+            self.session, conversation_id=self.conversation_id, user_id=self.user_id
+        )
+        return await super()._count() + archived
+
+
+chat_archive_repo = ChatArchiveRepository()
@@ -1,16 +1,19 @@
-import pathlib
+from datetime import datetime, timedelta
 from typing import List, Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
-from sqlalchemy import and_, select
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.models import File, User
+from src.models import File, FileUpload, User
 from src.repositories.base import CRUDBase
 from src.schemas.api.files.dto import FileDTO, FilePathDTO, ShortFileDTO
-from src.schemas.api.files.schemas import FileCreate, FileUpdate
-from src.utils.constants import FILES_DIR
+from src.schemas.api.files.schemas import FileCreate, FileUpdate, FileUploadCreate
 from src.utils.enums import FileValidationOutputChoice
+from src.utils.file_cache import file_cache
+from src.utils.file_storage import file_storage
+from src.utils.pagination import CursorPage
 
 
 class FilesRepository(CRUDBase[File, FileCreate, FileUpdate]):
@@ -30,7 +33,7 @@ class FilesRepository(CRUDBase[File, FileCreate, FileUpdate]):
         """
         existing_files: list[Optional[File]] = []
         for file in files:
-            if (FILES_DIR / file.internal_name).exists():
+            if await file_storage.exists(file.internal_name):
                 existing_files.append(file)
         if return_type == FileValidationOutputChoice.file_id:
             return [file.id for file in existing_files]
@@ -78,6 +81,8 @@ class FilesRepository(CRUDBase[File, FileCreate, FileUpdate]):
             internal_name=file_obj.internal_name,
             from_agent=file_obj.from_agent,
             creator_id=file_obj.creator_id,
+            content_hash=file_obj.content_hash,
+            size=file_obj.size,
         )
 
     async def get_file_content_by_id(
@@ -89,18 +94,26 @@ class FilesRepository(CRUDBase[File, FileCreate, FileUpdate]):
         file_obj = await self.get_file_by_id(
             db=db, file_id=file_id, user_model=user_model
         )
-        file = pathlib.Path(FILES_DIR / file_obj.internal_name)
-        if not file.exists():
+        if not file_obj:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File with id {file_id} does not exist",
+            )
+        if not await file_storage.exists(file_obj.internal_name):
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Metadata of file {file_obj.internal_id} exists, but file was not found",
             )
+        # fp is the name of the file in the storage backend
         return FilePathDTO(
-            fp=file, mime_type=file_obj.mimetype, file_name=file_obj.internal_name
+            fp=file_obj.internal_name,
+            mime_type=file_obj.mimetype or "application/octet-stream",
+            file_name=file_obj.original_name or file_obj.internal_name,
+            size=file_obj.size,
         )
 
     async def list_files_by_request_id(
-        self, db: AsyncSession, request_id: str
+        self, db: AsyncSession, request_id: str, user_model: User
     ) -> Optional[List[FileDTO]]:
         """
         Retrieves a list of files metadata by 'request_id',
@@ -110,12 +123,16 @@ class FilesRepository(CRUDBase[File, FileCreate, FileUpdate]):
         Args:
             db: The database session.
             request_id: request_id generated in the websocket endpoint on initial frontend message
+            user_model: owner of the files
 
         Returns:
             List of file ids objects with file metadata.
         """
         q = await db.execute(
-            select(self.model).where(self.model.request_id == request_id)
+            select(self.model).where(
+                self.model.request_id == request_id,
+                self.model.creator_id == user_model.id,
+            )
         )
         files = q.scalars().all()
         return await self._validate_files_exist_by_metadata(
@@ -139,40 +156,69 @@ class FilesRepository(CRUDBase[File, FileCreate, FileUpdate]):
             db: The database session.
             file_ids: list of the uuid file_ids
             session_id: session_id generated in the websocket endpoint on initial frontend message
-            request_id: request_id provided in frontend message
+            request_id: request_id generated in the websocket endpoint
 
         Returns:
             List of file ids objects with file metadata.
         """
-        q = await db.execute(
-            select(self.model).where(
-                and_(
-                    self.model.id.in_(file_ids), self.model.creator_id == user_model.id
-                )
-            )
+        files = await self.bulk_update(
+            db=db,
+            ids=file_ids,
+            values={"request_id": request_id, "session_id": session_id},
+            user_model=user_model,
         )
-        files = q.scalars().all()
         for file in files:
-            file.request_id = request_id
-            file.session_id = session_id
+            file_cache.invalidate(file.id)
 
-        await db.commit()
+        return [FileDTO(**file.__dict__) for file in files]
 
-        updated_files = []
-        for file in files:
-            await db.refresh(file)
-            updated_files.append(FileDTO(**file.__dict__))
+    async def get_files_metadata_by_user(
+        self,
+        db: AsyncSession,
+        user_model: User,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> CursorPage:
+        page = await self.get_page_by_user(
+            db=db, user_model=user_model, per_page=limit, cursor=cursor, offset=offset
+        )
+        page.items = [FileDTO(**file.__dict__) for file in page.items]
+        return page
 
-        return updated_files
+    async def delete_file_by_user(
+        self, db: AsyncSession, file_id: str, user_model: User
+    ) -> Optional[File]:
+        """
+        Deletes file metadata, the stored content is removed only once no other
+        file shares it.
+        """
+        file_obj = await self.delete_by_user(db=db, id_=file_id, user=user_model)
+        if not file_obj:
+            return None
+        file_cache.invalidate(file_id)
 
-    async def get_files_metadata_by_user(
-        self, db: AsyncSession, user_model: User, limit: int = 100, offset: int = 0
-    ) -> list[Optional[FileDTO]]:
-        results = await self.get_multiple_by_user(
-            db=db, user_model=user_model, offset=offset, limit=limit
+        # uploads store content and create the file referencing it holding the same
+        # lock, the content can't gain a file between the check and the removal
+        await self.lock_content(db=db, internal_name=file_obj.internal_name)
+        still_used = await db.scalar(
+            select(self.model.id)
+            .where(self.model.internal_name == file_obj.internal_name)
+            .limit(1)
         )
+        if not still_used:
+            await file_storage.delete(file_obj.internal_name)
+        await db.commit()
+        return file_obj
 
-        return [FileDTO(**file.__dict__) for file in results]
+    async def lock_content(self, db: AsyncSession, internal_name: str) -> None:
+        """
+        Lock the stored content shared under `internal_name` until the end of the
+        transaction.
+        """
+        await db.execute(
+            select(func.pg_advisory_xact_lock(func.hashtext(internal_name)))
+        )
 
     async def get_files_by_session_id(
         self, db: AsyncSession, session_id: UUID, user_id: UUID
@@ -191,4 +237,168 @@ class FilesRepository(CRUDBase[File, FileCreate, FileUpdate]):
         ]
 
 
+class FileUploadsRepository(CRUDBase[FileUpload, FileUploadCreate, FileUploadCreate]):
+    def _is_unclaimed(self):
+        # compared on the database clock, claims are set with it too
+        return or_(
+            self.model.claimed_until.is_(None), self.model.claimed_until <= func.now()
+        )
+
+    def _being_written(self, upload_id: str) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload {upload_id} is being written by another request",
+        )
+
+    async def lock_by_user(
+        self, db: AsyncSession, upload_id: str, user_model: User
+    ) -> FileUpload:
+        """
+        Lock the upload row until the end of the transaction, so it can't be
+        completed or removed while a chunk is written. Fails fast instead of waiting.
+        """
+        try:
+            q = await db.execute(
+                select(self.model, self._is_unclaimed())
+                .where(
+                    and_(
+                        self.model.id == upload_id,
+                        self.model.creator_id == user_model.id,
+                    )
+                )
+                .with_for_update(nowait=True, of=self.model)
+            )
+        except DBAPIError:
+            await db.rollback()
+            raise self._being_written(upload_id)
+        row = q.first()
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Upload {upload_id} does not exist",
+            )
+        upload, is_unclaimed = row
+        if not is_unclaimed:
+            await db.rollback()
+            raise self._being_written(upload_id)
+        return upload
+
+    async def claim(
+        self,
+        db: AsyncSession,
+        upload_id: str,
+        user_model: User,
+        offset: int,
+        timeout: int,
+    ) -> FileUpload:
+        """
+        Claim the upload for writing a chunk at `offset` in a short transaction, no
+        row lock is held while the chunk streams in. The claim is released by
+        `confirm` or `release`, or lapses after `timeout` seconds.
+
+        Returns: detached upload, carrying the `claim_id` to confirm with
+        """
+        upload = await db.scalar(
+            update(self.model)
+            .where(
+                self.model.id == upload_id,
+                self.model.creator_id == user_model.id,
+                self.model.received_bytes == offset,
+                self._is_unclaimed(),
+            )
+            .values(
+                claim_id=uuid4(),
+                claimed_until=func.now() + timedelta(seconds=timeout),
+            )
+            .returning(self.model)
+        )
+        if upload:
+            db.expunge(upload)
+            await db.commit()
+            return upload
+
+        received_bytes = await db.scalar(
+            select(self.model.received_bytes).where(
+                self.model.id == upload_id, self.model.creator_id == user_model.id
+            )
+        )
+        await db.rollback()
+        if received_bytes is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Upload {upload_id} does not exist",
+            )
+        if received_bytes != offset:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload {upload_id} expects the next chunk at offset {received_bytes}",  # noqa: E501
+            )
+        raise self._being_written(upload_id)
+
+    async def confirm(
+        self, db: AsyncSession, upload: FileUpload, received_bytes: int
+    ) -> FileUpload:
+        """
+        Advance the offset of a claimed upload and release the claim, fails if the
+        claim lapsed and the upload was claimed by another request meanwhile.
+        """
+        confirmed = await db.scalar(
+            update(self.model)
+            .where(self.model.id == upload.id, self.model.claim_id == upload.claim_id)
+            .values(received_bytes=received_bytes, claim_id=None, claimed_until=None)
+            .returning(self.model)
+        )
+        if not confirmed:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Claim of upload {upload.id} expired, resume from its current offset",  # noqa: E501
+            )
+        db.expunge(confirmed)
+        await db.commit()
+        return confirmed
+
+    async def release(self, db: AsyncSession, upload: FileUpload) -> None:
+        """
+        Drop the claim without advancing the offset, bytes written past it are
+        overwritten by the next chunk.
+        """
+        await db.execute(
+            update(self.model)
+            .where(self.model.id == upload.id, self.model.claim_id == upload.claim_id)
+            .values(claim_id=None, claimed_until=None)
+        )
+        await db.commit()
+
+    async def complete(
+        self,
+        db: AsyncSession,
+        upload: FileUpload,
+        file_in: FileCreate,
+        user_model: User,
+    ) -> File:
+        """
+        Create the file metadata and drop the upload in a single transaction.
+        """
+        file = File(**file_in.model_dump(mode="json"))
+        file.creator_id = str(user_model.id)
+        db.add(file)
+        await db.delete(upload)
+        await db.commit()
+        await db.refresh(file)
+        return file
+
+    async def delete_expired(
+        self, db: AsyncSession, updated_before: datetime
+    ) -> list[str]:
+        q = await db.execute(
+            delete(self.model)
+            .where(self.model.updated_at < updated_before)
+            .returning(self.model.id)
+        )
+        await db.commit()
+        return [str(upload_id) for upload_id in q.scalars().all()]
+
+
 files_repo = FilesRepository(File)
+file_uploads_repo = FileUploadsRepository(FileUpload)
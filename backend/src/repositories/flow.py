@@ -126,46 +126,37 @@ class AgentWorkflowRepository(
 
     async def set_inactive_for_all_flows_where_deleted_agent_exists(
         self, db: AsyncSession, agent_id: str, user_model: User
-    ):
+    ) -> list[str]:
         """
-            Deletes all flows that contain the specified agent ID.
+            Sets as inactive all active flows of the user that contain the specified agent ID.
 
             Args:
                 db: The database session.
                 agent_id: The ID of the agent to search for in flows.
+                user_model: The User model representing the owner of the flows.
 
             Returns:
-                A list of Flow IDs that were deleted, or None if no flows were found containing
-        the agent.
+                A list of Flow IDs that were set as inactive.
 
             Note:
-                This function identifies and deletes flows containing the provided agent ID.
+                Flows are matched by containment (`flow @> '[{"id": agent_id}]'`),
+        which is served by the GIN index on `agentworkflows.flow`.
         """
         q = await db.execute(
-            select(self.model).where(
+            update(self.model)
+            .where(
                 and_(
                     self.model.creator_id == str(user_model.id),
                     self.model.is_active.is_(True),
+                    self.model.flow.contains([{"id": str(agent_id)}]),
                 )
             )
+            .values(is_active=False)
+            .returning(self.model.id)
         )
-        flows = q.scalars().all()
-
-        flow_ids_to_update: list[Optional[str]] = []
-        for flow in flows:
-            flow_list = flow.flow
-            agent_ids = [agent["id"] for agent in flow_list]
-            if agent_id in agent_ids:
-                flow_ids_to_update.append({"id": str(flow.id), "is_active": False})
-
-        if flow_ids_to_update:
-            await db.run_sync(
-                lambda sync_db: sync_db.bulk_update_mappings(
-                    self.model, flow_ids_to_update
-                )
-            )
-            await db.commit()
-        return None
+        flow_ids = [str(flow_id) for flow_id in q.scalars().all()]
+        await db.commit()
+        return flow_ids
 
     async def set_multiple_flow_as_inactive(
         self, db: AsyncSession, flow_ids: list[Optional[str]], user_id: UUID | str
@@ -241,11 +232,8 @@ class AgentWorkflowRepository(
                 status_code=400, detail=f"Flow with id '{flow_id}' does not exist"
             )
 
-        validator = FlowValidator()
-        updated_flow = await validator.trigger_flow_state_lookup_of_all_agents(
-            flow=flow, user_id=user_model.id
-        )
-        return updated_flow
+        flows = await self.sync_flows_state(db=db, flows=[flow], user_model=user_model)
+        return flows[0]
 
     async def get_all_flows_and_validate_all_flow_agents(
         self,
@@ -257,12 +245,43 @@ class AgentWorkflowRepository(
         flows = await self.get_multiple_by_user(
             db=db, user_model=user_model, offset=offset, limit=limit
         )
-        return [
-            await self.get_flow_and_validate_all_flow_agents(
-                db=db, flow_id=f.id, user_model=user_model
-            )
-            for f in flows
-        ]
+        return await self.sync_flows_state(db=db, flows=flows, user_model=user_model)
+
+    async def sync_flows_state(
+        self, db: AsyncSession, flows: list[AgentWorkflow], user_model: User
+    ) -> list[AgentWorkflow]:
+        """
+        Recomputes `is_active` of the flows, changed states are written back with a
+        single UPDATE ... RETURNING per target state.
+        """
+        if not flows:
+            return flows
+        validator = FlowValidator()
+        states = await validator.get_flows_state(flows=flows, user_id=user_model.id)
+
+        changed = False
+        for is_active in (True, False):
+            flow_ids = [
+                flow.id
+                for flow in flows
+                if states[str(flow.id)] == is_active and flow.is_active != is_active
+            ]
+            if flow_ids:
+                await self.bulk_update(
+                    db=db,
+                    ids=flow_ids,
+                    values={"is_active": is_active},
+                    user_model=user_model,
+                    commit=False,
+                )
+                changed = True
+
+        if changed:
+            # keep the loaded state of returned flows instead of expiring it on commit
+            for flow in flows:
+                db.expunge(flow)
+            await db.commit()
+        return flows
 
 
 agentflow_repo = AgentWorkflowRepository(AgentWorkflow)
@@ -1,9 +1,26 @@
+from logging import getLogger
 from typing import Optional
-from src.schemas.ws.log import LogCreate, LogUpdate, LogEntryDTO
+from src.schemas.ws.log import LogCreate, LogUpdate, LogEntryDTO, LogEntry
 from src.repositories.base import CRUDBase
-from src.models import Log
+from src.models import ChatConversation, Log
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import exists, insert, select, text, tuple_
+from sqlalchemy.exc import DBAPIError
+from src.utils.filters import LogFilter
+from src.utils.pagination import decode_cursor
+
+logger = getLogger(__name__)
+
+LOG_COPY_COLUMNS = (
+    "session_id",
+    "request_id",
+    "agent_id",
+    "creator_id",
+    "message",
+    "log_level",
+    "created_at",
+    "updated_at",
+)
 
 
 class LogRepository(CRUDBase[Log, LogCreate, LogUpdate]):
@@ -19,5 +36,113 @@ class LogRepository(CRUDBase[Log, LogCreate, LogUpdate]):
         q = await db.execute(select(self.model).where(self.model.request_id == id_))
         return [LogEntryDTO(**log.__dict__) for log in q.scalars().all()]
 
+    async def list_after_cursor(
+        self,
+        db: AsyncSession,
+        filters: LogFilter,
+        cursor: Optional[str] = None,
+        limit: int = 500,
+    ) -> list[Log]:
+        """
+        Oldest first batch of logs matching the filters, continuing after `cursor`.
+        """
+        conditions = []
+        if filters.session_id:
+            conditions.append(self.model.session_id == filters.session_id)
+        if filters.request_id:
+            conditions.append(self.model.request_id == filters.request_id)
+        if filters.log_level:
+            conditions.append(self.model.log_level.in_(filters.log_level))
+        if filters.agent_id:
+            conditions.append(self.model.agent_id == filters.agent_id)
+        if filters.since:
+            conditions.append(self.model.created_at >= filters.since)
+        if filters.until:
+            conditions.append(self.model.created_at < filters.until)
+        if filters.creator_id:
+            conditions.append(
+                exists().where(
+                    ChatConversation.session_id == self.model.session_id,
+                    ChatConversation.creator_id == filters.creator_id,
+                )
+            )
+        if cursor:
+            created_at, id_, _ = decode_cursor(cursor)
+            key = tuple_(self.model.created_at, self.model.id)
+            conditions.append(key > (created_at, int(id_)))
+
+        q = await db.scalars(
+            select(self.model)
+            .where(*conditions)
+            .order_by(self.model.created_at, self.model.id)
+            .limit(limit)
+        )
+        return q.all()
+
+    async def copy_many(self, db: AsyncSession, logs: list[LogEntry]) -> int:
+        """
+        Bulk load logs with COPY, bypassing the ORM unit of work entirely.
+
+        COPY is all or nothing, if it fails the batch is inserted row by row so only
+        the rows the database rejects are dropped. Returns the number of rows written.
+        """
+        records = [
+            tuple(getattr(log, column) for column in LOG_COPY_COLUMNS) for log in logs
+        ]
+        try:
+            conn = await db.connection()
+            raw_conn = await conn.get_raw_connection()
+            await raw_conn.driver_connection.copy_records_to_table(
+                self.model.__tablename__, records=records, columns=LOG_COPY_COLUMNS
+            )
+        except Exception as e:
+            await db.rollback()
+            logger.warning(
+                f"COPY of {len(records)} logs failed, inserting them one by one. "
+                f"Details: {e!r}"
+            )
+            return await self._insert_each(db=db, records=records)
+
+        await db.commit()
+        return len(records)
+
+    async def _insert_each(self, db: AsyncSession, records: list[tuple]) -> int:
+        inserted = 0
+        for record in records:
+            try:
+                # a savepoint per row, a rejected row doesn't abort the others
+                async with db.begin_nested():
+                    await db.execute(
+                        insert(self.model).values(dict(zip(LOG_COPY_COLUMNS, record)))
+                    )
+                inserted += 1
+            except DBAPIError as e:
+                if e.connection_invalidated:
+                    raise
+                logger.warning(f"Dropped an invalid log. Details: {e.orig!r}")
+        await db.commit()
+        return inserted
+
+    async def maintain_partitions(
+        self, db: AsyncSession, retention_days: int, days_ahead: int
+    ) -> tuple[int, int]:
+        """
+        Create daily partitions up to `days_ahead` days from today and drop the ones
+        older than `retention_days`. Returns amounts of created and dropped partitions.
+        """
+        created = await db.scalar(
+            text(
+                "SELECT create_logs_partitions("
+                "current_date, current_date + CAST(:days_ahead AS integer))"
+            ),
+            {"days_ahead": days_ahead},
+        )
+        dropped = await db.scalar(
+            text("SELECT drop_logs_partitions(:retention_days)"),
+            {"retention_days": retention_days},
+        )
+        await db.commit()
+        return created, dropped
+
 
 log_repo = LogRepository(Log)
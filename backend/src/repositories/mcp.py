@@ -1,8 +1,8 @@
 import logging
 import traceback
 import uuid
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import timedelta
+from typing import Any, Optional
 from uuid import UUID
 
 import httpx
@@ -11,18 +11,20 @@ from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
 from mcp.shared.exceptions import McpError
 from pydantic import AnyHttpUrl
-from sqlalchemy import and_, select, update
+from sqlalchemy import and_, delete, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from src.models import MCPServer, MCPTool, User
-from src.repositories.base import CRUDBase
+from src.repositories.base import CRUDBase, ProbeStateMixin
 from src.schemas.base import AgentDTOPayload
-from src.schemas.mcp.dto import MCPServerDTO, MCPToolDTO
+from src.schemas.mcp.dto import MCPServerDTO, MCPToolDTO, MCPToolsSyncDelta
 from src.schemas.mcp.schemas import MCPCreateServer, MCPServerData, MCPToolSchema
 from src.utils.enums import AgentType
 from src.utils.exceptions import InvalidToolNameException
 from src.utils.helpers import generate_alias, mcp_tool_to_json_schema
+from src.utils.pagination import CursorPage, CursorPaginator
+from src.utils.probe_scheduler import content_fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +45,7 @@ async def lookup_mcp_server(
     # During initial lookup of the server (during POST request to add a MCP server)
     # `url` will be of type AnyHttpUrl, which is used here to construct a base_url for the server
 
-    # `url` will be of string type only whenever celery beat task will invoke this lookup function.
+    # `url` will be of string type only whenever the background lookup job invokes this function.
     # In this case, trailing slash is trimmed
     try:
         async with streamablehttp_client(
@@ -73,89 +75,98 @@ async def lookup_mcp_server(
     return MCPServerData(is_active=False)
 
 
-class MCPRepository(CRUDBase[MCPServer, MCPToolSchema, MCPToolSchema]):
-    async def get_mcp_server_by_url(self, db: AsyncSession, mcp_server_url: str):
-        q = await db.scalars(
-            select(self.model).where(
-                and_(
-                    self.model.server_url == mcp_server_url,
-                )
-            )
-        )
-        return q.first()
-
-    async def update_mcp_server_with_tools(
-        self, db: AsyncSession, db_obj: MCPServer, obj_in: MCPServerData
-    ):
-        tools_in = obj_in.mcp_tools
-        tool_names = [t.name for t in tools_in]
-
-        q = await db.scalars(
-            select(MCPTool)
-            .where(
-                and_(MCPTool.name.in_(tool_names), MCPTool.mcp_server_id == db_obj.id)
+class MCPRepository(ProbeStateMixin, CRUDBase[MCPServer, MCPToolSchema, MCPToolSchema]):
+    @staticmethod
+    def _tool_fingerprint(
+        description: Optional[str], input_schema: dict, annotations: Optional[dict]
+    ) -> str:
+        return content_fingerprint([description, input_schema, annotations])
+
+    async def sync_tools_of_servers(
+        self, db: AsyncSession, server_ids: list[str], obj_in: MCPServerData
+    ) -> dict[str, MCPToolsSyncDelta]:
+        """
+        Syncs the tool catalog of every server row registered with the url of one
+        remote server. Tools are diffed by name and content hash: added and changed
+        tools are written with a single upsert (existing ones keep their ids and
+        aliases), removed tools with a single DELETE, unchanged tools aren't touched.
+
+        Returns: delta of the sync per server id
+        """
+        tools_in = {
+            t.name: {
+                "name": t.name,
+                "description": t.description,
+                "inputSchema": t.inputSchema,
+                "annotations": t.annotations.model_dump(mode="json")
+                if t.annotations
+                else None,
+            }
+            for t in obj_in.mcp_tools
+        }
+        fingerprints_in = {
+            name: self._tool_fingerprint(
+                tool["description"], tool["inputSchema"], tool["annotations"]
             )
-            .order_by(MCPTool.created_at.desc())
-        )
-
-        tool_alias_container = {
-            t.name: {"id": t.id, "alias": t.alias}
-            for t in q.all()
-            if t.name in tool_names
+            for name, tool in tools_in.items()
         }
 
-        tools_batch = [
-            {
-                **t.model_dump(mode="json"),
-                "id": tool_alias_container.get(t.name, {}).get("id", str(uuid.uuid4())),
-                "alias": tool_alias_container.get(t.name, {}).get(
-                    "alias", generate_alias(t.name)
-                ),
-                "mcp_server_id": db_obj.id,
-                "updated_at": datetime.now(),
-            }
-            for t in tools_in
-        ]
-
-        await db.run_sync(
-            lambda sync_db: sync_db.bulk_update_mappings(MCPTool, tools_batch)
+        q = await db.execute(
+            select(
+                MCPTool.id,
+                MCPTool.name,
+                MCPTool.alias,
+                MCPTool.mcp_server_id,
+                MCPTool.description,
+                MCPTool.inputSchema,
+                MCPTool.annotations,
+            ).where(MCPTool.mcp_server_id.in_(server_ids))
         )
-        await db.commit()
-        await db.refresh(db_obj)
-
-        db_obj.is_active = True
-        await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
-
-    async def update_mcp_server_resources(
-        self,
-        db: AsyncSession,
-        mcp_server_url: str,
-        obj_in: MCPServerData,
-    ):
-        mcp_server = await self.get_mcp_server_by_url(
-            db=db, mcp_server_url=mcp_server_url
-        )
-        if not mcp_server:
-            return None
+        existing_tools: dict[str, dict[str, Any]] = {}
+        tools_batch, removed_ids = [], []
+        for row in q.all():
+            server_tools = existing_tools.setdefault(str(row.mcp_server_id), {})
+            if row.name in server_tools:
+                # duplicates left by older refreshes, only one row per name is kept
+                removed_ids.append(row.id)
+                continue
+            server_tools[row.name] = row
+
+        deltas: dict[str, MCPToolsSyncDelta] = {}
+        for server_id in map(str, server_ids):
+            existing = existing_tools.get(server_id, {})
+            delta = deltas[server_id] = MCPToolsSyncDelta()
+
+            for name, tool in tools_in.items():
+                row = existing.get(name)
+                if not row:
+                    delta.added.append(name)
+                    tool_id, alias = str(uuid.uuid4()), generate_alias(name)
+                elif fingerprints_in[name] != self._tool_fingerprint(
+                    row.description, row.inputSchema, row.annotations
+                ):
+                    delta.changed.append(name)
+                    tool_id, alias = str(row.id), row.alias
+                else:
+                    continue
+                tools_batch.append(
+                    {**tool, "id": tool_id, "alias": alias, "mcp_server_id": server_id}
+                )
 
-        return await self.update_mcp_server_with_tools(
-            db=db, db_obj=mcp_server, obj_in=obj_in
-        )
+            for name, row in existing.items():
+                if name not in tools_in:
+                    delta.removed.append(name)
+                    removed_ids.append(row.id)
 
-    async def set_as_inactive(self, db: AsyncSession, server_url: str):
-        await db.execute(
-            update(self.model)
-            .where(self.model.server_url == server_url)
-            .values({"is_active": False})
-        )
+        await mcp_tool_repo.bulk_upsert(db=db, objs_in=tools_batch, commit=False)
+        if removed_ids:
+            await db.execute(delete(MCPTool).where(MCPTool.id.in_(removed_ids)))
         await db.commit()
-        logger.info(f"Set {server_url} as inactive")
+        return deltas
 
     async def list_active_mcp_servers(
         self, db: AsyncSession, user_id: UUID, limit: int, offset: int
-    ) -> list[MCPServerDTO]:
+    ) -> list[MCPServer]:
         q = await db.scalars(
             select(self.model)
             .options(selectinload(self.model.mcp_tools))
@@ -169,27 +180,8 @@ class MCPRepository(CRUDBase[MCPServer, MCPToolSchema, MCPToolSchema]):
             .limit(limit=limit)
             .offset(offset=offset)
         )
-        servers = q.all()
-        dto = []
-        for s in servers:
-            tools = []
-            for t in s.mcp_tools:
-                tools.append(MCPToolDTO(**t.__dict__))
-
-            dto.append(
-                MCPServerDTO(
-                    server_url=s.server_url,
-                    mcp_tools=tools,
-                    is_active=s.is_active,
-                    created_at=s.created_at,
-                    updated_at=s.updated_at,
-                )
-            )
-        return dto
-
-    async def list_remote_urls_of_all_servers(self, db: AsyncSession):
-        q = await db.scalars(select(self.model.server_url))
-        return q.all()
+        # DTOs are built by the caller, only for tools it doesn't have cached
+        return list(q.all())
 
     async def add_url(
         self, db: AsyncSession, data_in: MCPCreateServer, user_model: User
@@ -224,26 +216,23 @@ class MCPRepository(CRUDBase[MCPServer, MCPToolSchema, MCPToolSchema]):
             await db.flush()
             await db.refresh(mcp_in)
 
-            tools: list[Optional[MCPTool]] = []
-            for tool in mcp_server.mcp_tools:
-                aliased_name = generate_alias(tool.name)
-                tool_in = MCPTool(
-                    name=tool.name,
-                    alias=aliased_name,
-                    description=tool.description,
-                    inputSchema=tool.inputSchema,
-                    annotations=tool.annotations.model_dump(mode="json")
-                    if tool.annotations
-                    else None,
-                    mcp_server_id=mcp_in.id,
-                )
-                db.add(tool_in)
-                tools.append(tool_in)
-
-            await db.commit()
+            tools = await mcp_tool_repo.bulk_create(
+                db=db,
+                objs_in=[
+                    {
+                        "name": tool.name,
+                        "alias": generate_alias(tool.name),
+                        "description": tool.description,
+                        "inputSchema": tool.inputSchema,
+                        "annotations": tool.annotations.model_dump(mode="json")
+                        if tool.annotations
+                        else None,
+                        "mcp_server_id": mcp_in.id,
+                    }
+                    for tool in mcp_server.mcp_tools
+                ],
+            )
             await db.refresh(mcp_in)
-            for tool in tools:
-                await db.refresh(tool)
             tools_to_dto = [MCPToolDTO(**t.__dict__) for t in tools]
             tools_json_schema_dto = [
                 mcp_tool_to_json_schema(t, aliased_title=t.alias) for t in tools_to_dto
@@ -291,9 +280,15 @@ class MCPRepository(CRUDBase[MCPServer, MCPToolSchema, MCPToolSchema]):
         )
 
     async def get_all_mcp_tools_of_all_servers(
-        self, db: AsyncSession, user_model: User, limit: int, offset: int
-    ):
-        q = await db.scalars(
+        self,
+        db: AsyncSession,
+        user_model: User,
+        limit: int,
+        offset: int,
+        cursor: Optional[str] = None,
+    ) -> CursorPage:
+        paginator = CursorPaginator(
+            db,
             select(self.model)
             .options(selectinload(self.model.mcp_tools))
             .where(
@@ -301,13 +296,15 @@ class MCPRepository(CRUDBase[MCPServer, MCPToolSchema, MCPToolSchema]):
                     self.model.creator_id == user_model.id,
                     self.model.is_active == True,  # noqa: E712
                 )
-            )
-            .order_by(self.model.created_at)
-            .limit(limit=limit)
-            .offset(offset=offset)
+            ),
+            limit,
+            cursor,
+            created_at_column=self.model.created_at,
+            id_column=self.model.id,
+            descending=False,
+            offset=offset,
         )
-
-        return q.all()
+        return await paginator.get_page()
 
     async def get_all_mcp_tools_from_single_server(
         self, db: AsyncSession, user_model: User, id_: UUID
@@ -343,4 +340,9 @@ class MCPRepository(CRUDBase[MCPServer, MCPToolSchema, MCPToolSchema]):
         return q
 
 
+class MCPToolRepository(CRUDBase[MCPTool, MCPToolSchema, MCPToolSchema]):
+    pass
+
+
 mcp_repo = MCPRepository(MCPServer)
+mcp_tool_repo = MCPToolRepository(MCPTool)
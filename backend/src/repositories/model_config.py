@@ -5,7 +5,7 @@ from fastapi import HTTPException
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from src.auth.encrypt import decrypt_secret
+from src.auth.encrypt import decrypt_secret, encrypt_secret
 from src.models import ModelConfig, ModelProvider, User
 from src.repositories.base import CRUDBase
 from src.schemas.api.model_config.dto import ModelConfigDTO, ModelProviderDTO
@@ -15,6 +15,7 @@ from src.schemas.api.model_config.schemas import (
     ProviderCRUDCreate,
     ProviderCRUDUpdate,
 )
+from src.utils.cpu_offload import cpu_offload
 from src.utils.helpers import validate_and_encrypt_provider_api_key
 
 
@@ -291,8 +292,8 @@ class ModelConfigRepository(
             return await self.update(db=db, db_obj=provider_obj, obj_in=upd_in.dump())
 
         try:
-            new_api_key = decrypt_secret(upd_in.api_key)
-            prev_api_key = decrypt_secret(provider_obj.api_key)
+            new_api_key = await cpu_offload.run(decrypt_secret, upd_in.api_key)
+            prev_api_key = await cpu_offload.run(decrypt_secret, provider_obj.api_key)
             if prev_api_key == new_api_key:
                 return await self.update(
                     db=db, db_obj=provider_obj, obj_in=upd_in.dump()
@@ -302,16 +303,23 @@ class ModelConfigRepository(
             # encrypted key -> cryptography library raises ValueError -> apply encryption to the new value
             pass
 
-        api_key = validate_and_encrypt_provider_api_key(api_key=upd_in.api_key)
+        api_key = await cpu_offload.run(
+            validate_and_encrypt_provider_api_key,
+            api_key=upd_in.api_key,
+            task_name="encrypt_secret",
+        )
         upd_in.api_key = api_key
         return await self.update(db=db, db_obj=provider_obj, obj_in=upd_in.dump())
 
     async def create_provider(
         self, db: AsyncSession, provider_in: ProviderCRUDCreate, user_model: User
     ):
+        api_key = provider_in.api_key
+        if api_key:
+            api_key = await cpu_offload.run(encrypt_secret, api_key)
         p = ModelProvider(
             name=provider_in.name,
-            api_key=provider_in.api_key,
+            api_key=api_key,
             creator_id=user_model.id,
             provider_metadata=provider_in.metadata,
         )
@@ -0,0 +1,27 @@
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.models import ResourceVersion
+from src.utils.enums import CatalogResource
+
+
+class ResourceVersionRepository:
+    """Read side of the version counters, they are only written by db triggers."""
+
+    async def get_versions(
+        self, db: AsyncSession, user_id: UUID, resources: Sequence[CatalogResource]
+    ) -> list[int]:
+        q = await db.execute(
+            select(ResourceVersion.resource, ResourceVersion.version).where(
+                ResourceVersion.user_id == user_id,
+                ResourceVersion.resource.in_([r.value for r in resources]),
+            )
+        )
+        versions = dict(q.all())
+        # resources never written by the user have no row yet
+        return [versions.get(r.value, 0) for r in resources]
+
+
+resource_version_repo = ResourceVersionRepository()
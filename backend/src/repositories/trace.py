@@ -0,0 +1,51 @@
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.models import AgentTraceStep, User
+from src.repositories.base import CRUDBase
+from src.schemas.api.chat.dto import TraceStepDTO
+from src.schemas.api.chat.schemas import TraceStepEvent
+
+
+class TraceRepository(CRUDBase[AgentTraceStep, TraceStepEvent, TraceStepEvent]):
+    async def save_event(
+        self,
+        db: AsyncSession,
+        event: TraceStepEvent,
+        request_id: str,
+        session_id: str,
+        user_model: User,
+    ) -> None:
+        """
+        Writes a step as its events arrive, the finish event of a step updates the
+        row written by its start event.
+        """
+        await self.bulk_upsert(
+            db,
+            objs_in=[
+                {
+                    **event.model_dump(),
+                    "request_id": request_id,
+                    "session_id": session_id,
+                    "creator_id": user_model.id,
+                }
+            ],
+            index_elements=("request_id", "step_id"),
+        )
+
+    async def list_by_request(
+        self, db: AsyncSession, request_id: UUID, user_model: User
+    ) -> list[TraceStepDTO]:
+        q = await db.scalars(
+            select(self.model)
+            .where(
+                self.model.request_id == request_id,
+                self.model.creator_id == user_model.id,
+            )
+            .order_by(self.model.created_at)
+        )
+        return [TraceStepDTO.model_validate(s, from_attributes=True) for s in q.all()]
+
+
+trace_repo = TraceRepository(AgentTraceStep)
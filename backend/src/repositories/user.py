@@ -8,6 +8,7 @@ from src.auth.hashing import get_password_hash, verify_password
 from src.models import Project, User, UserProfile
 from src.repositories.base import CRUDBase
 from src.schemas.api.user.schemas import UserCreate, UserProfileCRUDUpdate, UserUpdate
+from src.utils.cpu_offload import cpu_offload
 
 
 class UserRepository(CRUDBase[User, UserCreate, UserUpdate]):
@@ -18,7 +19,9 @@ class UserRepository(CRUDBase[User, UserCreate, UserUpdate]):
 
         db_obj = User(
             username=obj_in.username,
-            password=get_password_hash(obj_in.password.get_secret_value()),
+            password=await cpu_offload.run(
+                get_password_hash, obj_in.password.get_secret_value()
+            ),
             projects=[default_project],
         )
         db.add(db_obj)
@@ -43,7 +46,7 @@ class UserRepository(CRUDBase[User, UserCreate, UserUpdate]):
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
         if password := update_data.get("password"):
-            hashed_password = get_password_hash(password)
+            hashed_password = await cpu_offload.run(get_password_hash, password)
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
         return await super().update(db, db_obj=db_obj, obj_in=update_data)
@@ -60,7 +63,7 @@ class UserRepository(CRUDBase[User, UserCreate, UserUpdate]):
         user: Optional[User] = await self.get_user_by_username(db, username=username)
         if not user:
             return None
-        if not verify_password(password, user.password):
+        if not await cpu_offload.run(verify_password, password, user.password):
             return None
         return user
 
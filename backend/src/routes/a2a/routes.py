@@ -1,13 +1,17 @@
 import json
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import JSONResponse
 from pydantic import ValidationError
 from src.auth.dependencies import CurrentUserDependency
 from src.db.session import AsyncDBSession
 from src.repositories.a2a import a2a_repo
 from src.schemas.a2a.schemas import A2ACreateAgentSchema
+from src.utils.conditional import check_not_modified
+from src.utils.enums import CatalogResource
+from src.utils.pagination import set_cursor_headers
 
 a2a_router = APIRouter(tags=["a2a"], prefix="/a2a")
 
@@ -25,9 +29,27 @@ async def add_agent_url(
 
 
 @a2a_router.get("/agents")
-async def list_all_agent_cards(db: AsyncDBSession, user_model: CurrentUserDependency):
-    cards = await a2a_repo.get_multiple_by_user(db=db, user_model=user_model)
-    return cards
+async def list_all_agent_cards(
+    db: AsyncDBSession,
+    user_model: CurrentUserDependency,
+    request: Request,
+    response: Response,
+    limit: int = 100,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+):
+    await check_not_modified(
+        db=db,
+        request=request,
+        response=response,
+        user_id=user_model.id,
+        resources=(CatalogResource.a2a,),
+    )
+    page = await a2a_repo.get_page_by_user(
+        db=db, user_model=user_model, per_page=limit, cursor=cursor, offset=offset
+    )
+    set_cursor_headers(response=response, page=page)
+    return page.items
 
 
 @a2a_router.get("/agents/{agent_id}")
@@ -3,7 +3,7 @@ import traceback
 from typing import Annotated, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from fastapi.responses import Response
 from sqlalchemy.exc import IntegrityError
 
@@ -17,14 +17,30 @@ from src.repositories.agent import agent_repo
 from src.repositories.flow import agentflow_repo
 from src.schemas.api.agent.dto import AgentDTOWithJWT, MLAgentJWTDTO
 from src.schemas.api.agent.schemas import AgentCRUDUpdate, AgentRegister
-from src.utils.enums import ActiveAgentTypeFilter
+from src.utils.conditional import check_not_modified
+from src.utils.enums import ActiveAgentTypeFilter, CatalogResource
 from src.utils.filters import AgentFilter
 from src.utils.helpers import get_user_id_from_jwt, map_agent_model_to_dto
+from src.utils.pagination import set_cursor_headers
+from src.utils.responses import json_response
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 agent_router = APIRouter(tags=["agents"], prefix="/agents")
 
+# catalog resources each kind of active agents listing is built from
+ACTIVE_AGENTS_RESOURCES = {
+    ActiveAgentTypeFilter.genai: (CatalogResource.agents,),
+    ActiveAgentTypeFilter.mcp: (CatalogResource.mcp,),
+    ActiveAgentTypeFilter.a2a: (CatalogResource.a2a,),
+    ActiveAgentTypeFilter.all: (
+        CatalogResource.agents,
+        CatalogResource.agentflows,
+        CatalogResource.mcp,
+        CatalogResource.a2a,
+    ),
+}
+
 
 @agent_router.get(
     path="/active",
@@ -32,6 +48,8 @@ agent_router = APIRouter(tags=["agents"], prefix="/agents")
 )
 async def get_active_connections(
     db: AsyncDBSession,
+    request: Request,
+    response: Response,
     authorization: Annotated[Optional[str], Header()] = None,
     x_api_key: Annotated[Optional[str], Header(convert_underscores=True)] = None,
     agent_type: ActiveAgentTypeFilter = Query(),
@@ -68,25 +86,49 @@ async def get_active_connections(
     if authorization:
         user_id = get_user_id_from_jwt(token=authorization.split(" ")[-1])
 
-    return await agent_repo.get_active_agents_by_filter(
+    await check_not_modified(
+        db=db,
+        request=request,
+        response=response,
+        user_id=user_id,
+        resources=ACTIVE_AGENTS_RESOURCES[agent_type],
+    )
+    result = await agent_repo.get_active_agents_by_filter(
         db=db, agent_type=agent_type, user_id=user_id, limit=limit, offset=offset
     )
+    return json_response(result, response=response)
 
 
 @agent_router.get("/")
 async def list_all_agents(
     db: AsyncDBSession,
     user: CurrentUserByAgentOrUserTokenDependency,
+    request: Request,
+    response: Response,
     offset: Optional[int] = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     filter: AgentFilter = Depends(),
 ):
-    result = await agent_repo.query_by_filter(
-        db=db, user_model=user, filter_field=filter, offset=offset, limit=limit
+    await check_not_modified(
+        db=db,
+        request=request,
+        response=response,
+        user_id=user.id,
+        resources=(CatalogResource.agents,),
+    )
+    page = await agent_repo.query_by_filter(
+        db=db,
+        user_model=user,
+        filter_field=filter,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
     )
+    set_cursor_headers(response=response, page=page)
 
-    response = []
-    for agent in result:
+    agents = []
+    for agent in page.items:
         if func := agent.input_parameters.get("function"):
             func["name"] = agent.name
         agent_dto = MLAgentJWTDTO(
@@ -100,9 +142,9 @@ async def list_all_agents(
             agent_jwt=agent.jwt,
             agent_alias=agent.alias,
         )
-        response.append(agent_dto)
+        agents.append(agent_dto)
 
-    return response
+    return agents
 
 
 @agent_router.get("/{agent_id}")
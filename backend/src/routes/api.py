@@ -4,9 +4,11 @@ from src.routes.a2a.routes import a2a_router
 from src.routes.agents.routes import agent_router
 from src.routes.chat.routes import chat_router
 from src.routes.flows.routes import flow_router
+from src.routes.jobs.routes import jobs_router
 from src.routes.llms.routes import llm_router
 from src.routes.logs.routes import log_router
 from src.routes.mcp.routes import mcp_router
+from src.routes.metrics.routes import metrics_router
 from src.routes.user.routes import user_router
 
 api_router = APIRouter(prefix="/api")
@@ -19,3 +21,5 @@ api_router.include_router(llm_router)
 api_router.include_router(chat_router)
 api_router.include_router(mcp_router)
 api_router.include_router(a2a_router)
+api_router.include_router(jobs_router)
+api_router.include_router(metrics_router)
@@ -6,6 +6,7 @@ from src.auth.dependencies import CurrentUserDependency
 from src.core.settings import get_settings
 from src.db.session import AsyncDBSession
 from src.repositories.chat import chat_repo
+from src.repositories.trace import trace_repo
 from src.schemas.api.chat.schemas import CreateConversation, UpdateConversation
 from src.utils.helpers import get_user_id_from_jwt
 
@@ -19,9 +20,10 @@ async def list_existing_chats(
     user_model: CurrentUserDependency,
     offset: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ):
     return await chat_repo.list_chats(
-        db=db, user_model=user_model, offset=offset, limit=limit
+        db=db, user_model=user_model, offset=offset, limit=limit, cursor=cursor
     )
 
 
@@ -32,8 +34,11 @@ async def get_chat_history(
     x_api_key: Annotated[Optional[str], Header(convert_underscores=True)] = None,
     user_id: Optional[UUID] = Query(None),
     authorization: Annotated[Optional[str], Header()] = None,
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None),
     per_page: int = Query(100, ge=0),
+    with_total_count: bool = Query(False),
+    # page numbers of the offset paginator, accepted for one more release
+    page: Optional[int] = Query(None, ge=1, deprecated=True),
 ):
     if not any((user_id, authorization)):
         raise HTTPException(
@@ -68,8 +73,10 @@ async def get_chat_history(
         db=db,
         user_id=user_id,
         session_id=session_id,
-        page=page,
         per_page=per_page,
+        cursor=cursor,
+        with_total_count=with_total_count,
+        offset=(page - 1) * per_page if page and not cursor else 0,
     )
     if not history:
         return []
@@ -77,6 +84,15 @@ async def get_chat_history(
     return history
 
 
+@chat_router.get("/chat/trace")
+async def get_request_trace(
+    db: AsyncDBSession, user_model: CurrentUserDependency, request_id: UUID = Query()
+):
+    return await trace_repo.list_by_request(
+        db=db, request_id=request_id, user_model=user_model
+    )
+
+
 @chat_router.post("/chats")
 async def create_new_chat(
     db: AsyncDBSession,
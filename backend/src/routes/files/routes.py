@@ -1,7 +1,8 @@
 import logging
-import shutil
+import time
 import uuid
-from pathlib import Path
+from datetime import timedelta
+from functools import partial
 from typing import Annotated, Optional
 
 from fastapi import (
@@ -11,19 +12,43 @@ from fastapi import (
     Header,
     HTTPException,
     Query,
+    Request,
+    Response,
     UploadFile,
     status,
 )
-from fastapi.responses import FileResponse
 from pydantic import ValidationError
 from src.auth.dependencies import CurrentUserByAgentOrUserTokenDependency
 from src.core.settings import get_settings
 from src.db.session import AsyncDBSession
-from src.repositories.files import files_repo
-from src.schemas.api.files.dto import FileDTO, FileIdDTO
-from src.schemas.api.files.schemas import FileCreate
-from src.utils.constants import FILES_DIR
+from src.models import FileUpload
+from src.repositories.files import file_uploads_repo, files_repo
+from src.schemas.api.files.dto import (
+    FileDTO,
+    FileDownloadUrlDTO,
+    FileIdDTO,
+    FileUploadStatusDTO,
+)
+from src.schemas.api.files.schemas import FileCreate, FileUploadCreate
+from src.utils.file_cache import (
+    CachedFile,
+    FileCacheStats,
+    cached_file_response,
+    file_cache,
+)
+from src.utils.file_storage import (
+    LocalFileStorage,
+    UploadStats,
+    complete_upload,
+    create_upload_part,
+    discard_upload_part,
+    file_storage,
+    store_upload,
+    upload_stats,
+    write_upload_chunk,
+)
 from src.utils.helpers import get_user_id_from_jwt
+from src.utils.pagination import set_cursor_headers
 from src.utils.validation_error_handler import validation_exception_handler
 
 logger = logging.getLogger(__name__)
@@ -33,22 +58,118 @@ settings = get_settings()
 files_router = APIRouter(tags=["Files"])
 
 
-@files_router.get("/files/{file_id}", response_class=FileResponse)
+@files_router.get("/files/blobs/{name}")
+async def get_file_blob(
+    name: str,
+    request: Request,
+    expires: int,
+    filename: str,
+    mimetype: str,
+    signature: str,
+    attachment: bool = False,
+):
+    """
+    Direct download from a signed URL, authorized by the signature alone.
+    Only used by the local storage backend, S3 serves presigned URLs itself.
+    """
+    if not isinstance(file_storage, LocalFileStorage):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not file_storage.verify(
+        name=name,
+        expires=expires,
+        filename=filename,
+        mimetype=mimetype,
+        signature=signature,
+        attachment=attachment,
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Download link is invalid or has expired",
+        )
+    if not await file_storage.exists(name):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return await file_storage.download_response(
+        request=request,
+        name=name,
+        filename=filename,
+        mimetype=mimetype,
+        attachment=attachment,
+    )
+
+
+@files_router.get("/files/{file_id}")
 async def get_file(
     file_id: str,
+    request: Request,
     db: AsyncDBSession,
     user: CurrentUserByAgentOrUserTokenDependency,
 ):
+    cached = file_cache.get(file_id=file_id, creator_id=user.id)
+    if cached:
+        return cached_file_response(request=request, cached=cached)
+
     file = await files_repo.get_file_content_by_id(
         db=db, file_id=file_id, user_model=user
     )
-    return FileResponse(
-        path=file.fp,
-        media_type=file.mime_type or "application/octet-stream",
+    if file_cache.accepts(file.size):
+        cached = CachedFile(
+            creator_id=str(user.id),
+            file=file,
+            body=await file_storage.read(str(file.fp)),
+        )
+        file_cache.put(file_id=file_id, cached=cached)
+        return cached_file_response(request=request, cached=cached)
+
+    return await file_storage.download_response(
+        request=request,
+        name=str(file.fp),
         filename=file.file_name,
+        mimetype=file.mime_type,
     )
 
 
+@files_router.delete("/files/{file_id}")
+async def delete_file(
+    file_id: uuid.UUID,
+    db: AsyncDBSession,
+    user: CurrentUserByAgentOrUserTokenDependency,
+):
+    is_ok = await files_repo.delete_file_by_user(
+        db=db, file_id=str(file_id), user_model=user
+    )
+    if not is_ok:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File with id {file_id} does not exist",
+        )
+
+    return Response(status_code=204)
+
+
+@files_router.get("/files/{file_id}/url", response_model=FileDownloadUrlDTO)
+async def get_file_download_url(
+    file_id: str,
+    request: Request,
+    db: AsyncDBSession,
+    user: CurrentUserByAgentOrUserTokenDependency,
+    attachment: bool = False,
+) -> FileDownloadUrlDTO:
+    file = await files_repo.get_file_content_by_id(
+        db=db, file_id=file_id, user_model=user
+    )
+    expires_in = settings.FILES_DOWNLOAD_URL_TTL_SECONDS
+    url = await file_storage.download_url(
+        name=str(file.fp),
+        filename=file.file_name,
+        mimetype=file.mime_type,
+        expires_in=expires_in,
+        attachment=attachment,
+    )
+    if url.startswith("/"):
+        url = str(request.base_url).rstrip("/") + url
+    return FileDownloadUrlDTO(url=url, expires_at=int(time.time()) + expires_in)
+
+
 @files_router.get("/files/{file_id}/metadata", response_model=FileDTO)
 async def get_file_metadata(
     file_id: uuid.UUID,
@@ -76,38 +197,28 @@ async def upload_file(
     session_id: Optional[uuid.UUID] = Form(None),
 ) -> Optional[FileIdDTO]:
     file_id = str(uuid.uuid4())
-    internal_file_name = f"{file_id}{Path(file.filename).suffix or ''}"
-    file_path = Path(FILES_DIR) / internal_file_name
     # TODO: if request_id and session_id: from_agent=True
     try:
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # the lock is held until the file is created
+        stored = await store_upload(
+            file=file, lock=partial(files_repo.lock_content, db)
+        )
 
         session_id = str(session_id) if session_id else None
         request_id = str(request_id) if request_id else None
 
-        if request_id and session_id:
-            file_in = FileCreate(
-                id=file_id,
-                session_id=session_id,
-                request_id=request_id,
-                mimetype=file.content_type,
-                original_name=file.filename,
-                internal_name=internal_file_name,
-                internal_id=file_id,
-                from_agent=True,
-            )
-        else:
-            file_in = FileCreate(
-                id=file_id,
-                session_id=session_id,
-                request_id=request_id,
-                mimetype=file.content_type,
-                original_name=file.filename,
-                internal_name=internal_file_name,
-                internal_id=file_id,
-                from_agent=False,
-            )
+        file_in = FileCreate(
+            id=file_id,
+            session_id=session_id,
+            request_id=request_id,
+            mimetype=file.content_type,
+            original_name=file.filename,
+            internal_name=stored.internal_name,
+            internal_id=stored.internal_id,
+            from_agent=bool(request_id and session_id),
+            content_hash=stored.content_hash,
+            size=stored.size,
+        )
 
         new_file = await files_repo.create_by_user(
             db=db, obj_in=file_in, user_model=user
@@ -124,6 +235,194 @@ async def upload_file(
         raise HTTPException(status_code=400, detail=validation_exception_handler(e))
 
 
+@files_router.get("/files/uploads/stats")
+async def get_upload_stats(
+    user: CurrentUserByAgentOrUserTokenDependency,
+) -> UploadStats:
+    return upload_stats
+
+
+@files_router.get("/files/cache/stats")
+async def get_file_cache_stats(
+    user: CurrentUserByAgentOrUserTokenDependency,
+) -> FileCacheStats:
+    return file_cache.stats
+
+
+def _upload_status(upload: FileUpload) -> FileUploadStatusDTO:
+    return FileUploadStatusDTO(
+        id=str(upload.id),
+        original_name=upload.original_name,
+        mimetype=upload.mimetype,
+        size=upload.size,
+        offset=upload.received_bytes,
+        expires_at=upload.updated_at
+        + timedelta(hours=settings.FILES_UPLOAD_EXPIRATION_HOURS),
+    )
+
+
+@files_router.post(
+    "/files/uploads",
+    status_code=status.HTTP_201_CREATED,
+    response_model=FileUploadStatusDTO,
+)
+async def create_upload(
+    db: AsyncDBSession,
+    user: CurrentUserByAgentOrUserTokenDependency,
+    upload_in: FileUploadCreate,
+) -> FileUploadStatusDTO:
+    """
+    Start a resumable upload. Content is sent with PUT requests in chunks starting at
+    the current offset, then the upload is completed into a regular file.
+    """
+    if (
+        upload_in.size is not None
+        and upload_in.size > settings.FILES_RESUMABLE_UPLOAD_MAX_SIZE_BYTES
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds the maximum upload size of {settings.FILES_RESUMABLE_UPLOAD_MAX_SIZE_BYTES} bytes",  # noqa: E501
+        )
+    upload = await file_uploads_repo.create_by_user(
+        db=db, obj_in=upload_in, user_model=user
+    )
+    await create_upload_part(upload_id=str(upload.id))
+    return _upload_status(upload)
+
+
+@files_router.get("/files/uploads/{upload_id}", response_model=FileUploadStatusDTO)
+async def get_upload_status(
+    upload_id: uuid.UUID,
+    db: AsyncDBSession,
+    user: CurrentUserByAgentOrUserTokenDependency,
+) -> FileUploadStatusDTO:
+    upload = await file_uploads_repo.get_by_user(db=db, id_=upload_id, user_model=user)
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Upload {upload_id} does not exist",
+        )
+    return _upload_status(upload)
+
+
+@files_router.put("/files/uploads/{upload_id}", response_model=FileUploadStatusDTO)
+async def upload_chunk(
+    upload_id: uuid.UUID,
+    request: Request,
+    db: AsyncDBSession,
+    user: CurrentUserByAgentOrUserTokenDependency,
+    offset: int = Query(ge=0),
+) -> FileUploadStatusDTO:
+    """
+    Append the raw request body to the upload at `offset`, which must match the
+    offset reported by the upload status.
+    """
+    # the offset is claimed and confirmed in two short transactions, no transaction
+    # is open while the chunk streams in
+    upload = await file_uploads_repo.claim(
+        db=db,
+        upload_id=str(upload_id),
+        user_model=user,
+        offset=offset,
+        timeout=settings.FILES_UPLOAD_CLAIM_TIMEOUT_SECONDS,
+    )
+
+    try:
+        received = await write_upload_chunk(
+            upload_id=str(upload.id), offset=offset, chunks=request.stream()
+        )
+        if upload.size is not None and received > upload.size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Upload {upload_id} is larger than the declared {upload.size} bytes",  # noqa: E501
+            )
+    except OSError as e:
+        await file_uploads_repo.release(db=db, upload=upload)
+        logger.critical(f"Failed to write upload chunk {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to save file",
+        )
+    except Exception:
+        await file_uploads_repo.release(db=db, upload=upload)
+        raise
+
+    upload = await file_uploads_repo.confirm(
+        db=db, upload=upload, received_bytes=received
+    )
+    return _upload_status(upload)
+
+
+@files_router.post(
+    "/files/uploads/{upload_id}/complete", status_code=status.HTTP_201_CREATED
+)
+async def finish_upload(
+    upload_id: uuid.UUID,
+    db: AsyncDBSession,
+    user: CurrentUserByAgentOrUserTokenDependency,
+) -> FileIdDTO:
+    upload = await file_uploads_repo.lock_by_user(
+        db=db, upload_id=str(upload_id), user_model=user
+    )
+    if upload.size is not None and upload.received_bytes != upload.size:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload {upload_id} is incomplete, received {upload.received_bytes} of {upload.size} bytes",  # noqa: E501
+        )
+
+    try:
+        stored = await complete_upload(
+            upload_id=str(upload.id),
+            filename=upload.original_name,
+            mimetype=upload.mimetype,
+            size=upload.received_bytes,
+            lock=partial(files_repo.lock_content, db),
+        )
+    except OSError as e:
+        await db.rollback()
+        logger.critical(f"Failed to save file {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to save file",
+        )
+
+    session_id = str(upload.session_id) if upload.session_id else None
+    request_id = str(upload.request_id) if upload.request_id else None
+    file_in = FileCreate(
+        id=str(uuid.uuid4()),
+        session_id=session_id,
+        request_id=request_id,
+        mimetype=upload.mimetype,
+        original_name=upload.original_name,
+        internal_name=stored.internal_name,
+        internal_id=stored.internal_id,
+        from_agent=bool(request_id and session_id),
+        content_hash=stored.content_hash,
+        size=stored.size,
+    )
+    new_file = await file_uploads_repo.complete(
+        db=db, upload=upload, file_in=file_in, user_model=user
+    )
+    return FileIdDTO(id=str(new_file.id))
+
+
+@files_router.delete(
+    "/files/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT
+)
+async def abort_upload(
+    upload_id: uuid.UUID,
+    db: AsyncDBSession,
+    user: CurrentUserByAgentOrUserTokenDependency,
+):
+    upload = await file_uploads_repo.lock_by_user(
+        db=db, upload_id=str(upload_id), user_model=user
+    )
+    await db.delete(upload)
+    await db.commit()
+    await discard_upload_part(upload_id=str(upload_id))
+
+
 @files_router.get("/files")
 async def list_all_files_by_session_id(
     db: AsyncDBSession,
@@ -170,10 +469,13 @@ async def list_all_files_by_session_id(
 async def get_files_metadata_by_user(
     db: AsyncDBSession,
     user: CurrentUserByAgentOrUserTokenDependency,
+    response: Response,
     limit: int = 100,
     offset: int = 0,
+    cursor: Optional[str] = None,
 ):
-    files = await files_repo.get_files_metadata_by_user(
-        db=db, user_model=user, limit=limit, offset=offset
+    page = await files_repo.get_files_metadata_by_user(
+        db=db, user_model=user, limit=limit, offset=offset, cursor=cursor
     )
-    return files
+    set_cursor_headers(response=response, page=page)
+    return page.items
@@ -1,7 +1,7 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import Response
 
 from src.auth.dependencies import CurrentUserDependency
@@ -9,6 +9,8 @@ from src.db.session import AsyncDBSession
 from src.repositories.flow import agentflow_repo
 from src.schemas.api.flow.dto import AgentFlowDTO
 from src.schemas.api.flow.schemas import AgentFlowCreate, AgentFlowUpdate
+from src.utils.conditional import check_not_modified
+from src.utils.enums import CatalogResource
 
 flow_router = APIRouter(tags=["agentflows"], prefix="/agentflows")
 
@@ -17,9 +19,24 @@ flow_router = APIRouter(tags=["agentflows"], prefix="/agentflows")
 async def list_all_agentflows(
     db: AsyncDBSession,
     user: CurrentUserDependency,
+    request: Request,
+    response: Response,
     offset: Optional[int] = 0,
     limit: int = 100,
 ):
+    # state of the flows follows the agents they are made of
+    await check_not_modified(
+        db=db,
+        request=request,
+        response=response,
+        user_id=user.id,
+        resources=(
+            CatalogResource.agentflows,
+            CatalogResource.agents,
+            CatalogResource.mcp,
+            CatalogResource.a2a,
+        ),
+    )
     # TODO: pagination
     return await agentflow_repo.get_all_flows_and_validate_all_flow_agents(
         db=db, user_model=user, offset=offset, limit=limit
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from src.auth.dependencies import CurrentUserDependency
+from src.utils.job_runner import JobStats, job_runner
+
+jobs_router = APIRouter(tags=["Jobs"], prefix="/jobs")
+
+
+@jobs_router.get("/stats")
+async def get_jobs_stats(user: CurrentUserDependency) -> list[JobStats]:
+    return job_runner.stats()
@@ -3,7 +3,7 @@ import traceback
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import Response
 from sqlalchemy.exc import IntegrityError
 
@@ -22,7 +22,9 @@ from src.schemas.api.model_config.schemas import (
     ProviderCRUDCreate,
     ProviderCRUDUpdate,
 )
+from src.utils.conditional import check_not_modified
 from src.utils.constants import DEFAULT_SYSTEM_PROMPT
+from src.utils.enums import CatalogResource
 from src.utils.helpers import prettify_integrity_error_details
 
 logger = logging.getLogger(__name__)
@@ -33,9 +35,18 @@ llm_router = APIRouter(prefix="/llm", tags=["LLM"])
 async def list_model_configs(
     db: AsyncDBSession,
     user_model: CurrentUserDependency,
+    request: Request,
+    response: Response,
     limit: int = 100,
     offset: int = 0,
 ):
+    await check_not_modified(
+        db=db,
+        request=request,
+        response=response,
+        user_id=user_model.id,
+        resources=(CatalogResource.llms,),
+    )
     return await model_config_repo.get_all_configs_of_all_providers(
         db=db, user_model=user_model, limit=limit, offset=offset
     )
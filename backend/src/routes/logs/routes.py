@@ -1,10 +1,22 @@
+from datetime import datetime
 from typing import Optional, Union, Annotated
 from uuid import UUID
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Header, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from src.auth.dependencies import CurrentUserDependency
 from src.schemas.ws.log import LogEntryDTO
 from src.db.session import AsyncDBSession
 from src.repositories.log import log_repo
+from src.utils.filters import LogFilter
+from src.utils.pagination import decode_cursor
+from src.utils.log_ingestion import LogIngestionStats, log_ingestion_buffer
+from src.utils.log_stream import (
+    NDJSON_MEDIA_TYPE,
+    SSE_MEDIA_TYPE,
+    iter_logs,
+    stream_ndjson,
+    stream_sse,
+)
 
 log_router = APIRouter(tags=["Logs"], prefix="/logs")
 
@@ -37,3 +49,60 @@ async def get_logs_by_session_id(
         request_id = str(request_id)
         # TODO: lookup by user
         return await log_repo.list_by_request_id(db=db, id_=request_id)
+
+
+@log_router.get("/stream")
+async def stream_logs(
+    user: CurrentUserDependency,
+    request_id: Annotated[Union[UUID, None], Query()] = None,
+    session_id: Annotated[Union[UUID, None], Query()] = None,
+    log_level: Annotated[Optional[list[str]], Query()] = None,
+    agent_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    follow: bool = False,
+    batch_size: Annotated[int, Query(ge=1, le=5000)] = 500,
+    accept: Annotated[Optional[str], Header()] = None,
+    last_event_id: Annotated[Optional[str], Header()] = None,
+):
+    """
+    Stream logs oldest first as NDJSON, or as server-sent events if the client
+    accepts `text/event-stream`. Each entry has a `cursor` to resume the stream from,
+    `follow=true` keeps the stream open and tails new logs.
+    """
+    if not any((request_id, session_id)):
+        raise HTTPException(
+            status_code=400,
+            detail="Either 'request_id' or 'session_id' must be provided",
+        )
+
+    # validated upfront, errors can't be reported once the stream has started
+    resume_cursor = cursor or last_event_id
+    if resume_cursor and not decode_cursor(resume_cursor)[1].isdigit():
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+    filters = LogFilter(
+        session_id=session_id,
+        request_id=request_id,
+        log_level=log_level,
+        agent_id=agent_id,
+        since=since,
+        until=until,
+        creator_id=user.id,
+    )
+    entries = iter_logs(
+        filters=filters,
+        cursor=resume_cursor,
+        batch_size=batch_size,
+        follow=follow,
+    )
+
+    if accept and SSE_MEDIA_TYPE in accept:
+        return StreamingResponse(stream_sse(entries), media_type=SSE_MEDIA_TYPE)
+    return StreamingResponse(stream_ndjson(entries), media_type=NDJSON_MEDIA_TYPE)
+
+
+@log_router.get("/ingestion/stats")
+async def get_log_ingestion_stats(user: CurrentUserDependency) -> LogIngestionStats:
+    return log_ingestion_buffer.get_stats()
@@ -1,13 +1,17 @@
 import json
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import JSONResponse
 from pydantic import ValidationError
 from src.auth.dependencies import CurrentUserDependency
 from src.db.session import AsyncDBSession
 from src.repositories.mcp import mcp_repo
 from src.schemas.mcp.schemas import MCPCreateServer
+from src.utils.conditional import check_not_modified
+from src.utils.enums import CatalogResource
+from src.utils.pagination import set_cursor_headers
 
 mcp_router = APIRouter(tags=["mcp"], prefix="/mcp")
 
@@ -26,12 +30,24 @@ async def add_server_url(
 async def list_all_mcp_servers(
     db: AsyncDBSession,
     user_model: CurrentUserDependency,
+    request: Request,
+    response: Response,
     limit: int = 100,
     offset: int = 0,
+    cursor: Optional[str] = None,
 ):
-    return await mcp_repo.get_all_mcp_tools_of_all_servers(
-        db=db, user_model=user_model, limit=limit, offset=offset
+    await check_not_modified(
+        db=db,
+        request=request,
+        response=response,
+        user_id=user_model.id,
+        resources=(CatalogResource.mcp,),
     )
+    page = await mcp_repo.get_all_mcp_tools_of_all_servers(
+        db=db, user_model=user_model, limit=limit, offset=offset, cursor=cursor
+    )
+    set_cursor_headers(response=response, page=page)
+    return page.items
 
 
 @mcp_router.get("/servers/{server_id}")
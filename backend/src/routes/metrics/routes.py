@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from src.auth.dependencies import CurrentUserDependency
+from src.utils.cpu_offload import CPUOffloadStats, cpu_offload, file_hashing
+from src.utils.query_stats import QueryScopeStats, query_stats
+
+metrics_router = APIRouter(tags=["Metrics"], prefix="/metrics")
+
+
+@metrics_router.get("/cpu-offload")
+async def get_cpu_offload_stats(user: CurrentUserDependency) -> CPUOffloadStats:
+    return cpu_offload.stats()
+
+
+@metrics_router.get("/file-hashing")
+async def get_file_hashing_stats(user: CurrentUserDependency) -> CPUOffloadStats:
+    return file_hashing.stats()
+
+
+@metrics_router.get("/queries")
+async def get_query_stats(user: CurrentUserDependency) -> list[QueryScopeStats]:
+    return query_stats.stats()
@@ -16,6 +16,7 @@ from src.schemas.api.user.schemas import (
     UserCreate,
     UserProfileCRUDUpdate,
 )
+from src.utils.cpu_offload import cpu_offload
 
 user_router = APIRouter(tags=["users"])
 
@@ -31,7 +32,7 @@ async def user_login(
         raise HTTPException(status_code=400, detail="Incorrect username or password")
 
     return TokenDTO(
-        access_token=create_access_token(subject=str(user.id)),
+        access_token=await cpu_offload.run(create_access_token, subject=str(user.id)),
         token_type="Bearer",
     )
 
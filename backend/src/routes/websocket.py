@@ -1,7 +1,9 @@
+import asyncio
 import copy
 import logging
 import traceback
 from datetime import datetime
+from functools import partial
 from uuid import uuid4
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
@@ -10,22 +12,29 @@ from genai_session.utils.naming_enums import MasterServerName
 from pydantic import ValidationError
 
 from src.core.settings import get_settings
-from src.db.session import AsyncDBSession
+from src.db.session import AsyncDBSession, async_session
+from src.models import User
 from src.repositories.chat import chat_repo
 from src.repositories.files import files_repo
 from src.repositories.model_config import model_config_repo
+from src.repositories.trace import trace_repo
 from src.schemas.api.agent.dto import AgentResponseWithFilesDTO, AgentTypeResponseDTO
 from src.schemas.api.chat.schemas import CreateChatMessage
 from src.schemas.ws.frontend import (
+    AgentResponseChunkDTO,
+    AgentTraceEventDTO,
     AgentResponseDTO,
     IncomingFrontendMessage,
     LLMPropertiesDecryptCreds,
 )
 from src.schemas.ws.ml import OutgoingMLRequestSchema
+from src.utils.agent_invoke import invoke_agent
+from src.utils.cpu_offload import cpu_offload
 from src.utils.enums import SenderType
+from src.utils.query_stats import query_stats
 from src.utils.validate_uuid import is_valid_uuid
 from src.utils.validation_error_handler import validation_exception_handler
-from src.utils.websocket import get_current_ws_user
+from src.utils.websocket import FrontendConnection, get_current_ws_user
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -136,10 +145,18 @@ async def handle_frontend_ws(
             )
             return
 
-    websocket.app.state.frontend_ws = websocket
     await websocket.accept()
+    connection = FrontendConnection(websocket=websocket)
+    websocket.app.state.frontend_ws = connection
 
     session: GenAISession = websocket.app.state.genai_session
+    # requests of the connection run concurrently, reading pauses at the limit
+    semaphore = asyncio.Semaphore(settings.FRONTEND_WS_MAX_CONCURRENT_REQUESTS)
+    requests: set[asyncio.Task] = set()
+
+    def _request_done(task: asyncio.Task):
+        requests.discard(task)
+        semaphore.release()
 
     try:
         while True:
@@ -148,9 +165,12 @@ async def handle_frontend_ws(
                     await websocket.receive_text()
                 )
             except ValidationError as e:
-                await websocket.send_text(
+                await connection.send_text(
                     f"Message validation failed. Details: {validation_exception_handler(exc=e)}"  # noqa: E501
                 )
+                continue
+
+            # created before the requests fan out, so a new chat is created once
             chat_title = message_obj.message[:20]
             if not chat_title:
                 chat_title = "New Chat"
@@ -166,7 +186,60 @@ async def handle_frontend_ws(
                     initial_user_message=chat_title,
                 )
 
-            request_id = str(uuid4())
+            await semaphore.acquire()
+            handler = partial(
+                handle_frontend_request,
+                connection=connection,
+                session=session,
+                user_model=user_model,
+                session_id=session_id,
+                message_obj=message_obj,
+            )
+            task = asyncio.create_task(
+                query_stats.tracked("WS frontend message", handler)()
+            )
+            requests.add(task)
+            task.add_done_callback(_request_done)
+
+    except WebSocketDisconnect:
+        # requests in flight still persist their responses to the chat
+        logger.warning("Frontend client disconnected")
+
+    except Exception:
+        logger.error(
+            f"Unexpected error occured. Traceback: {traceback.format_exc(limit=600)}"
+        )
+
+
+async def handle_frontend_request(
+    connection: FrontendConnection,
+    session: GenAISession,
+    user_model: User,
+    session_id: str,
+    message_obj: IncomingFrontendMessage,
+):
+    """
+    Proxies a single frontend message to the master agent and sends the response
+    back, independently from the other requests of the connection.
+    """
+    # never taken from the client, files and logs are looked up by the request_id
+    request_id = str(uuid4())
+    client_request_id = message_obj.client_request_id
+
+    async def send_error(error: str):
+        try:
+            await connection.send_json(
+                {
+                    "error": error,
+                    "request_id": request_id,
+                    "client_request_id": client_request_id,
+                }
+            )
+        except Exception:
+            logger.debug(f"Could not send the error of request {request_id}")
+
+    try:
+        async with async_session() as db:
             file_ids = message_obj.files
             if file_ids:
                 files = await files_repo.enrich_files_with_session_request_id(
@@ -182,28 +255,22 @@ async def handle_frontend_ws(
             provider = await model_config_repo.get_provider_by_name(
                 db=db, provider_name=message_obj.provider, user_id=user_model.id
             )
+            if not provider:
+                await send_error(f"Provider {message_obj.provider} does not exist")
+                return
+
             config = await model_config_repo.find_model_by_config_name(
                 db=db, config_name=message_obj.llm_name, user_model=user_model
             )
-            if not provider:
-                await websocket.send_json(
-                    {"error": f"Provider {message_obj.provider} does not exist"}
-                )
-                await websocket.close(
-                    code=status.WS_1003_UNSUPPORTED_DATA,
-                    reason=f"Provider {message_obj.provider} does not exist",
-                )
-
             if not config:
-                await websocket.send_json(
-                    {"error": f"Config {message_obj.llm_name} does not exist"}
-                )
-                await websocket.close(
-                    code=status.WS_1003_UNSUPPORTED_DATA,
-                    reason=f"Config {message_obj.llm_name} does not exist",
-                )
+                await send_error(f"Config {message_obj.llm_name} does not exist")
+                return
+
             try:
-                enriched_llm_props = LLMPropertiesDecryptCreds(
+                # api key decryption derives a key with scrypt
+                enriched_llm_props = await cpu_offload.run(
+                    LLMPropertiesDecryptCreds,
+                    task_name="decrypt_secret",
                     config_name=config.name,
                     provider=provider.name,
                     model=config.model,
@@ -218,10 +285,8 @@ async def handle_frontend_ws(
                     max_last_messages=config.max_last_messages,
                 )
             except ValueError:
-                await websocket.send_json(
-                    {
-                        "error": "Could not decrypt api_key. Make sure 'api_key' exists and model config was created beforehand "  # noqa: E501
-                    }
+                await send_error(
+                    "Could not decrypt api_key. Make sure 'api_key' exists and model config was created beforehand "  # noqa: E501
                 )
                 return
 
@@ -235,83 +300,126 @@ async def handle_frontend_ws(
                 ),
             )
 
-            ml_request = OutgoingMLRequestSchema(
-                user_id=user_model.id,
+        ml_request = OutgoingMLRequestSchema(
+            user_id=user_model.id,
+            session_id=session_id,
+            timestamp=int(datetime.now().timestamp()),
+            configs=enriched_llm_props.to_json(),
+            files=files,
+            request_id=request_id if message_obj.stream else None,
+            stream=message_obj.stream or None,
+        )
+        req_body = ml_request.model_dump(exclude_none=True)
+
+        streamed: list[str] = []
+
+        async def relay_chunk(body: dict):
+            chunk = AgentResponseChunkDTO(
+                request_id=request_id,
+                client_request_id=client_request_id,
                 session_id=session_id,
-                timestamp=int(datetime.now().timestamp()),
-                configs=enriched_llm_props.to_json(),
-                files=files,
+                chunk=body.get("chunk", ""),
+                reset=body.get("reset", False),
             )
-            req_body = ml_request.model_dump(exclude_none=True)
+            if chunk.reset:
+                streamed.clear()
+            streamed.append(chunk.chunk)
+            try:
+                await connection.send_text(chunk.model_dump_json())
+            except Exception:
+                # the response is still assembled and persisted for a closed client
+                logger.debug(f"Could not relay a chunk of request {request_id}")
 
+        async def relay_trace_event(body: dict):
             try:
-                session.request_id = request_id
-                session.session_id = session_id
-                response: AgentResponse = await session.send(
-                    client_id=MasterServerName.MASTER_SERVER_ML.value,
-                    message=req_body,
-                )
-                agent_response = AgentResponseDTO(
-                    execution_time=response.execution_time,
-                    response=response.response,
+                trace_event = AgentTraceEventDTO(
                     request_id=request_id,
+                    client_request_id=client_request_id,
                     session_id=session_id,
+                    event=body.get("event"),
                 )
-                await chat_repo.add_message_to_conversation(
-                    db=db,
-                    user_model=user_model,
-                    session_id=session_id,
-                    request_id=request_id,
-                    message_in=CreateChatMessage(
-                        sender_type=SenderType.master_agent,
-                        content=agent_response.response,
-                    ),
-                )
-
-                files_by_request_id = await files_repo.list_files_by_request_id(
-                    db=db, request_id=request_id
-                )
-                response_with_files = AgentResponseWithFilesDTO(
-                    **agent_response.model_dump(mode="json"),
-                    files=files_by_request_id,
-                )
-
-                response_structure = AgentTypeResponseDTO(
-                    type="agent_response", response=response_with_files
-                )
-                await websocket.send_text(response_structure.model_dump_json())
-            except ConnectionRefusedError:
-                logger.critical(
-                    f"Cannot connect to the router service at '{settings.ROUTER_WS_URL}'. Make sure it is running and envs are configured correctly"  # noqa: E501
-                )
-                await websocket.send_json(
-                    {"error": "Cannot connect to router service. Try again later"}
-                )
-                await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
-                raise ConnectionRefusedError(
-                    "Cannot connect to router service. Make sure it is running and envs are configured correctly"
+            except ValidationError as e:
+                # steps are informational, a malformed one must not fail the request
+                logger.warning(
+                    f"Dropped a malformed trace event of request {request_id}. Details: {e}"
                 )
+                return
+            try:
+                await connection.send_text(trace_event.model_dump_json())
             except Exception:
-                logger.error(f"Unexpected error occured: {traceback.format_exc()}")
-                await websocket.send_json(
-                    {"error": "Unexpected error occured. Try again later"}
+                logger.debug(f"Could not relay a trace event of request {request_id}")
+            try:
+                # one short transaction per event, steps are visible while the run goes
+                async with async_session() as db:
+                    await trace_repo.save_event(
+                        db=db,
+                        event=trace_event.event,
+                        request_id=request_id,
+                        session_id=session_id,
+                        user_model=user_model,
+                    )
+            except Exception as e:
+                logger.warning(
+                    f"Could not save a trace event of request {request_id}. Details: {e!r}"
                 )
-                await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
 
-    except ValidationError as e:
-        logger.debug(traceback.format_exc())
-        await websocket.send_text(
-            f"Message validation failed. Details: {validation_exception_handler(exc=e)}"  # TODO: returned message on exc is not informative # noqa: E501
+        # no DB connection is held while the master agent works on the request
+        response: AgentResponse = await invoke_agent(
+            session=session,
+            client_id=MasterServerName.MASTER_SERVER_ML.value,
+            message=req_body,
+            request_id=request_id,
+            session_id=session_id,
+            on_chunk=relay_chunk if message_obj.stream else None,
+            on_trace_event=relay_trace_event if message_obj.stream else None,
         )
-    except ValueError as e:
-        await websocket.send_text(
-            f"Message validation failed. Incorrect value was provided. Details: {str(e)}"
+        agent_response = AgentResponseDTO(
+            execution_time=response.execution_time,
+            response=response.response,
+            request_id=request_id,
+            session_id=session_id,
         )
+        content = agent_response.response
+        if streamed and isinstance(content, dict) and content.get("is_success"):
+            content = {**content, "response": "".join(streamed)}
+        async with async_session() as db:
+            await chat_repo.add_message_to_conversation(
+                db=db,
+                user_model=user_model,
+                session_id=session_id,
+                request_id=request_id,
+                message_in=CreateChatMessage(
+                    sender_type=SenderType.master_agent,
+                    content=content,
+                ),
+            )
 
-    except WebSocketDisconnect:
-        logger.warning("Frontend client disconnected")
+            files_by_request_id = await files_repo.list_files_by_request_id(
+                db=db, request_id=request_id, user_model=user_model
+            )
+        response_with_files = AgentResponseWithFilesDTO(
+            **agent_response.model_dump(mode="json"),
+            files=files_by_request_id,
+            client_request_id=client_request_id,
+        )
 
-    except Exception:
-        logger.error(
-            f"Unexpected error occured. Traceback: {traceback.format_exc(limit=600)}"
+        response_structure = AgentTypeResponseDTO(
+            type="agent_response", response=response_with_files
+        )
+        await connection.send_text(response_structure.model_dump_json())
+
+    except OSError:
+        logger.critical(
+            f"Cannot connect to the router service at '{settings.ROUTER_WS_URL}'. Make sure it is running and envs are configured correctly"  # noqa: E501
+        )
+        await send_error("Cannot connect to router service. Try again later")
+
+    except (ValidationError, ValueError) as e:
+        logger.debug(traceback.format_exc())
+        await send_error(
+            f"Message validation failed. Incorrect value was provided. Details: {str(e)}"
         )
+
+    except Exception:
+        logger.error(f"Unexpected error occured: {traceback.format_exc()}")
+        await send_error("Unexpected error occured. Try again later")
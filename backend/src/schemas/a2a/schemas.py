@@ -65,6 +65,9 @@ class A2AAgentCard(BaseModel):
 class A2AAgentCardSchema(BaseModel):
     card: Optional[A2AAgentCard] = None
     is_active: bool
+    etag: Optional[str] = None
+    # card is unchanged since the request's If-None-Match etag
+    not_modified: bool = False
 
 
 class A2ACreateAgentSchema(BaseModel):
@@ -49,6 +49,8 @@ class ActiveAgentsWithQueryParams(ActiveAgentsDTO):
 
 class AgentResponseWithFilesDTO(AgentResponseDTO):
     files: List[Optional[FileDTO]] = []
+    # correlation id the frontend sent with the message
+    client_request_id: Optional[str] = None
 
 
 class AgentTypeResponseDTO(BaseModel):
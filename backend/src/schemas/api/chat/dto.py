@@ -1,7 +1,8 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel
-from src.schemas.api.chat.schemas import GetChatMessage
+from src.schemas.api.chat.schemas import GetChatMessage, TraceStepEvent
 from src.schemas.base import CastSessionIDToStrModel
 
 
@@ -13,7 +14,14 @@ class BaseChatDTO(CastSessionIDToStrModel):
 
 class ListChatsDTO(BaseModel):
     chats: list[BaseChatDTO]
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
 
 
 class ChatDetailsDTO(BaseChatDTO):
     messages: list[GetChatMessage]
+
+
+class TraceStepDTO(TraceStepEvent):
+    created_at: datetime
+    updated_at: datetime
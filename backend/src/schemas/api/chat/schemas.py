@@ -35,6 +35,17 @@ class DeleteChatMessage(BaseUUIDToStrModel):
 # TODO: Chat message with metadata if needed
 
 
+class TraceStepEvent(BaseModel):
+    step_id: str
+    step: str
+    name: str
+    args_digest: Optional[str] = None
+    # started | finished
+    status: str
+    is_success: Optional[bool] = None
+    latency: Optional[float] = None
+
+
 class BaseConversation(BaseUUIDToStrModel):
     title: str
 
@@ -1,3 +1,4 @@
+from datetime import datetime
 from pathlib import Path
 from typing import Optional, Self, Union
 from uuid import UUID
@@ -10,6 +11,11 @@ class FileIdDTO(BaseModel):
     id: str
 
 
+class FileDownloadUrlDTO(BaseModel):
+    url: str
+    expires_at: int
+
+
 class FileDTO(FileGet):
     id: Union[UUID, str]
     session_id: Optional[Union[UUID, str]] = None
@@ -43,10 +49,21 @@ class FileDTO(FileGet):
         return self
 
 
+class FileUploadStatusDTO(BaseModel):
+    id: str
+    original_name: str
+    mimetype: str
+    size: Optional[int] = None
+    # number of bytes received so far, the next chunk must start here
+    offset: int
+    expires_at: datetime
+
+
 class FilePathDTO(BaseModel):
     fp: Union[Path, str]
     mime_type: str
     file_name: str
+    size: Optional[int] = None
 
     @field_validator("file_name")
     def cast_uuid_to_str(cls, v):
@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class FileBase(BaseModel):
@@ -14,6 +14,8 @@ class FileGet(FileBase):
     internal_id: str
     internal_name: str
     from_agent: bool
+    content_hash: Optional[str] = None
+    size: Optional[int] = None
 
 
 class FileCreate(FileGet):
@@ -22,3 +24,11 @@ class FileCreate(FileGet):
 
 class FileUpdate(FileGet):
     pass
+
+
+class FileUploadCreate(BaseModel):
+    original_name: str
+    mimetype: str = "application/octet-stream"
+    size: Optional[int] = Field(default=None, ge=0)
+    session_id: Optional[str] = None
+    request_id: Optional[str] = None
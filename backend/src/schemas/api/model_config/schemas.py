@@ -3,7 +3,7 @@ from typing import Optional, Self
 from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from src.schemas.base import BaseUUIDToStrModel
 from src.utils.constants import DEFAULT_SYSTEM_PROMPT
-from src.utils.helpers import validate_and_encrypt_provider_api_key
+from src.utils.helpers import validate_provider_api_key
 
 
 class ModelProviderBase(BaseModel):
@@ -77,6 +77,7 @@ class ProviderCRUDCreate(ProviderCRUDUpdate):
             self.api_key = None
 
         else:
-            self.api_key = validate_and_encrypt_provider_api_key(self.api_key)
+            # encrypted when the provider is stored, off the event loop
+            self.api_key = validate_provider_api_key(self.api_key)
 
         return self
@@ -23,6 +23,14 @@ class MCPToolDTO(BaseUUIDToStrModel):
         return v
 
 
+class MCPToolsSyncDelta(BaseModel):
+    """Names of the tools written by a catalog sync of a single server."""
+
+    added: list[str] = []
+    changed: list[str] = []
+    removed: list[str] = []
+
+
 class MCPServerDTO(BaseModel):
     server_url: str
     mcp_tools: list[dict] | list[MCPToolDTO]
@@ -3,6 +3,7 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 from src.auth.encrypt import decrypt_secret
+from src.schemas.api.chat.schemas import TraceStepEvent
 
 
 class Flow(BaseModel):
@@ -89,6 +90,30 @@ class IncomingFrontendMessage(BaseModel):
     provider: str
     llm_name: str
     files: Optional[List[str]] = []
+    # set by the client to match responses of concurrent requests, echoed back on
+    # every frame of the request; the request_id itself is always generated
+    client_request_id: Optional[str] = Field(default=None, max_length=128)
+    # final answer and agent steps are sent in `agent_response_chunk` and
+    # `agent_trace_event` frames while the request runs
+    stream: bool = False
+
+
+class AgentResponseChunkDTO(BaseModel):
+    type: str = "agent_response_chunk"
+    request_id: str
+    client_request_id: Optional[str] = None
+    session_id: str
+    chunk: str
+    # the text streamed so far was not the final answer and has to be dropped
+    reset: bool = False
+
+
+class AgentTraceEventDTO(BaseModel):
+    type: str = "agent_trace_event"
+    request_id: str
+    client_request_id: Optional[str] = None
+    session_id: str
+    event: TraceStepEvent
 
 
 class AgentResponseDTO(BaseModel):
@@ -29,6 +29,10 @@ class LogEntryDTO(LogEntry):
     pass
 
 
+class LogStreamEntryDTO(LogEntryDTO):
+    cursor: str
+
+
 class FrontendLogEntryDTO(BaseModel):
     type: str  # TODO: enum
     log: LogEntry
@@ -12,6 +12,9 @@ class OutgoingMLRequestSchema(BaseModel):
     configs: dict
     files: Optional[List[FileDTO]] = []
     timestamp: datetime | float | int  # posix ts
+    # only sent for streamed requests, older master agents don't accept them
+    request_id: Optional[str] = None
+    stream: Optional[bool] = None
 
     @model_validator(mode="after")
     def validate_uuids(self) -> Self:
@@ -0,0 +1,84 @@
+import asyncio
+import json
+from logging import getLogger
+from typing import Awaitable, Callable, Optional
+
+import websockets
+from genai_session.session import AgentResponse, GenAISession
+from genai_session.utils.naming_enums import WSMessageType
+
+logger = getLogger(__name__)
+
+AGENT_RESPONSE_CHUNK = "agent_response_chunk"
+AGENT_TRACE_EVENT = "agent_trace_event"
+
+
+async def invoke_agent(
+    session: GenAISession,
+    client_id: str,
+    message: dict,
+    request_id: str,
+    session_id: str,
+    close_timeout: Optional[float] = None,
+    on_chunk: Optional[Callable[[dict], Awaitable[None]]] = None,
+    on_trace_event: Optional[Callable[[dict], Awaitable[None]]] = None,
+) -> AgentResponse:
+    """
+    Concurrency safe `GenAISession.send`.
+
+    The request context is passed explicitly instead of being set on the process wide
+    session, and every request connects with its own invoke key. The router keeps one
+    connection per invoke key, with the shared key of `send` concurrent requests
+    replace each other's connection and only the last one gets its response.
+
+    Partial responses and step events streamed by the agent are passed to `on_chunk`
+    and `on_trace_event` as they arrive.
+    """
+    headers = {"x-custom-invoke-key": f"{session.agent_id}:{client_id}:{request_id}"}
+
+    async with websockets.connect(session.ws_url, additional_headers=headers) as ws:
+        await ws.send(
+            json.dumps(
+                {
+                    "message_type": WSMessageType.AGENT_INVOKE.value,
+                    "agent_uuid": client_id,
+                    "request_payload": message,
+                    "request_metadata": {
+                        "request_id": request_id,
+                        "session_id": session_id,
+                    },
+                }
+            )
+        )
+        logger.debug(f"Sent request {request_id} to: {client_id}")
+
+        while True:
+            try:
+                msg = await asyncio.wait_for(ws.recv(), timeout=close_timeout)
+            except asyncio.TimeoutError:
+                return AgentResponse(
+                    is_success=False, execution_time=0, response="Request timed out"
+                )
+
+            body = json.loads(msg)
+            message_type = body.get("message_type")
+            if message_type == AGENT_RESPONSE_CHUNK:
+                if on_chunk:
+                    await on_chunk(body)
+                continue
+            if message_type == AGENT_TRACE_EVENT:
+                if on_trace_event:
+                    await on_trace_event(body)
+                continue
+            if message_type == WSMessageType.AGENT_RESPONSE.value:
+                return AgentResponse(
+                    is_success=True,
+                    execution_time=body.get("execution_time", 0),
+                    response=body.get("response", ""),
+                )
+            if message_type == WSMessageType.AGENT_ERROR.value:
+                return AgentResponse(
+                    is_success=False,
+                    execution_time=body.get("execution_time", 0),
+                    response=body.get("error", {}).get("error_message", ""),
+                )
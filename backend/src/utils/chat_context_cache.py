@@ -0,0 +1,354 @@
+import json
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from logging import getLogger
+from typing import Optional, Protocol
+
+from redis import asyncio as aioredis
+from redis.exceptions import WatchError
+from src.core.settings import get_settings
+from src.models import ChatMessage
+from src.schemas.api.chat.schemas import GetChatMessage
+from src.utils.enums import CursorDirection
+from src.utils.pagination import CursorPage, encode_cursor
+
+logger = getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class ChatContextWindow:
+    """
+    Most recent messages of a single chat, oldest first.
+
+    `complete` stays True while the window holds the whole conversation, so the
+    history endpoint knows whether older messages still live only in Postgres.
+    """
+
+    creator_id: str
+    messages: list[dict] = field(default_factory=list)
+    complete: bool = False
+
+
+def to_context_message(message: ChatMessage) -> dict:
+    return {
+        "id": str(message.id),
+        **GetChatMessage.model_validate(message, from_attributes=True).model_dump(
+            mode="json"
+        ),
+    }
+
+
+# an append that finds no window marks it stale for this long, so a warm up that
+# read Postgres before the message was written can't store its outdated window
+STALE_MARKER_TTL_SECONDS = 60
+
+
+def message_key(message: dict) -> tuple[str, str]:
+    """Order of messages within a chat."""
+    return message["created_at"], message["id"]
+
+
+def is_outdated(window: ChatContextWindow, stale_key: Optional[tuple]) -> bool:
+    """Whether the window misses a message appended while no window was cached."""
+    if not stale_key:
+        return False
+    return not window.messages or message_key(window.messages[-1]) < tuple(stale_key)
+
+
+class ChatContextBackend(Protocol):
+    async def get(self, session_id: str) -> Optional[ChatContextWindow]: ...
+
+    async def add(self, session_id: str, window: ChatContextWindow) -> bool: ...
+
+    async def append(self, session_id: str, message: dict) -> None: ...
+
+    async def delete(self, session_id: str) -> None: ...
+
+
+class InMemoryChatContextBackend:
+    """
+    Ring buffer per session kept in the backend process.
+    Least recently used sessions are evicted once `max_sessions` is reached, windows
+    not written to for `ttl` seconds expire.
+    """
+
+    def __init__(self, window_size: int, max_sessions: int, ttl: int):
+        self.window_size = window_size
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._windows: OrderedDict[str, tuple[str, deque, bool, float]] = OrderedDict()
+        # session id -> (key of the newest appended message, expires at)
+        self._stale: OrderedDict[str, tuple[tuple[str, str], float]] = OrderedDict()
+
+    def _entry(self, session_id: str) -> Optional[tuple[str, deque, bool, float]]:
+        entry = self._windows.get(session_id)
+        if entry and entry[3] <= time.monotonic():
+            del self._windows[session_id]
+            return None
+        return entry
+
+    def _stale_key(self, session_id: str) -> Optional[tuple[str, str]]:
+        stale = self._stale.get(session_id)
+        if stale and stale[1] <= time.monotonic():
+            del self._stale[session_id]
+            return None
+        return stale[0] if stale else None
+
+    async def get(self, session_id: str) -> Optional[ChatContextWindow]:
+        entry = self._entry(session_id)
+        if not entry:
+            return None
+        self._windows.move_to_end(session_id)
+        creator_id, messages, complete, _ = entry
+        return ChatContextWindow(
+            creator_id=creator_id, messages=list(messages), complete=complete
+        )
+
+    async def add(self, session_id: str, window: ChatContextWindow) -> bool:
+        if self._entry(session_id) or is_outdated(window, self._stale_key(session_id)):
+            return False
+        self._windows[session_id] = (
+            window.creator_id,
+            deque(window.messages, maxlen=self.window_size),
+            window.complete,
+            time.monotonic() + self.ttl,
+        )
+        while len(self._windows) > self.max_sessions:
+            self._windows.popitem(last=False)
+        return True
+
+    async def append(self, session_id: str, message: dict) -> None:
+        entry = self._entry(session_id)
+        if not entry:
+            self._stale[session_id] = (
+                message_key(message),
+                time.monotonic() + STALE_MARKER_TTL_SECONDS,
+            )
+            self._stale.move_to_end(session_id)
+            while len(self._stale) > self.max_sessions:
+                self._stale.popitem(last=False)
+            return
+        creator_id, messages, complete, _ = entry
+        # already there when the window was warmed after the message was written
+        if messages and message_key(messages[-1]) >= message_key(message):
+            return
+        # deque drops the oldest message on overflow, it is only left in Postgres
+        complete = complete and len(messages) < self.window_size
+        messages.append(message)
+        self._windows[session_id] = (
+            creator_id,
+            messages,
+            complete,
+            time.monotonic() + self.ttl,
+        )
+
+    async def delete(self, session_id: str) -> None:
+        self._windows.pop(session_id, None)
+
+
+class RedisChatContextBackend:
+    """
+    Shares windows between backend replicas.
+    Every session is a capped list of messages plus a hash with its metadata.
+    Windows are only added and appended to under WATCH, a write racing with another
+    one drops the window instead of leaving it outdated.
+    """
+
+    def __init__(self, uri: str, window_size: int, ttl: int):
+        self.redis = aioredis.from_url(uri, decode_responses=True)
+        self.window_size = window_size
+        self.ttl = ttl
+
+    @staticmethod
+    def _keys(session_id: str) -> tuple[str, str, str]:
+        return (
+            f"chat_context:{session_id}:meta",
+            f"chat_context:{session_id}:messages",
+            f"chat_context:{session_id}:stale",
+        )
+
+    async def get(self, session_id: str) -> Optional[ChatContextWindow]:
+        meta_key, messages_key, _ = self._keys(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            meta, messages = await (
+                pipe.hgetall(meta_key).lrange(messages_key, 0, -1).execute()
+            )
+        if not meta:
+            return None
+        return ChatContextWindow(
+            creator_id=meta["creator_id"],
+            messages=[json.loads(msg) for msg in messages],
+            complete=meta["complete"] == "1",
+        )
+
+    async def add(self, session_id: str, window: ChatContextWindow) -> bool:
+        meta_key, messages_key, stale_key = self._keys(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(meta_key, stale_key)
+                stale = await pipe.get(stale_key)
+                if await pipe.exists(meta_key) or is_outdated(
+                    window, json.loads(stale) if stale else None
+                ):
+                    return False
+                pipe.multi()
+                pipe.delete(messages_key)
+                if window.messages:
+                    pipe.rpush(messages_key, *(json.dumps(m) for m in window.messages))
+                    pipe.ltrim(messages_key, -self.window_size, -1)
+                    pipe.expire(messages_key, self.ttl)
+                pipe.hset(
+                    meta_key,
+                    mapping={
+                        "creator_id": window.creator_id,
+                        "complete": int(window.complete),
+                    },
+                )
+                pipe.expire(meta_key, self.ttl)
+                await pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    async def append(self, session_id: str, message: dict) -> None:
+        meta_key, messages_key, stale_key = self._keys(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(meta_key, messages_key)
+                if not await pipe.exists(meta_key):
+                    pipe.multi()
+                    pipe.set(
+                        stale_key,
+                        json.dumps(message_key(message)),
+                        ex=STALE_MARKER_TTL_SECONDS,
+                    )
+                    await pipe.execute()
+                    return
+                last = await pipe.lindex(messages_key, -1)
+                # already there when the window was warmed after the message was written
+                if last and message_key(json.loads(last)) >= message_key(message):
+                    return
+                length = await pipe.llen(messages_key)
+                pipe.multi()
+                pipe.rpush(messages_key, json.dumps(message))
+                pipe.ltrim(messages_key, -self.window_size, -1)
+                pipe.expire(messages_key, self.ttl)
+                pipe.expire(meta_key, self.ttl)
+                if length >= self.window_size:
+                    pipe.hset(meta_key, "complete", 0)
+                await pipe.execute()
+            except WatchError:
+                # raced with a warm up or another append, whether the window holds the
+                # message is unknown, it is dropped and rebuilt from Postgres
+                await (
+                    self.redis.pipeline(transaction=True)
+                    .set(
+                        stale_key,
+                        json.dumps(message_key(message)),
+                        ex=STALE_MARKER_TTL_SECONDS,
+                    )
+                    .delete(meta_key, messages_key)
+                    .execute()
+                )
+
+    async def delete(self, session_id: str) -> None:
+        meta_key, messages_key, _ = self._keys(session_id)
+        await self.redis.delete(meta_key, messages_key)
+
+
+class ChatContextCache:
+    """
+    Rolling context window of recent messages per chat session.
+
+    Kept up to date on every message written to a conversation, so the master agent
+    can build its context window without querying Postgres in steady state.
+    Cache failures are never propagated, callers simply fall back to the database.
+    """
+
+    def __init__(self, backend: ChatContextBackend, window_size: int):
+        self.backend = backend
+        self.window_size = window_size
+
+    def window_page(self, window: ChatContextWindow, per_page: int) -> CursorPage:
+        """
+        Newest first page of the chat history served from the window.
+        """
+        items = window.messages[::-1][:per_page]
+        page = CursorPage(items=items)
+        has_more = len(window.messages) > per_page or not window.complete
+        if items and has_more:
+            page.next_cursor = encode_cursor(
+                created_at=datetime.fromisoformat(items[-1]["created_at"]),
+                id_=items[-1]["id"],
+                direction=CursorDirection.next,
+            )
+        return page
+
+    async def get_page(
+        self, session_id: str, user_id: str, per_page: int
+    ) -> Optional[CursorPage]:
+        """
+        Returns None if the page can't be served from cache.
+        """
+        if per_page > self.window_size:
+            return None
+        try:
+            window = await self.backend.get(str(session_id))
+        except Exception as e:
+            logger.warning(f"Chat context cache read failed: {e}")
+            return None
+        if not window or window.creator_id != str(user_id):
+            return None
+        return self.window_page(window=window, per_page=per_page)
+
+    async def warm(
+        self, session_id: str, user_id: str, messages: list[dict], complete: bool
+    ) -> ChatContextWindow:
+        """
+        Store the latest messages of the chat, `messages` are ordered oldest first.
+
+        Only stored if the chat has no window yet and no message was written since
+        `messages` were read, the returned window is still good to serve this read.
+        """
+        window = ChatContextWindow(
+            creator_id=str(user_id), messages=messages, complete=complete
+        )
+        try:
+            await self.backend.add(str(session_id), window)
+        except Exception as e:
+            logger.warning(f"Chat context cache write failed: {e}")
+        return window
+
+    async def append(self, session_id: str, message: dict) -> None:
+        try:
+            await self.backend.append(str(session_id), message)
+        except Exception as e:
+            logger.warning(f"Chat context cache append failed: {e}")
+
+    async def invalidate(self, session_id: str) -> None:
+        try:
+            await self.backend.delete(str(session_id))
+        except Exception as e:
+            logger.warning(f"Chat context cache invalidation failed: {e}")
+
+
+def _init_backend() -> ChatContextBackend:
+    if settings.CHAT_CONTEXT_CACHE_BACKEND == "redis":
+        return RedisChatContextBackend(
+            uri=settings.CHAT_CONTEXT_CACHE_REDIS_URI,
+            window_size=settings.CHAT_CONTEXT_WINDOW_SIZE,
+            ttl=settings.CHAT_CONTEXT_CACHE_TTL_SECONDS,
+        )
+    return InMemoryChatContextBackend(
+        window_size=settings.CHAT_CONTEXT_WINDOW_SIZE,
+        max_sessions=settings.CHAT_CONTEXT_CACHE_MAX_SESSIONS,
+        ttl=settings.CHAT_CONTEXT_CACHE_TTL_SECONDS,
+    )
+
+
+chat_context_cache = ChatContextCache(
+    backend=_init_backend(), window_size=settings.CHAT_CONTEXT_WINDOW_SIZE
+)
@@ -0,0 +1,46 @@
+import hashlib
+import json
+from typing import Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.repositories.resource_version import resource_version_repo
+from src.utils.enums import CatalogResource
+from src.utils.file_storage import is_not_modified
+
+# cached copies are revalidated on every use, the ETag makes that a cheap check
+CATALOG_CACHE_CONTROL = "private, no-cache"
+
+
+async def check_not_modified(
+    db: AsyncSession,
+    request: Request,
+    response: Response,
+    user_id: UUID,
+    resources: Sequence[CatalogResource],
+) -> None:
+    """
+    Conditional GET of a catalog listing. The ETag is derived from the user's version
+    counters of the `resources` the listing is built from and the request url, so
+    every page and filter has its own. Raises 304 when the client copy is current,
+    otherwise sets the validator headers of the full response.
+    """
+    versions = await resource_version_repo.get_versions(
+        db=db, user_id=user_id, resources=resources
+    )
+    validator = json.dumps(
+        [
+            str(user_id),
+            request.url.path,
+            sorted(request.query_params.multi_items()),
+            versions,
+        ]
+    )
+    headers = {
+        "etag": f'"{hashlib.sha256(validator.encode()).hexdigest()[:32]}"',
+        "cache-control": CATALOG_CACHE_CONTROL,
+    }
+    if is_not_modified(request=request, headers=headers):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
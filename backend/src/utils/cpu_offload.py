@@ -0,0 +1,136 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from pydantic import BaseModel, computed_field
+from src.core.settings import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+class CPUTaskStats(BaseModel):
+    name: str
+    calls: int = 0
+    failures: int = 0
+    # time from the call until a worker picks it up
+    queue_wait_total: float = 0.0
+    queue_wait_max: float = 0.0
+    run_time_total: float = 0.0
+    run_time_max: float = 0.0
+
+    @computed_field
+    @property
+    def avg_queue_wait(self) -> float:
+        return self.queue_wait_total / self.calls if self.calls else 0.0
+
+    @computed_field
+    @property
+    def avg_run_time(self) -> float:
+        return self.run_time_total / self.calls if self.calls else 0.0
+
+
+class CPUOffloadStats(BaseModel):
+    max_workers: int
+    max_pending: int
+    pending: int
+    tasks: list[CPUTaskStats]
+
+
+class CPUOffloadExecutor:
+    """
+    Runs CPU heavy calls (bcrypt, scrypt key derivation of secrets, token signing)
+    on a bounded thread pool instead of the event loop. That work is
+    done in C extensions releasing the GIL, so it doesn't stall the loop.
+
+    At most `max_pending` calls are queued or running, later callers wait for a slot,
+    so a burst like a login storm queues up instead of growing without bound.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_pending: int,
+        thread_name_prefix: str = "cpu-offload",
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=thread_name_prefix
+        )
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._stats: dict[str, CPUTaskStats] = {}
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        task_name: Optional[str] = None,
+        **kwargs: Any,
+    ) -> T:
+        """Run `fn(*args, **kwargs)` on the pool, timings are kept under `task_name`."""
+        task_name = task_name or fn.__name__
+        stats = self._stats.setdefault(task_name, CPUTaskStats(name=task_name))
+        submitted_at = time.perf_counter()
+        self.pending += 1
+        try:
+            async with self._slots:
+                (
+                    started_at,
+                    finished_at,
+                    result,
+                    error,
+                ) = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, _timed_call, partial(fn, *args, **kwargs)
+                )
+        finally:
+            self.pending -= 1
+
+        queue_wait = started_at - submitted_at
+        run_time = finished_at - started_at
+        stats.calls += 1
+        stats.queue_wait_total += queue_wait
+        stats.queue_wait_max = max(stats.queue_wait_max, queue_wait)
+        stats.run_time_total += run_time
+        stats.run_time_max = max(stats.run_time_max, run_time)
+        if error is not None:
+            stats.failures += 1
+            raise error
+        return result
+
+    def stats(self) -> CPUOffloadStats:
+        return CPUOffloadStats(
+            max_workers=self.max_workers,
+            max_pending=self.max_pending,
+            pending=self.pending,
+            tasks=[s.model_copy() for s in self._stats.values()],
+        )
+
+
+def _timed_call(
+    call: Callable[[], T],
+) -> tuple[float, float, Optional[T], Optional[BaseException]]:
+    # exceptions are returned, so the timing is recorded for failed calls too
+    started_at = time.perf_counter()
+    try:
+        result, error = call(), None
+    except Exception as e:
+        result, error = None, e
+    return started_at, time.perf_counter(), result, error
+
+
+cpu_offload = CPUOffloadExecutor(
+    max_workers=settings.CPU_OFFLOAD_MAX_WORKERS,
+    max_pending=settings.CPU_OFFLOAD_MAX_PENDING,
+)
+# hashing an assembled upload takes seconds, it gets its own pool so it doesn't hold
+# the workers of logins and token signing
+file_hashing = CPUOffloadExecutor(
+    max_workers=settings.FILE_HASHING_MAX_WORKERS,
+    max_pending=settings.FILE_HASHING_MAX_PENDING,
+    thread_name_prefix="file-hashing",
+)
@@ -34,3 +34,18 @@ class AgentIdType(Enum):
     agent_id = "agent_id"
     mcp_tool_id = "mcp_tool_id"
     a2a_card_id = "a2a_card_id"
+
+
+class CursorDirection(Enum):
+    next = "next"
+    prev = "prev"
+
+
+class CatalogResource(Enum):
+    """Resources versioned for conditional GETs, kept in sync with the triggers."""
+
+    agents = "agents"
+    agentflows = "agentflows"
+    llms = "llms"
+    mcp = "mcp"
+    a2a = "a2a"
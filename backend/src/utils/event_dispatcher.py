@@ -0,0 +1,104 @@
+import asyncio
+from collections import deque
+from logging import getLogger
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+logger = getLogger(__name__)
+
+T = TypeVar("T")
+Handler = Callable[[], Awaitable[None]]
+
+
+class KeyedDispatcher:
+    """
+    Runs event handlers concurrently across keys and one at a time, in submission
+    order, for the same key. At most `max_concurrency` handlers run at once.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queues: dict[str, deque[Handler]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(self, key: str, handler: Handler) -> None:
+        queue = self._queues.get(key)
+        if queue is not None:
+            # drained by the task already running for the key
+            queue.append(handler)
+            return
+
+        self._queues[key] = deque([handler])
+        task = asyncio.create_task(self._drain(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def join(self) -> None:
+        """Wait until every submitted handler has run."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _drain(self, key: str) -> None:
+        queue = self._queues[key]
+        try:
+            while queue:
+                handler = queue.popleft()
+                async with self._semaphore:
+                    try:
+                        await handler()
+                    except Exception as e:
+                        logger.error(f"Event handler of {key} failed. Details: {e!r}")
+        finally:
+            del self._queues[key]
+
+
+class BatchCoalescer(Generic[T]):
+    """
+    Collects items submitted within `window` seconds of the first one, or until
+    `max_size` items are collected, and processes them with a single `process` call.
+    Submitters wait until their batch is processed and get its exception, if any.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[list[T]], Awaitable[None]],
+        max_size: int,
+        window: float,
+    ):
+        self.process = process
+        self.max_size = max_size
+        self.window = window
+        self._items: list[T] = []
+        self._done: Optional[asyncio.Future] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flushing: set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> None:
+        if self._done is None:
+            self._done = asyncio.get_running_loop().create_future()
+            self._flush_task = asyncio.create_task(self._flush_later())
+        done = self._done
+        self._items.append(item)
+        if len(self._items) >= self.max_size:
+            self._flush_task.cancel()
+            task = asyncio.create_task(self._flush(*self._take()))
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+        await asyncio.shield(done)
+
+    def _take(self) -> tuple[list[T], asyncio.Future]:
+        # the batch is detached right away, later items start a new one
+        items, done = self._items, self._done
+        self._items, self._done, self._flush_task = [], None, None
+        return items, done
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        await self._flush(*self._take())
+
+    async def _flush(self, items: list[T], done: asyncio.Future) -> None:
+        try:
+            await self.process(items)
+        except Exception as e:
+            done.set_exception(e)
+        else:
+            done.set_result(None)
@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from pydantic import BaseModel, computed_field
+from src.core.settings import get_settings
+from src.schemas.api.files.dto import FilePathDTO
+from src.utils.file_storage import download_headers, is_not_modified
+from starlette.requests import Request
+from starlette.responses import Response
+
+settings = get_settings()
+
+
+@dataclass
+class CachedFile:
+    creator_id: str
+    file: FilePathDTO
+    body: bytes
+
+
+class FileCacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+    max_bytes: int = 0
+
+    @computed_field
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class FileCache:
+    """
+    In-process LRU of small file bodies and the metadata needed to serve them.
+
+    Bounded by the total size of cached bodies, least recently read files are evicted
+    first. Entries are keyed by file id and only served to the creator of the file.
+    """
+
+    def __init__(self, max_bytes: int, max_file_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = min(max_file_bytes, max_bytes)
+        self.stats = FileCacheStats(max_bytes=max_bytes)
+        self._entries: OrderedDict[str, CachedFile] = OrderedDict()
+
+    def accepts(self, size: Optional[int]) -> bool:
+        return self.max_bytes > 0 and size is not None and size <= self.max_file_bytes
+
+    def get(self, file_id: str, creator_id: str) -> Optional[CachedFile]:
+        cached = self._entries.get(str(file_id))
+        if not cached or cached.creator_id != str(creator_id):
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(str(file_id))
+        self.stats.hits += 1
+        return cached
+
+    def put(self, file_id: str, cached: CachedFile) -> None:
+        if not self.accepts(len(cached.body)):
+            return
+        self.invalidate(file_id, count=False)
+        self._entries[str(file_id)] = cached
+        self.stats.bytes += len(cached.body)
+        while self.stats.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.stats.bytes -= len(evicted.body)
+            self.stats.evictions += 1
+        self.stats.entries = len(self._entries)
+
+    def invalidate(self, file_id: str, count: bool = True) -> None:
+        cached = self._entries.pop(str(file_id), None)
+        if not cached:
+            return
+        self.stats.bytes -= len(cached.body)
+        self.stats.entries = len(self._entries)
+        if count:
+            self.stats.invalidations += 1
+
+
+def cached_file_response(request: Request, cached: CachedFile) -> Response:
+    # Range requests are answered with the full body, which is allowed for small files
+    headers = download_headers(name=str(cached.file.fp), filename=cached.file.file_name)
+    if is_not_modified(request=request, headers=headers):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=cached.body, media_type=cached.file.mime_type, headers=headers
+    )
+
+
+file_cache = FileCache(
+    max_bytes=settings.FILES_CACHE_MAX_BYTES,
+    max_file_bytes=settings.FILES_CACHE_MAX_FILE_BYTES,
+)
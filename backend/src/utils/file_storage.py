@@ -0,0 +1,535 @@
+import hashlib
+import hmac
+import time
+import uuid
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Optional, Protocol
+from urllib.parse import quote, urlencode
+
+import anyio
+from fastapi import HTTPException, UploadFile, status
+from pydantic import BaseModel, computed_field
+from src.core.settings import get_settings
+from src.utils.constants import FILES_DIR
+from src.utils.cpu_offload import file_hashing
+from starlette.requests import ClientDisconnect, Request
+from starlette.responses import FileResponse, RedirectResponse, Response
+
+logger = getLogger(__name__)
+settings = get_settings()
+
+# partially written uploads, on the same filesystem so the final move is atomic
+UPLOADS_TMP_DIR: Path = FILES_DIR / ".uploads"
+
+# locks the content stored under a name until the caller's transaction ends
+ContentLock = Callable[[str], Awaitable[None]]
+
+
+@dataclass
+class StoredFile:
+    content_hash: str
+    internal_name: str
+    internal_id: str
+    size: int
+    duplicate: bool
+
+
+class UploadStats(BaseModel):
+    uploads: int = 0
+    deduplicated: int = 0
+    rejected: int = 0
+    bytes_received: int = 0
+    bytes_stored: int = 0
+    seconds_spent: float = 0.0
+
+    @computed_field
+    @property
+    def throughput_bytes_per_second(self) -> float:
+        if not self.seconds_spent:
+            return 0.0
+        return self.bytes_received / self.seconds_spent
+
+
+upload_stats = UploadStats()
+
+
+def _content_disposition(filename: str, attachment: bool = False) -> str:
+    disposition = "attachment" if attachment else "inline"
+    return f"{disposition}; filename*=utf-8''{quote(filename)}"
+
+
+def download_headers(
+    name: str, filename: str, attachment: bool = False
+) -> dict[str, str]:
+    # stored names are content addressed (or random for older files) so they
+    # never change, the stem is a valid strong validator
+    return {
+        "etag": f'"{Path(name).stem}"',
+        "cache-control": "private, max-age=31536000, immutable",
+        "content-disposition": _content_disposition(filename, attachment),
+    }
+
+
+def is_not_modified(request: Request, headers: dict[str, str]) -> bool:
+    return headers["etag"] in request.headers.get("if-none-match", "")
+
+
+class FileStorage(Protocol):
+    async def put(self, local_path: anyio.Path, name: str, mimetype: str) -> bool:
+        """Store a local file under `name`, returns True if it was already stored."""
+        ...
+
+    async def exists(self, name: str) -> bool: ...
+
+    async def read(self, name: str) -> bytes: ...
+
+    async def delete(self, name: str) -> None: ...
+
+    async def download_url(
+        self,
+        name: str,
+        filename: str,
+        mimetype: str,
+        expires_in: int,
+        attachment: bool = False,
+    ) -> str:
+        """
+        Direct, time limited URL to the file content. Browsers ignore the download
+        attribute of cross origin links, `attachment` makes them save the content
+        under `filename` instead of opening it.
+        """
+        ...
+
+    async def download_response(
+        self,
+        request: Request,
+        name: str,
+        filename: str,
+        mimetype: str,
+        attachment: bool = False,
+    ) -> Response:
+        """Response for an already authorized download of the file."""
+        ...
+
+
+class LocalFileStorage:
+    """
+    Files kept on the shared volume.
+
+    Direct downloads are served by the backend itself, from URLs signed with HMAC so
+    they can be fetched without credentials until they expire.
+    """
+
+    def __init__(self, root: Path, secret_key: str):
+        self.root = root
+        self.secret_key = secret_key.encode()
+
+    def path(self, name: str) -> Path:
+        path = (self.root / name).resolve()
+        if path.parent != self.root.resolve():
+            raise HTTPException(status_code=400, detail="Invalid file name")
+        return path
+
+    async def put(self, local_path: anyio.Path, name: str, mimetype: str) -> bool:
+        final_path = anyio.Path(self.path(name))
+        if await final_path.exists():
+            return True
+        await local_path.rename(final_path)
+        return False
+
+    async def exists(self, name: str) -> bool:
+        return await anyio.Path(self.path(name)).exists()
+
+    async def read(self, name: str) -> bytes:
+        return await anyio.Path(self.path(name)).read_bytes()
+
+    async def delete(self, name: str) -> None:
+        await anyio.Path(self.path(name)).unlink(missing_ok=True)
+
+    def _sign(
+        self,
+        name: str,
+        expires: int,
+        filename: str,
+        mimetype: str,
+        attachment: bool = False,
+    ) -> str:
+        parts = (name, str(expires), filename, mimetype)
+        if attachment:
+            parts += ("attachment",)
+        message = "\n".join(parts).encode()
+        return hmac.new(self.secret_key, message, hashlib.sha256).hexdigest()
+
+    def verify(
+        self,
+        name: str,
+        expires: int,
+        filename: str,
+        mimetype: str,
+        signature: str,
+        attachment: bool = False,
+    ) -> bool:
+        if expires < time.time():
+            return False
+        expected = self._sign(name, expires, filename, mimetype, attachment)
+        return hmac.compare_digest(expected, signature)
+
+    async def download_url(
+        self,
+        name: str,
+        filename: str,
+        mimetype: str,
+        expires_in: int,
+        attachment: bool = False,
+    ) -> str:
+        expires = int(time.time()) + expires_in
+        params = {
+            "expires": expires,
+            "filename": filename,
+            "mimetype": mimetype,
+            "signature": self._sign(name, expires, filename, mimetype, attachment),
+        }
+        if attachment:
+            params["attachment"] = "true"
+        return f"/files/blobs/{quote(name)}?{urlencode(params)}"
+
+    async def download_response(
+        self,
+        request: Request,
+        name: str,
+        filename: str,
+        mimetype: str,
+        attachment: bool = False,
+    ) -> Response:
+        headers = download_headers(name=name, filename=filename, attachment=attachment)
+        if is_not_modified(request=request, headers=headers):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        # FileResponse handles Range and If-Range requests by itself
+        return FileResponse(path=self.path(name), media_type=mimetype, headers=headers)
+
+
+class S3FileStorage:
+    """
+    Files kept in an S3 compatible bucket (AWS S3, MinIO, ...).
+
+    The backend never proxies the content, downloads are redirected to presigned URLs
+    and the object store takes care of Range and ETag handling.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str],
+        region: Optional[str],
+        access_key_id: Optional[str],
+        secret_access_key: Optional[str],
+        download_url_ttl: int,
+    ):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError(
+                "S3 storage backend requires 'boto3' package to be installed"
+            )
+
+        self.client_error = ClientError
+        self.bucket = bucket
+        self.download_url_ttl = download_url_ttl
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+        )
+
+    async def put(self, local_path: anyio.Path, name: str, mimetype: str) -> bool:
+        if await self.exists(name):
+            return True
+        await anyio.to_thread.run_sync(
+            lambda: self.client.upload_file(
+                str(local_path),
+                self.bucket,
+                name,
+                ExtraArgs={"ContentType": mimetype},
+            )
+        )
+        return False
+
+    async def exists(self, name: str) -> bool:
+        try:
+            await anyio.to_thread.run_sync(
+                lambda: self.client.head_object(Bucket=self.bucket, Key=name)
+            )
+            return True
+        except self.client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return False
+            raise
+
+    async def read(self, name: str) -> bytes:
+        def _read():
+            obj = self.client.get_object(Bucket=self.bucket, Key=name)
+            return obj["Body"].read()
+
+        return await anyio.to_thread.run_sync(_read)
+
+    async def delete(self, name: str) -> None:
+        await anyio.to_thread.run_sync(
+            lambda: self.client.delete_object(Bucket=self.bucket, Key=name)
+        )
+
+    async def download_url(
+        self,
+        name: str,
+        filename: str,
+        mimetype: str,
+        expires_in: int,
+        attachment: bool = False,
+    ) -> str:
+        # presigning is computed locally, no request to the object store is made
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": name,
+                "ResponseContentType": mimetype,
+                "ResponseContentDisposition": _content_disposition(
+                    filename, attachment
+                ),
+            },
+            ExpiresIn=expires_in,
+        )
+
+    async def download_response(
+        self,
+        request: Request,
+        name: str,
+        filename: str,
+        mimetype: str,
+        attachment: bool = False,
+    ) -> Response:
+        url = await self.download_url(
+            name=name,
+            filename=filename,
+            mimetype=mimetype,
+            expires_in=self.download_url_ttl,
+            attachment=attachment,
+        )
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+
+def _init_storage() -> FileStorage:
+    if settings.FILES_STORAGE_BACKEND == "s3":
+        return S3FileStorage(
+            bucket=settings.FILES_S3_BUCKET,
+            endpoint_url=settings.FILES_S3_ENDPOINT_URL,
+            region=settings.FILES_S3_REGION,
+            access_key_id=settings.FILES_S3_ACCESS_KEY_ID,
+            secret_access_key=settings.FILES_S3_SECRET_ACCESS_KEY,
+            download_url_ttl=settings.FILES_DOWNLOAD_URL_TTL_SECONDS,
+        )
+    return LocalFileStorage(root=FILES_DIR, secret_key=settings.SECRET_KEY)
+
+
+file_storage: FileStorage = _init_storage()
+
+
+def _reject_too_large(max_size: int):
+    upload_stats.rejected += 1
+    raise HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds the maximum upload size of {max_size} bytes",
+    )
+
+
+async def store_upload(
+    file: UploadFile,
+    lock: ContentLock,
+    max_size: int = settings.FILES_MAX_UPLOAD_SIZE_BYTES,
+    chunk_size: int = settings.FILES_UPLOAD_CHUNK_SIZE_BYTES,
+) -> StoredFile:
+    """
+    Stream an upload to disk chunk by chunk without blocking the event loop.
+
+    Content is hashed while it is written and stored under its sha256 digest, so the
+    same file uploaded several times is kept in the storage only once. The content
+    is stored holding `lock`, see `_store_blob`.
+    """
+    if file.size is not None and file.size > max_size:
+        _reject_too_large(max_size)
+
+    started_at = time.perf_counter()
+    hasher = hashlib.sha256()
+    size = 0
+
+    await anyio.Path(UPLOADS_TMP_DIR).mkdir(parents=True, exist_ok=True)
+    tmp_path = anyio.Path(UPLOADS_TMP_DIR / f"{uuid.uuid4()}.part")
+    try:
+        async with await anyio.open_file(tmp_path, "wb") as buffer:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_size:
+                    _reject_too_large(max_size)
+                # a thread hop per chunk costs more than hashing it, streamed uploads
+                # are hashed inline; assembled resumable uploads are hashed off-loop
+                hasher.update(chunk)
+                await buffer.write(chunk)
+
+        stored = await _store_blob(
+            tmp_path=tmp_path,
+            content_hash=hasher.hexdigest(),
+            filename=file.filename,
+            mimetype=file.content_type,
+            size=size,
+            lock=lock,
+        )
+    finally:
+        await tmp_path.unlink(missing_ok=True)
+
+    _record_upload(stored=stored, elapsed=time.perf_counter() - started_at)
+    return stored
+
+
+async def _store_blob(
+    tmp_path: anyio.Path,
+    content_hash: str,
+    filename: Optional[str],
+    mimetype: Optional[str],
+    size: int,
+    lock: ContentLock,
+) -> StoredFile:
+    internal_name = f"{content_hash}{Path(filename or '').suffix}"
+    # a duplicate is only skipped if the content can't be removed before the file
+    # referencing it is created, in the transaction holding the lock
+    await lock(internal_name)
+    duplicate = await file_storage.put(
+        local_path=tmp_path,
+        name=internal_name,
+        mimetype=mimetype or "application/octet-stream",
+    )
+    return StoredFile(
+        content_hash=content_hash,
+        internal_name=internal_name,
+        internal_id=str(uuid.UUID(content_hash[:32])),
+        size=size,
+        duplicate=duplicate,
+    )
+
+
+def _record_upload(stored: StoredFile, elapsed: float) -> None:
+    upload_stats.uploads += 1
+    upload_stats.bytes_received += stored.size
+    upload_stats.seconds_spent += elapsed
+    if stored.duplicate:
+        upload_stats.deduplicated += 1
+    else:
+        upload_stats.bytes_stored += stored.size
+    logger.debug(
+        f"Stored upload {stored.internal_name}: {stored.size} bytes in {elapsed:.3f}s, "
+        f"duplicate={stored.duplicate}"
+    )
+
+
+def upload_part_path(upload_id: str) -> anyio.Path:
+    return anyio.Path(UPLOADS_TMP_DIR / f"{upload_id}.part")
+
+
+async def create_upload_part(upload_id: str) -> None:
+    await anyio.Path(UPLOADS_TMP_DIR).mkdir(parents=True, exist_ok=True)
+    await upload_part_path(upload_id).touch()
+
+
+async def write_upload_chunk(
+    upload_id: str,
+    offset: int,
+    chunks: AsyncIterator[bytes],
+    max_size: int = settings.FILES_RESUMABLE_UPLOAD_MAX_SIZE_BYTES,
+) -> int:
+    """
+    Write a chunk of a resumable upload at `offset`, returns the offset reached.
+
+    Leftovers of an earlier interrupted chunk past `offset` are overwritten. If the
+    client disconnects mid chunk the bytes received so far are kept, so the upload
+    resumes from there instead of from the start of the chunk.
+    """
+    received = offset
+    async with await anyio.open_file(upload_part_path(upload_id), "r+b") as buffer:
+        await buffer.seek(offset)
+        await buffer.truncate()
+        try:
+            async for chunk in chunks:
+                if received + len(chunk) > max_size:
+                    _reject_too_large(max_size)
+                await buffer.write(chunk)
+                received += len(chunk)
+        except ClientDisconnect:
+            logger.debug(f"Upload {upload_id} interrupted at {received} bytes")
+    return received
+
+
+def _hash_file(path: Path, chunk_size: int) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+async def complete_upload(
+    upload_id: str,
+    filename: str,
+    mimetype: str,
+    size: int,
+    lock: ContentLock,
+    chunk_size: int = settings.FILES_UPLOAD_CHUNK_SIZE_BYTES,
+) -> StoredFile:
+    """
+    Move an assembled upload into the storage, deduplicated by content hash.
+    """
+    started_at = time.perf_counter()
+    part_path = upload_part_path(upload_id)
+    try:
+        content_hash = await file_hashing.run(
+            _hash_file, Path(part_path), chunk_size, task_name="hash_file"
+        )
+        stored = await _store_blob(
+            tmp_path=part_path,
+            content_hash=content_hash,
+            filename=filename,
+            mimetype=mimetype,
+            size=size,
+            lock=lock,
+        )
+    finally:
+        await part_path.unlink(missing_ok=True)
+
+    _record_upload(stored=stored, elapsed=time.perf_counter() - started_at)
+    return stored
+
+
+async def discard_upload_part(upload_id: str) -> None:
+    await upload_part_path(upload_id).unlink(missing_ok=True)
+
+
+async def cleanup_stale_upload_parts(older_than: float) -> int:
+    """
+    Remove part files not written since the `older_than` timestamp, including the ones
+    of plain uploads interrupted by a crash. Returns the number of removed files.
+    """
+    removed = 0
+    uploads_dir = anyio.Path(UPLOADS_TMP_DIR)
+    if not await uploads_dir.exists():
+        return removed
+    async for path in uploads_dir.glob("*.part"):
+        try:
+            if (await path.stat()).st_mtime < older_than:
+                await path.unlink(missing_ok=True)
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
@@ -1,4 +1,6 @@
+from datetime import datetime
 from typing import Optional
+from uuid import UUID
 
 from pydantic import BaseModel
 
@@ -6,3 +8,14 @@ from pydantic import BaseModel
 class AgentFilter(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
+
+
+class LogFilter(BaseModel):
+    session_id: Optional[UUID] = None
+    request_id: Optional[UUID] = None
+    log_level: Optional[list[str]] = None
+    agent_id: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    # only logs of chat sessions owned by this user
+    creator_id: Optional[UUID] = None
@@ -9,7 +9,7 @@ from uuid import UUID
 from fastapi import HTTPException
 from mcp.types import Tool
 from pydantic import AnyHttpUrl
-from sqlalchemy import and_, select, update
+from sqlalchemy import Boolean, and_, literal_column, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.auth.encrypt import encrypt_secret
 from src.auth.jwt import TokenLifespanType, validate_token
@@ -166,6 +166,48 @@ def strip_endpoints_from_url(url: AnyHttpUrl | str) -> str:
     )
 
 
+def normalize_url(url: AnyHttpUrl | str) -> str:
+    """
+    Canonical form of a URL used to detect the same remote server registered with
+    cosmetic differences: lowercase scheme and host, no default port, no trailing slash.
+    """
+    parsed_url = urlparse(str(url).strip())
+    scheme = parsed_url.scheme.lower()
+    host = (parsed_url.hostname or "").lower()
+    port = parsed_url.port
+    if port and (scheme, port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{port}"
+    return urlunparse(
+        (scheme, host, parsed_url.path.rstrip("/"), "", parsed_url.query, "")
+    )
+
+
+# A flow is active only when every member of the flow (genai agent, mcp tool or a2a card) is active.
+# Correlated to the `agentworkflows` row of the enclosing UPDATE/SELECT statement.
+ALL_FLOW_MEMBERS_ACTIVE = literal_column(
+    """(NOT EXISTS (
+    SELECT 1 FROM jsonb_array_elements(agentworkflows.flow) AS member
+    WHERE NOT CASE member ->> 'type'
+        WHEN 'genai' THEN EXISTS (
+            SELECT 1 FROM agents
+            WHERE agents.id = (member ->> 'id')::uuid AND agents.is_active
+        )
+        WHEN 'mcp' THEN EXISTS (
+            SELECT 1 FROM mcptools
+            JOIN mcpservers ON mcpservers.id = mcptools.mcp_server_id
+            WHERE mcptools.id = (member ->> 'id')::uuid AND mcpservers.is_active
+        )
+        WHEN 'a2a' THEN EXISTS (
+            SELECT 1 FROM a2acards
+            WHERE a2acards.id = (member ->> 'id')::uuid AND a2acards.is_active
+        )
+        ELSE FALSE
+    END
+))""",
+    type_=Boolean,
+)
+
+
 class FlowValidator:
     async def _validate_genai_ids(self, genai_ids: list[Optional[str]], user_id: UUID):
         async with async_session() as db:
@@ -261,146 +303,80 @@ class FlowValidator:
         )
 
     async def trigger_flow_validation_on_agent_state_change(
-        self, db: AsyncSession, agent_type: AgentType
-    ):
+        self,
+        db: AsyncSession,
+        agent_type: AgentType,
+        agent_ids: Optional[list[str | UUID]] = None,
+    ) -> list[str]:
         """
-        Unified helper method to run during mcp/a2a lookups to set flows with inactive tools/cards as inactive
+        Unified helper method to run on agent register and during mcp/a2a lookups
+        to recompute `is_active` of the flows which contain the changed agents.
+
+        Flows are looked up via the GIN index on `agentworkflows.flow`, either by the exact
+        member ids (if `agent_ids` were provided) or by all members of the given `agent_type`.
+        The state is recomputed in a single UPDATE, only rows whose state changes are touched.
+
+        Returns: list of flow ids whose `is_active` state was changed
         """
-        active_flows = await db.scalars(
-            select(AgentWorkflow)
-            .order_by(AgentWorkflow.created_at)
-            .order_by(AgentWorkflow.created_at.desc())
-        )
-        agentflows: list[AgentWorkflow] = active_flows.all()
-        flow_ids = [f.id for f in agentflows]
-        flows = [f.flow for f in agentflows]
-        for flow_id, flow in zip(flow_ids, flows):
-            flow_agent_ids = []  # either mcp/a2a ids
-            for tool in flow:
-                if tool["type"] == agent_type.value:
-                    flow_agent_ids.append(tool)
-
-            if AgentType.mcp == agent_type:
-                active_tools = await db.scalars(
-                    select(MCPTool)
-                    .join(MCPServer, MCPServer.id == MCPTool.mcp_server_id)
-                    .where(
-                        and_(
-                            MCPTool.id.in_([a["id"] for a in flow_agent_ids]),
-                            MCPServer.is_active.is_(True),
-                        )
-                    )
+        if agent_ids:
+            members = [[{"id": str(agent_id)}] for agent_id in agent_ids]
+        else:
+            members = [[{"type": agent_type.value}]]
+
+        q = await db.execute(
+            update(AgentWorkflow)
+            .where(
+                and_(
+                    or_(*[AgentWorkflow.flow.contains(m) for m in members]),
+                    AgentWorkflow.is_active.is_distinct_from(ALL_FLOW_MEMBERS_ACTIVE),
                 )
+            )
+            .values(is_active=ALL_FLOW_MEMBERS_ACTIVE)
+            .returning(AgentWorkflow.id)
+        )
+        updated_flow_ids = [str(flow_id) for flow_id in q.scalars().all()]
+        await db.commit()
+        return updated_flow_ids
 
-                if len(active_tools.all()) != len(
-                    [
-                        f["id"]
-                        for f in flow_agent_ids
-                        if f["type"] == AgentType.mcp.value
-                    ]
-                ):
-                    await db.execute(
-                        update(AgentWorkflow)
-                        .where(AgentWorkflow.id == flow_id)
-                        .values({"is_active": False})
-                    )
-                    await db.commit()
-                else:
-                    await db.execute(
-                        update(AgentWorkflow)
-                        .where(AgentWorkflow.id == flow_id)
-                        .values({"is_active": True})
-                    )
-                    await db.commit()
-
-            if AgentType.a2a == agent_type:
-                active_cards = await db.scalars(
-                    select(A2ACard).where(
-                        and_(
-                            A2ACard.id.in_([a["id"] for a in flow_agent_ids]),
-                            A2ACard.is_active.is_(True),
-                        )
-                    )
-                )
-                if len(active_cards.all()) != len(
-                    [
-                        f["id"]
-                        for f in flow_agent_ids
-                        if f["type"] == AgentType.a2a.value
-                    ]
-                ):
-                    await db.execute(
-                        update(AgentWorkflow)
-                        .where(AgentWorkflow.id == flow_id)
-                        .values({"is_active": False})
-                    )
-                    await db.commit()
-                else:
-                    await db.execute(
-                        update(AgentWorkflow)
-                        .where(AgentWorkflow.id == flow_id)
-                        .values({"is_active": True})
-                    )
-                    await db.commit()
-
-            if AgentType.genai == agent_type:
-                active_agents = await db.scalars(
-                    select(Agent).where(
-                        and_(
-                            Agent.id.in_([a["id"] for a in flow_agent_ids]),
-                            Agent.is_active.is_(True),
-                        )
-                    )
-                )
-                if len(active_agents.all()) != len(
-                    [
-                        f["id"]
-                        for f in flow_agent_ids
-                        if f["type"] == AgentType.genai.value
-                    ]
-                ):
-                    await db.execute(
-                        update(AgentWorkflow)
-                        .where(AgentWorkflow.id == flow_id)
-                        .values({"is_active": False})
-                    )
-                    await db.commit()
-                else:
-                    await db.execute(
-                        update(AgentWorkflow)
-                        .where(AgentWorkflow.id == flow_id)
-                        .values({"is_active": True})
-                    )
-                    await db.commit()
+    async def get_flows_state(
+        self, flows: list[AgentWorkflow], user_id: UUID
+    ) -> dict[str, bool]:
+        """
+        Computes `is_active` of many flows with a single validation of all their
+        members. Returns: mapping of flow id to its state
+        """
+        agents = [FlowAgentId(**a) for flow in flows for a in flow.flow]
+        active_agents = set(
+            await self.validate_is_active_of_all_agent_types(
+                flow_agents=agents, user_id=user_id
+            )
+        )
+        # lookup via all() is covering the cases when there are multiple tools in the flow with the same id
+        return {
+            str(flow.id): all(a["id"] in active_agents for a in flow.flow)
+            for flow in flows
+        }
 
     async def trigger_flow_state_lookup_of_all_agents(
         self,
         flow: AgentWorkflow,
         user_id: UUID,
     ) -> AgentWorkflow:
-        agents = []
-        for a in flow.flow:
-            agent_id = FlowAgentId(**a)
-            agents.append(agent_id)
-
-        active_agents = await self.validate_is_active_of_all_agent_types(
-            flow_agents=agents, user_id=user_id
-        )
-
-        # lookup via all() is covering the cases when there are multiple tools in the flow with the same id
-        if all([a["id"] in active_agents for a in flow.flow]):
-            flow.is_active = True
-        else:
-            flow.is_active = False
-
+        states = await self.get_flows_state(flows=[flow], user_id=user_id)
+        flow.is_active = states[str(flow.id)]
         return flow
 
 
-def validate_and_encrypt_provider_api_key(api_key: str) -> str:
+def validate_provider_api_key(api_key: str) -> str:
     if not api_key:
         raise ValueError("'api_key' must be specified for this provider")
     if len(api_key) < 1:
         raise ValueError("'api_key' param cannot be empty")
+    return api_key
+
+
+def validate_and_encrypt_provider_api_key(api_key: str) -> str:
+    validate_provider_api_key(api_key)
     if isinstance(api_key, str):
         return encrypt_secret(api_key)
     return api_key
@@ -0,0 +1,278 @@
+import asyncio
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from logging import getLogger
+from typing import Awaitable, Callable, Optional, Protocol
+
+from aiohttp import ClientSession
+from pydantic import BaseModel, computed_field
+from src.core.settings import get_settings
+
+logger = getLogger(__name__)
+settings = get_settings()
+
+Job = Callable[[], Awaitable[None]]
+
+
+class JobRun(BaseModel):
+    started_at: datetime
+    duration: float
+    ok: bool
+    error: Optional[str] = None
+
+
+class JobStats(BaseModel):
+    name: str
+    # None for one-off jobs
+    interval: Optional[float] = None
+    leader_only: bool = False
+    running: bool = False
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    last_runs: list[JobRun] = []
+
+    @computed_field
+    @property
+    def avg_duration(self) -> float:
+        durations = [run.duration for run in self.last_runs]
+        return sum(durations) / len(durations) if durations else 0.0
+
+    @computed_field
+    @property
+    def max_duration(self) -> float:
+        return max((run.duration for run in self.last_runs), default=0.0)
+
+
+class LeaderLock(Protocol):
+    is_leader: bool
+
+    async def acquire(self) -> bool: ...
+
+    async def release(self) -> None: ...
+
+
+class LocalLeaderLock:
+    """Single process deployments, the process is always the leader."""
+
+    is_leader = True
+
+    async def acquire(self) -> bool:
+        return True
+
+    async def release(self) -> None:
+        return None
+
+
+class RedisLeaderLock:
+    """
+    Lease in redis held by one process at a time. The lease is renewed on every
+    `acquire` call, so the holder keeps it as long as it is renewed before `ttl`.
+    """
+
+    # lease is only renewed or released by the process that holds it
+    RENEW_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('pexpire', KEYS[1], ARGV[2])
+    end
+    return 0
+    """
+    RELEASE_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, uri: str, key: str, ttl: float):
+        from redis import asyncio as aioredis
+
+        self.redis = aioredis.from_url(uri, decode_responses=True)
+        self.key = key
+        self.ttl_ms = int(ttl * 1000)
+        self.token = uuid.uuid4().hex
+        self.is_leader = False
+
+    async def acquire(self) -> bool:
+        try:
+            if self.is_leader:
+                renewed = await self.redis.eval(
+                    self.RENEW_SCRIPT, 1, self.key, self.token, self.ttl_ms
+                )
+                self.is_leader = bool(renewed)
+            if not self.is_leader:
+                acquired = await self.redis.set(
+                    self.key, self.token, nx=True, px=self.ttl_ms
+                )
+                self.is_leader = bool(acquired)
+        except Exception as e:
+            # an unreachable redis can't prove the lease is still ours
+            logger.warning(f"Could not acquire jobs leader lock. Details: {e!r}")
+            self.is_leader = False
+        return self.is_leader
+
+    async def release(self) -> None:
+        if not self.is_leader:
+            return
+        self.is_leader = False
+        try:
+            await self.redis.eval(self.RELEASE_SCRIPT, 1, self.key, self.token)
+        except Exception as e:
+            logger.warning(f"Could not release jobs leader lock. Details: {e!r}")
+
+
+class JobRunner:
+    """
+    Runs periodic and one-off background jobs on the running event loop.
+
+    Jobs share the loop with the rest of the process, so the DB pool and the HTTP
+    session live across runs. A periodic job never overlaps with itself, jobs marked
+    `leader_only` only run in the process holding the leader lock. The last
+    `history_size` runs of every job are kept with their timings.
+    """
+
+    def __init__(self, leader_lock: LeaderLock, lock_ttl: float, history_size: int):
+        self.leader_lock = leader_lock
+        self.lock_ttl = lock_ttl
+        self.history_size = history_size
+        self._jobs: dict[str, tuple[Job, JobStats]] = {}
+        self._history: dict[str, deque[JobRun]] = {}
+        # periodic job name -> whether its first run happens right at start
+        self._periodic: dict[str, bool] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._lock_task: Optional[asyncio.Task] = None
+        self._http_session: Optional[ClientSession] = None
+        self._started = False
+
+    @property
+    def http_session(self) -> ClientSession:
+        """HTTP session shared by the jobs, created on the first use."""
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = ClientSession()
+        return self._http_session
+
+    def add_periodic(
+        self,
+        name: str,
+        job: Job,
+        interval: float,
+        leader_only: bool = True,
+        run_at_start: bool = False,
+    ) -> None:
+        stats = JobStats(name=name, interval=interval, leader_only=leader_only)
+        self._register(name=name, job=job, stats=stats)
+        self._periodic[name] = run_at_start
+        if self._started:
+            if leader_only:
+                self._hold_leader_lock()
+            self._spawn(self._run_periodically(name, run_at_start=run_at_start))
+
+    def submit(self, name: str, job: Job) -> asyncio.Task:
+        """Run a job once in the background, its run is kept in the history."""
+        if name not in self._jobs:
+            self._register(name=name, job=job, stats=JobStats(name=name))
+        return self._spawn(self._run(name, job=job))
+
+    async def start(self) -> None:
+        if self._started:
+            return
+        self._started = True
+        if any(stats.leader_only for _, stats in self._jobs.values()):
+            # first attempt before the jobs start, so jobs run at start aren't skipped
+            await self.leader_lock.acquire()
+            self._hold_leader_lock()
+        for name, run_at_start in self._periodic.items():
+            self._spawn(self._run_periodically(name, run_at_start=run_at_start))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._started = False
+        self._lock_task = None
+        await self.leader_lock.release()
+        if self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
+
+    def stats(self) -> list[JobStats]:
+        return [
+            stats.model_copy(update={"last_runs": list(self._history[name])})
+            for name, (_, stats) in self._jobs.items()
+        ]
+
+    def _register(self, name: str, job: Job, stats: JobStats) -> None:
+        self._jobs[name] = (job, stats)
+        self._history[name] = deque(maxlen=self.history_size)
+
+    def _spawn(self, coro: Awaitable[None]) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _hold_leader_lock(self) -> None:
+        if self._lock_task is None:
+            self._lock_task = self._spawn(self._renew_leader_lock())
+
+    async def _renew_leader_lock(self) -> None:
+        # renewed well before the lease runs out
+        while True:
+            await asyncio.sleep(self.lock_ttl / 3)
+            was_leader = self.leader_lock.is_leader
+            is_leader = await self.leader_lock.acquire()
+            if is_leader != was_leader:
+                logger.info(f"Jobs leadership {'acquired' if is_leader else 'lost'}")
+
+    async def _run_periodically(self, name: str, run_at_start: bool) -> None:
+        job, stats = self._jobs[name]
+        next_run = time.monotonic() + (0 if run_at_start else stats.interval)
+        while True:
+            await asyncio.sleep(max(next_run - time.monotonic(), 0))
+            # fixed rate, a slow run delays the next one instead of piling up
+            next_run = max(next_run + stats.interval, time.monotonic())
+            if stats.leader_only and not self.leader_lock.is_leader:
+                stats.skipped += 1
+                continue
+            await self._run(name, job=job)
+
+    async def _run(self, name: str, job: Job) -> None:
+        stats = self._jobs[name][1]
+        stats.running = True
+        started_at, start = datetime.now(), time.perf_counter()
+        error = None
+        try:
+            await job()
+        except Exception as e:
+            error = repr(e)
+            logger.error(f"Job {name} failed. Details: {error}")
+        finally:
+            stats.running = False
+        duration = time.perf_counter() - start
+
+        stats.runs += 1
+        if error:
+            stats.failures += 1
+        self._history[name].append(
+            JobRun(started_at=started_at, duration=duration, ok=not error, error=error)
+        )
+        logger.debug(f"Job {name} finished in {duration:.3f}s")
+
+
+def _init_leader_lock() -> LeaderLock:
+    if settings.JOBS_LEADER_LOCK_BACKEND == "redis":
+        return RedisLeaderLock(
+            uri=settings.JOBS_LEADER_LOCK_REDIS_URI,
+            key="genai:jobs:leader",
+            ttl=settings.JOBS_LEADER_LOCK_TTL_SECONDS,
+        )
+    return LocalLeaderLock()
+
+
+job_runner = JobRunner(
+    leader_lock=_init_leader_lock(),
+    lock_ttl=settings.JOBS_LEADER_LOCK_TTL_SECONDS,
+    history_size=settings.JOBS_HISTORY_SIZE,
+)
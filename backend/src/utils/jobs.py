@@ -1,17 +1,107 @@
-from src.repositories.agent import agent_repo
+import asyncio
+from datetime import datetime, timedelta
+from logging import getLogger
 
+from src.core.settings import get_settings
 from src.db.session import async_session
-from logging import getLogger
+from src.repositories.agent import agent_repo
+from src.repositories.chat_archive import chat_archive_repo
+from src.repositories.files import file_uploads_repo
+from src.repositories.log import log_repo
 from src.utils.db_initial_healthcheck import preflight_db_availability_check
-
+from src.utils.file_storage import cleanup_stale_upload_parts, discard_upload_part
+from src.utils.job_runner import JobRunner
+from src.utils.lookup_a2a_agent import lookup_a2a_agents
+from src.utils.lookup_mcp_server import lookup_mcp_servers
 
 logger = getLogger(__name__)
+settings = get_settings()
 
 
 async def run_startup_jobs():
     await preflight_db_availability_check()
     async with async_session() as db:
         await agent_repo.set_all_agents_inactive(db=db)
+    await maintain_logs_partitions()
+    await cleanup_abandoned_uploads()
 
     logger.debug("Initial startup jobs complete")
     return
+
+
+async def maintain_logs_partitions():
+    async with async_session() as db:
+        created, dropped = await log_repo.maintain_partitions(
+            db=db,
+            retention_days=settings.LOGS_RETENTION_DAYS,
+            days_ahead=settings.LOGS_PARTITIONS_AHEAD_DAYS,
+        )
+    logger.debug(f"Logs partitions created: {created}, dropped: {dropped}")
+
+
+async def cleanup_abandoned_uploads():
+    expired_before = datetime.now() - timedelta(
+        hours=settings.FILES_UPLOAD_EXPIRATION_HOURS
+    )
+    async with async_session() as db:
+        upload_ids = await file_uploads_repo.delete_expired(
+            db=db, updated_before=expired_before
+        )
+    for upload_id in upload_ids:
+        await discard_upload_part(upload_id=upload_id)
+    # part files without a row, e.g. plain uploads interrupted by a restart
+    removed = await cleanup_stale_upload_parts(older_than=expired_before.timestamp())
+    logger.debug(
+        f"Abandoned uploads removed: {len(upload_ids)}, stale part files: {removed}"
+    )
+
+
+async def archive_chat_history():
+    async with async_session() as db:
+        conversation_ids = await chat_archive_repo.list_candidates(
+            db=db,
+            keep_recent=settings.CHAT_ARCHIVE_KEEP_RECENT_MESSAGES,
+            block_size=settings.CHAT_ARCHIVE_BLOCK_SIZE,
+            limit=settings.CHAT_ARCHIVE_MAX_CHATS_PER_RUN,
+        )
+        archived = 0
+        for conversation_id in conversation_ids:
+            archived += await chat_archive_repo.archive_conversation(
+                db=db,
+                conversation_id=conversation_id,
+                keep_recent=settings.CHAT_ARCHIVE_KEEP_RECENT_MESSAGES,
+                block_size=settings.CHAT_ARCHIVE_BLOCK_SIZE,
+            )
+    logger.debug(f"Chat messages archived: {archived}, chats: {len(conversation_ids)}")
+
+
+async def refresh_mcp_a2a_data():
+    await asyncio.gather(lookup_mcp_servers(), lookup_a2a_agents())
+
+
+def register_shared_jobs(runner: JobRunner):
+    """Jobs that only one process of the deployment runs, the leader."""
+    runner.add_periodic(
+        "mcp_a2a_lookup",
+        refresh_mcp_a2a_data,
+        interval=settings.JOBS_LOOKUP_INTERVAL_MINUTES * 60,
+    )
+    # partitions are created days ahead, hourly run only needs to catch up
+    runner.add_periodic("logs_partitions_maintenance", maintain_logs_partitions, 3600)
+    runner.add_periodic(
+        "chat_history_archival",
+        archive_chat_history,
+        interval=settings.CHAT_ARCHIVE_INTERVAL_MINUTES * 60,
+    )
+
+
+def register_backend_jobs(runner: JobRunner):
+    """Jobs every backend process runs, they need the backend's own filesystem."""
+    runner.add_periodic(
+        "abandoned_uploads_cleanup",
+        cleanup_abandoned_uploads,
+        interval=settings.FILES_UPLOAD_CLEANUP_INTERVAL_MINUTES * 60,
+        leader_only=False,
+    )
+    if settings.JOBS_RUN_IN_BACKEND:
+        register_shared_jobs(runner)
@@ -0,0 +1,130 @@
+import asyncio
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Optional
+
+from src.core.settings import get_settings
+from src.db.session import async_session
+from src.repositories.log import log_repo
+from src.schemas.ws.log import LogEntry
+
+logger = getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class LogIngestionStats:
+    accepted: int = 0
+    dropped: int = 0
+    flushed: int = 0
+    failed: int = 0
+    flushes: int = 0
+    queue_size: int = 0
+    max_queue_size: int = 0
+
+
+class LogIngestionBuffer:
+    """
+    Asynchronous write buffer for agent logs.
+
+    Logs are accepted without touching the database and written by a single worker
+    with COPY, either once `batch_size` logs are queued or `flush_interval` seconds
+    after the first log of the batch arrived. The queue is bounded: when it is full
+    new logs are dropped and counted instead of stalling the router event loop.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_queue_size: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue[LogEntry] = asyncio.Queue(maxsize=max_queue_size)
+        self.stats = LogIngestionStats(max_queue_size=max_queue_size)
+        self._worker: Optional[asyncio.Task] = None
+        # batch being collected and batch being written, both survive worker shutdown
+        self._pending: list[LogEntry] = []
+        self._inflight: Optional[asyncio.Task] = None
+
+    def submit(self, log: LogEntry) -> bool:
+        try:
+            self.queue.put_nowait(log)
+        except asyncio.QueueFull:
+            self.stats.dropped += 1
+            return False
+        self.stats.accepted += 1
+        return True
+
+    def get_stats(self) -> LogIngestionStats:
+        self.stats.queue_size = self.queue.qsize()
+        return self.stats
+
+    def start(self) -> None:
+        if not self._worker or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker and flush whatever is still queued."""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        if self._inflight:
+            await self._inflight
+        pending, self._pending = self._pending, []
+        await self._flush(pending)
+        while not self.queue.empty():
+            await self._flush(self._drain(self.batch_size))
+
+    def _drain(self, limit: int) -> list[LogEntry]:
+        batch = []
+        while len(batch) < limit and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _collect_batch(self) -> None:
+        self._pending.append(await self.queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+
+        while len(self._pending) < self.batch_size:
+            self._pending.extend(self._drain(self.batch_size - len(self._pending)))
+            timeout = deadline - loop.time()
+            if len(self._pending) >= self.batch_size or timeout <= 0:
+                break
+            try:
+                self._pending.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except TimeoutError:
+                break
+
+    async def _flush(self, batch: list[LogEntry]) -> None:
+        if not batch:
+            return
+        try:
+            async with async_session() as db:
+                flushed = await log_repo.copy_many(db=db, logs=batch)
+            self.stats.flushed += flushed
+            self.stats.failed += len(batch) - flushed
+            logger.debug(f"Flushed {flushed} of {len(batch)} logs")
+        except Exception as e:
+            # batch is not retried to keep memory bounded while the database is down
+            self.stats.failed += len(batch)
+            logger.error(f"Failed to flush {len(batch)} logs. Details: {e}")
+        finally:
+            self.stats.flushes += 1
+
+    async def _run(self) -> None:
+        while True:
+            await self._collect_batch()
+            batch, self._pending = self._pending, []
+            self._inflight = asyncio.create_task(self._flush(batch))
+            await asyncio.shield(self._inflight)
+            self._inflight = None
+
+
+log_ingestion_buffer = LogIngestionBuffer(
+    batch_size=settings.LOG_INGESTION_BATCH_SIZE,
+    flush_interval=settings.LOG_INGESTION_FLUSH_INTERVAL_SECONDS,
+    max_queue_size=settings.LOG_INGESTION_MAX_QUEUE_SIZE,
+)
@@ -0,0 +1,56 @@
+import asyncio
+from typing import AsyncIterator, Optional
+
+from src.db.session import async_session
+from src.repositories.log import log_repo
+from src.schemas.ws.log import LogStreamEntryDTO
+from src.utils.enums import CursorDirection
+from src.utils.filters import LogFilter
+from src.utils.pagination import encode_cursor
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+async def iter_logs(
+    filters: LogFilter,
+    cursor: Optional[str] = None,
+    batch_size: int = 500,
+    follow: bool = False,
+    poll_interval: float = 1.0,
+) -> AsyncIterator[LogStreamEntryDTO]:
+    """
+    Yield logs oldest first, one keyset batch at a time, so memory use doesn't depend
+    on the size of the log set. Every entry carries the cursor to resume right after it.
+
+    With `follow` enabled the iterator never ends: once existing logs are exhausted it
+    keeps polling for new ones until the client goes away.
+    """
+    while True:
+        # short lived session per batch, a long tail must not hold a connection
+        async with async_session() as db:
+            logs = await log_repo.list_after_cursor(
+                db=db, filters=filters, cursor=cursor, limit=batch_size
+            )
+
+        for log in logs:
+            cursor = encode_cursor(
+                created_at=log.created_at, id_=log.id, direction=CursorDirection.next
+            )
+            yield LogStreamEntryDTO(**log.__dict__, cursor=cursor)
+
+        if len(logs) < batch_size:
+            if not follow:
+                return
+            await asyncio.sleep(poll_interval)
+
+
+async def stream_ndjson(entries: AsyncIterator[LogStreamEntryDTO]):
+    async for entry in entries:
+        yield entry.model_dump_json() + "\n"
+
+
+async def stream_sse(entries: AsyncIterator[LogStreamEntryDTO]):
+    # event id lets EventSource resume from Last-Event-ID after a reconnect
+    async for entry in entries:
+        yield f"id: {entry.cursor}\nevent: log\ndata: {entry.model_dump_json()}\n\n"
@@ -1,45 +1,60 @@
-import asyncio
 import logging
 
 from src.db.session import async_session
 from src.repositories.a2a import a2a_repo, lookup_agent_well_known
 from src.utils.enums import AgentType
 from src.utils.helpers import FlowValidator
+from src.utils.job_runner import job_runner
+from src.utils.probe_scheduler import (
+    ProbeResult,
+    ProbeTarget,
+    content_fingerprint,
+    probe_scheduler,
+)
 
 logger = logging.getLogger(__name__)
 
 
-async def lookup_and_update_agent_card(server_url: str, headers: dict = {}):
-    async with async_session() as db:
-        card_info = await lookup_agent_well_known(url=server_url, headers=headers)
-        if not card_info.is_active:
-            async with async_session() as db:
-                await a2a_repo.set_as_inactive(db=db, server_url=server_url)
-
-            validator = FlowValidator()
-            async with async_session() as db:
-                await validator.trigger_flow_validation_on_agent_state_change(
-                    db=db, agent_type=AgentType.a2a
-                )
-        card = await a2a_repo.update_card(
-            db=db, server_url=server_url, card_in=card_info
-        )
-        return card
+async def probe_agent_card(target: ProbeTarget, headers: dict = {}) -> ProbeResult:
+    card_info = await lookup_agent_well_known(
+        url=target.url,
+        headers=headers,
+        etag=target.etag,
+        session=job_runner.http_session,
+    )
+    if not card_info.is_active:
+        return ProbeResult(ok=False)
+    if card_info.not_modified:
+        return ProbeResult(ok=True, content_hash=target.content_hash, etag=target.etag)
+    # servers without etag support are compared by the card hash
+    return ProbeResult(
+        ok=True,
+        content_hash=content_fingerprint(card_info.card.model_dump(mode="json")),
+        etag=card_info.etag,
+        payload=card_info,
+    )
 
 
 async def lookup_a2a_agents(headers: dict = {}):
     async with async_session() as db:
-        urls = await a2a_repo.get_all_card_server_urls(db)
+        targets = await a2a_repo.list_due_probe_targets(db=db)
 
-    tasks = []
-    for url in urls:
-        tasks.append(
-            asyncio.create_task(
-                lookup_and_update_agent_card(server_url=url, headers=headers)
-            )
-        )
+    results = await probe_scheduler.run(
+        targets=targets, probe=lambda target: probe_agent_card(target, headers)
+    )
 
-    cards = await asyncio.gather(*tasks)
-    logger.info(f"Updated info about {len(cards)} A2A agents")
+    changed, states = probe_scheduler.collect_updates(results)
+    async with async_session() as db:
+        for result, card_ids in changed:
+            await a2a_repo.update_cards(
+                db=db, card_ids=card_ids, card_in=result.payload
+            )
+        await a2a_repo.save_probe_states(db=db, states=states)
 
-    return
+    if states:
+        validator = FlowValidator()
+        async with async_session() as db:
+            await validator.trigger_flow_validation_on_agent_state_change(
+                db=db, agent_type=AgentType.a2a
+            )
+    logger.info(f"Probed {len(results)} A2A agents, {len(states)} state updates")
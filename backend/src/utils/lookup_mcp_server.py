@@ -1,43 +1,53 @@
-import asyncio
 import logging
 
 from src.db.session import async_session
 from src.repositories.mcp import lookup_mcp_server, mcp_repo
 from src.utils.enums import AgentType
 from src.utils.helpers import FlowValidator
+from src.utils.probe_scheduler import (
+    ProbeResult,
+    ProbeTarget,
+    content_fingerprint,
+    probe_scheduler,
+)
 
 logger = logging.getLogger(__name__)
 
 
-async def lookup_and_update_mcp_server(url: str, headers={}, cursor=None):
-    data = await lookup_mcp_server(url=url, headers=headers, cursor=cursor)
+async def probe_mcp_server(target: ProbeTarget) -> ProbeResult:
+    # MCP has no conditional requests, the tools list is compared by its hash
+    data = await lookup_mcp_server(url=target.url, timeout=probe_scheduler.timeout)
+    if not data.is_active:
+        return ProbeResult(ok=False)
+    tools = [t.model_dump(mode="json") for t in data.mcp_tools]
+    return ProbeResult(ok=True, content_hash=content_fingerprint(tools), payload=data)
 
-    if data.is_active:
-        async with async_session() as db:
-            return await mcp_repo.update_mcp_server_resources(
-                db=db, mcp_server_url=url, obj_in=data
-            )
-
-    else:
-        async with async_session() as db:
-            await mcp_repo.set_as_inactive(db=db, server_url=url)
 
-    validator = FlowValidator()
+async def lookup_mcp_servers():
     async with async_session() as db:
-        await validator.trigger_flow_validation_on_agent_state_change(
-            db=db, agent_type=AgentType.mcp
-        )
+        targets = await mcp_repo.list_due_probe_targets(db=db)
 
+    results = await probe_scheduler.run(targets=targets, probe=probe_mcp_server)
 
-async def lookup_mcp_servers():
+    changed, states = probe_scheduler.collect_updates(results)
     async with async_session() as db:
-        urls: list[str] = await mcp_repo.list_remote_urls_of_all_servers(db=db)
-        tasks = []
-
-        for url in urls:
-            task = asyncio.create_task(lookup_and_update_mcp_server(url=url))
-            tasks.append(task)
+        for result, server_ids in changed:
+            deltas = await mcp_repo.sync_tools_of_servers(
+                db=db, server_ids=server_ids, obj_in=result.payload
+            )
+            logger.info(
+                f"Synced tools of {result.payload.server_url} for {len(deltas)} "
+                f"servers, added: {sum(len(d.added) for d in deltas.values())}, "
+                f"changed: {sum(len(d.changed) for d in deltas.values())}, "
+                f"removed: {sum(len(d.removed) for d in deltas.values())}"
+            )
+        await mcp_repo.save_probe_states(db=db, states=states)
 
-        results = await asyncio.gather(*tasks)
-        logger.info(f"Updated info about {len(results)} MCP servers")
-    return
+    # flows only depend on servers whose state or tools changed
+    if states:
+        validator = FlowValidator()
+        async with async_session() as db:
+            await validator.trigger_flow_validation_on_agent_state_change(
+                db=db, agent_type=AgentType.mcp
+            )
+    logger.info(f"Probed {len(results)} MCP servers, {len(states)} state updates")
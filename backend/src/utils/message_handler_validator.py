@@ -1,26 +1,158 @@
 import traceback
+from dataclasses import dataclass
+from datetime import datetime
 from logging import getLogger
 from traceback import format_exc
 from typing import Optional
 
-from fastapi import WebSocket
 from genai_session.session import GenAISession
 from genai_session.utils.naming_enums import ErrorType, WSMessageType
 from pydantic import ValidationError
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.settings import get_settings
 from src.db.session import async_session
 from src.repositories.agent import agent_repo
 from src.repositories.flow import agentflow_repo
-from src.repositories.log import log_repo
 from src.repositories.user import user_repo
 from src.schemas.api.agent.schemas import AgentUpdate
 from src.schemas.ws.log import FrontendLogEntryDTO, LogCreate, LogEntry
 from src.utils.enums import AgentType
+from src.utils.event_dispatcher import BatchCoalescer, KeyedDispatcher
 from src.utils.helpers import FlowValidator, generate_alias
+from src.utils.log_ingestion import log_ingestion_buffer
 from src.utils.validate_uuid import validate_agent_or_send_err
 from src.utils.validation_error_handler import validation_exception_handler
+from src.utils.websocket import FrontendConnection
 from starlette.datastructures import State
 
 logger = getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class AgentRegisterEvent:
+    session: GenAISession
+    agent_uuid: str
+    jwt_token: Optional[str]
+    agent_name: Optional[str]
+    agent_description: Optional[str]
+    agent_input_schema: dict
+
+
+async def register_agents(events: list[AgentRegisterEvent]):
+    """
+    Registers a burst of agents with one lookup of their JWTs, one UPDATE of the
+    agent rows and a single flow revalidation.
+    """
+    async with async_session() as db:
+        valid_agents = await agent_repo.get_agents_by_jwts(
+            db=db, agent_jwts=[e.jwt_token for e in events if e.jwt_token]
+        )
+
+        rows, row_events = [], []
+        for event in events:
+            valid_agent = valid_agents.get(event.jwt_token)
+            if not valid_agent:
+                logger.debug(
+                    f"Agent with '{event.agent_uuid}' was attempted to register but either JWT is invalid or user does not exist."  # noqa: E501
+                )
+                await event.session.send(
+                    message={
+                        "error_message": "Agent ID was not registered before",
+                        "error_type": ErrorType.AGENT_GENERAL_ERROR.value,
+                    },
+                    client_id=event.agent_uuid,
+                    close_timeout=1,
+                )
+                continue  # TODO: raise invalid agent jwt
+
+            old_name = "".join(valid_agent.alias.rsplit("_", 1)[:-1])
+            if event.agent_name == old_name:
+                alias = valid_agent.alias
+            else:
+                alias = generate_alias(event.agent_name)
+
+            try:
+                agent_in = AgentUpdate(
+                    name=event.agent_name,
+                    description=event.agent_description,
+                    input_parameters=event.agent_input_schema,
+                    is_active=True,
+                    alias=alias,
+                )
+            except ValidationError as e:
+                logger.error(
+                    f"Invalid agent_register event request schema. Details: {validation_exception_handler(e)}"
+                )
+                continue
+            rows.append({"id": valid_agent.id, **agent_in.model_dump()})
+            row_events.append(event)
+
+        if not rows:
+            return
+        try:
+            await agent_repo.bulk_update_rows(db=db, rows=rows, commit=False)
+        except DBAPIError as e:
+            if e.connection_invalidated:
+                raise
+            await db.rollback()
+            logger.warning(
+                f"UPDATE of {len(rows)} registered agents failed, "
+                "updating them one by one. "
+                f"Details: {e.orig!r}"
+            )
+            rows = await _update_each(db=db, rows=rows, events=row_events)
+            if not rows:
+                return
+        flow_validator = FlowValidator()
+        await flow_validator.trigger_flow_validation_on_agent_state_change(
+            db=db, agent_type=AgentType.genai, agent_ids=[row["id"] for row in rows]
+        )
+        logger.debug(f"Agents registered: {', '.join(str(r['id']) for r in rows)}")
+
+
+async def _update_each(
+    db: AsyncSession, rows: list[dict], events: list[AgentRegisterEvent]
+) -> list[dict]:
+    """
+    Updates the rows of a failed batch one by one, so only the agents whose row the
+    database rejects fail to register. Returns the updated rows.
+    """
+    updated = []
+    for row, event in zip(rows, events):
+        try:
+            # a savepoint per row, a rejected row doesn't abort the others
+            async with db.begin_nested():
+                await agent_repo.bulk_update_rows(db=db, rows=[row], commit=False)
+        except DBAPIError as e:
+            if e.connection_invalidated:
+                raise
+            logger.error(
+                f"Agent '{event.agent_uuid}' could not be registered. Details: {e.orig!r}"
+            )
+            await event.session.send(
+                message={
+                    "error_message": "Agent could not be registered",
+                    "error_type": ErrorType.AGENT_GENERAL_ERROR.value,
+                },
+                client_id=event.agent_uuid,
+                close_timeout=1,
+            )
+            continue
+        updated.append(row)
+    return updated
+
+
+agent_register_coalescer = BatchCoalescer(
+    process=register_agents,
+    max_size=settings.AGENT_REGISTER_BATCH_SIZE,
+    window=settings.AGENT_REGISTER_BATCH_WINDOW_SECONDS,
+)
+# events of the same agent are handled in order, different agents concurrently
+router_event_dispatcher = KeyedDispatcher(
+    max_concurrency=settings.ROUTER_EVENTS_MAX_CONCURRENCY
+)
 
 
 async def message_handler_validator(
@@ -39,66 +171,27 @@ async def message_handler_validator(
 ):
     # NOTE: websocket connection must be initialized by the frontend before it will be accessible here
     # if websocket is not initialized it won't dump logs to the frontend
-    websocket: WebSocket = state.frontend_ws
+    websocket: FrontendConnection = state.frontend_ws
 
     try:
         if message_type == WSMessageType.AGENT_REGISTER.value:
             try:
-                async with async_session() as db:
-                    valid_agent = await agent_repo.validate_agent_by_jwt(
-                        db=db, agent_jwt=jwt_token
-                    )
-                    if not valid_agent:
-                        logger.debug(
-                            f"Agent with '{agent_uuid}' was attempted to register but either JWT is invalid or user does not exist."  # noqa: E501
-                        )
-                        await session.send(
-                            message={
-                                "error_message": "Agent ID was not registered before",
-                                "error_type": ErrorType.AGENT_GENERAL_ERROR.value,
-                            },
-                            client_id=agent_uuid,
-                            close_timeout=1,
-                        )
-                        return  # TODO: raise invalid agent jwt
-
-                    old_name = "".join(valid_agent.alias.rsplit("_", 1)[:-1])
-                    if agent_name == old_name:
-                        alias = valid_agent.alias
-                    else:
-                        alias = generate_alias(agent_name)
-
-                    agent_in = AgentUpdate(
-                        id=valid_agent.id,
-                        name=agent_name,
-                        description=agent_description,
-                        input_parameters=agent_input_schema or {},
-                        is_active=True,
-                        alias=alias,
-                    )
-
-                    updated_agent = await agent_repo.update(
-                        db=db,
-                        db_obj=valid_agent,
-                        obj_in=agent_in,
+                # registers of many agents are written together, see `register_agents`
+                await agent_register_coalescer.submit(
+                    AgentRegisterEvent(
+                        session=session,
+                        agent_uuid=agent_uuid,
+                        jwt_token=jwt_token,
+                        agent_name=agent_name,
+                        agent_description=agent_description,
+                        agent_input_schema=agent_input_schema or {},
                     )
-                    flow_validator = FlowValidator()
-                    await flow_validator.trigger_flow_validation_on_agent_state_change(
-                        db=db, agent_type=AgentType.genai
-                    )
-                    await db.refresh(updated_agent)
-                    logger.debug(f"Agent updated: {str(updated_agent.id)}")
-
-            except ValidationError as e:
-                logger.error(
-                    f"Invalid agent_register event request schema. Details: {validation_exception_handler(e)}"
                 )
-                return
             except Exception:
                 logger.error(
                     f"Error while registering agent. Details: {format_exc(limit=600)}"
                 )
-                return
+            return
 
         if message_type == WSMessageType.AGENT_UNREGISTER.value:
             try:
@@ -118,7 +211,7 @@ async def message_handler_validator(
                     )
                     if set_inactive_flows:
                         logger.debug(
-                            f"Flows set as inactive: {''.join(set_inactive_flows)}"
+                            f"Flows set as inactive: {', '.join(set_inactive_flows)}"
                         )
 
                     inactive_agent = await agent_repo.set_agent_as_inactive(
@@ -149,16 +242,17 @@ async def message_handler_validator(
                         log_level=log_level,
                         agent_id=agent_uuid,
                     )
-                    async with async_session() as db:
-                        log_entry = await log_repo.create(db, obj_in=log_in)
-                        logger.debug(f"Inserted log for {session_id=}, {request_id=}")
-                        log_out = LogEntry(**log_entry.__dict__)
-
-                        if websocket:
-                            response = FrontendLogEntryDTO(
-                                type=message_type, log=log_out
-                            )
-                            await websocket.send_text(response.model_dump_json())
+                    now = datetime.now()
+                    log_out = LogEntry(
+                        **log_in.model_dump(), created_at=now, updated_at=now
+                    )
+                    # written to the database in batches, frontend doesn't wait for it
+                    if not log_ingestion_buffer.submit(log_out):
+                        logger.debug(f"Log dropped for {session_id=}, {request_id=}")
+
+                    if websocket:
+                        response = FrontendLogEntryDTO(type=message_type, log=log_out)
+                        await websocket.send_text(response.model_dump_json())
 
                 except Exception:
                     logger.error(f"Unexpected error occured: {traceback.format_exc()}")
@@ -1,69 +1,228 @@
+import base64
+import json
 import typing
+from dataclasses import dataclass, field
+from datetime import datetime
 
+from fastapi import HTTPException, Response
 from pydantic import BaseModel
-from sqlalchemy import Select, func, select
+from sqlalchemy import Select, func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 from src.middleware.pagination import request_object
+from src.utils.enums import CursorDirection
 
 M = typing.TypeVar("M", bound=BaseModel)
 
 
-class Paginator:
+def encode_cursor(
+    created_at: datetime, id_: typing.Any, direction: CursorDirection
+) -> str:
+    payload = json.dumps(
+        [created_at.isoformat(), str(id_), direction.value], separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str, CursorDirection]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id_, direction = json.loads(payload)
+        created_at = datetime.fromisoformat(created_at)
+        direction = CursorDirection(direction)
+    except (ValueError, TypeError):
+        raise invalid_cursor()
+    # keys are naive timestamps, an aware one can't be compared with them
+    if created_at.tzinfo is not None:
+        raise invalid_cursor()
+    return created_at, str(id_), direction
+
+
+@dataclass
+class CursorPage:
+    items: list = field(default_factory=list)
+    next_cursor: typing.Optional[str] = None
+    previous_cursor: typing.Optional[str] = None
+    total_count: typing.Optional[int] = None
+
+
+class CursorPaginator:
+    """
+    Keyset pagination over `(created_at, id)`.
+
+    Instead of skipping rows with OFFSET, every page continues from the key of the
+    last row the client has seen, so fetching a page costs the same regardless of
+    how deep it is. Cursors are opaque to the client and encode the boundary key
+    together with the direction to move in. Counting all rows still requires a full
+    scan, hence the total count is only computed when explicitly requested.
+    """
+
     def __init__(
         self,
         session: AsyncSession,
         query: Select,
-        page: int,
         per_page: int,
+        cursor: typing.Optional[str] = None,
+        *,
+        created_at_column: InstrumentedAttribute,
+        id_column: InstrumentedAttribute,
+        descending: bool = True,
+        offset: int = 0,
+        with_total_count: bool = False,
     ):
         self.session = session
         self.query = query
-        self.page = page
         self.per_page = per_page
-        self.limit = per_page * page
-        self.offset = (page - 1) * per_page
-        self.request = request_object.get()
-        # computed later
-        self.number_of_pages = 0
-        self.next_page = ""
-        self.previous_page = ""
-
-    def _get_next_page(self) -> typing.Optional[str]:
-        if self.page >= self.number_of_pages:
-            return
-        url = self.request.url.include_query_params(page=self.page + 1)
-        return str(url)
-
-    def _get_previous_page(self) -> typing.Optional[str]:
-        if self.page == 1 or self.page > self.number_of_pages + 1:
-            return
-        url = self.request.url.include_query_params(page=self.page - 1)
-        return str(url)
+        self.cursor = cursor
+        self.created_at_column = created_at_column
+        self.id_column = id_column
+        self.descending = descending
+        # plain offset is only honoured on the first page to keep old clients working
+        self.offset = offset
+        self.with_total_count = with_total_count
 
-    async def get_response(self, cast_to: typing.Type[M]) -> dict:
-        q = await self.session.scalars(self.query.limit(self.limit).offset(self.offset))
-        return {
-            "total_count": await self._get_total_count(),
-            "next_page": self._get_next_page(),
-            "previous_page": self._get_previous_page(),
-            "items": [cast_to(**item.__dict__) for item in q],
-        }
-
-    def _get_number_of_pages(self, count: int) -> int:
-        rest = count % self.per_page
-        quotient = count // self.per_page
-        return quotient if not rest else quotient + 1
-
-    async def _get_total_count(self) -> int:
-        count = await self.session.scalar(
+    def _boundary(self) -> typing.Optional[tuple[datetime, typing.Any]]:
+        if not self.cursor:
+            return None
+        created_at, id_, _ = decode_cursor(self.cursor)
+        return created_at, self._parse_id(id_)
+
+    def _parse_id(self, id_: str) -> typing.Any:
+        """
+        Cursor id as the type of `id_column`, drivers pass a string bound to a uuid
+        column as is and a garbled one would fail in the database.
+        """
+        try:
+            python_type = self.id_column.type.python_type
+        except NotImplementedError:
+            return id_
+        try:
+            return python_type(id_)
+        except (TypeError, ValueError):
+            raise invalid_cursor()
+
+    def _build_query(
+        self,
+        direction: CursorDirection,
+        boundary: typing.Optional[tuple[datetime, str]] = None,
+        limit: typing.Optional[int] = None,
+    ) -> Select:
+        key = tuple_(self.created_at_column, self.id_column)
+        query = self.query
+
+        boundary = boundary or self._boundary()
+        if boundary:
+            forward = direction == CursorDirection.next
+            if forward == self.descending:
+                query = query.where(key < boundary)
+            else:
+                query = query.where(key > boundary)
+        elif self.offset:
+            query = query.offset(self.offset)
+
+        # previous page is read walking backwards from the cursor and flipped afterwards
+        ascending = self.descending == (direction == CursorDirection.prev)
+        columns = (self.created_at_column, self.id_column)
+        return query.order_by(
+            *(column.asc() if ascending else column.desc() for column in columns)
+        ).limit(limit or self.per_page + 1)
+
+    async def _fetch_rows(self, direction: CursorDirection) -> list:
+        """Up to `per_page + 1` rows past the cursor, the extra one tells if more exist"""
+        return list(await self.session.scalars(self._build_query(direction)))
+
+    async def _count(self) -> int:
+        return await self.session.scalar(
             select(func.count()).select_from(self.query.subquery())
         )
-        self.number_of_pages = self._get_number_of_pages(count)
-        return count
+
+    def _encode(self, row: typing.Any, direction: CursorDirection) -> str:
+        return encode_cursor(
+            created_at=getattr(row, self.created_at_column.key),
+            id_=getattr(row, self.id_column.key),
+            direction=direction,
+        )
+
+    async def get_page(self) -> CursorPage:
+        direction = CursorDirection.next
+        if self.cursor:
+            _, _, direction = decode_cursor(self.cursor)
+
+        rows = await self._fetch_rows(direction)
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if direction == CursorDirection.prev:
+            rows.reverse()
+
+        page = CursorPage(items=rows)
+        if rows:
+            if has_more or direction == CursorDirection.prev:
+                page.next_cursor = self._encode(rows[-1], CursorDirection.next)
+            if self.cursor and (has_more or direction == CursorDirection.next):
+                page.previous_cursor = self._encode(rows[0], CursorDirection.prev)
+
+        if self.with_total_count:
+            page.total_count = await self._count()
+        return page
+
+    async def get_response(self, cast_to: typing.Type[M]) -> dict:
+        return cursor_page_response(page=await self.get_page(), cast_to=cast_to)
+
+
+def _get_page_url(cursor: typing.Optional[str]) -> typing.Optional[str]:
+    request = request_object.get(None)
+    if not cursor or not request:
+        return
+    return str(request.url.include_query_params(cursor=cursor))
+
+
+def cursor_page_response(page: CursorPage, cast_to: typing.Type[M]) -> dict:
+    return {
+        "total_count": page.total_count,
+        "next_cursor": page.next_cursor,
+        "previous_cursor": page.previous_cursor,
+        "next_page": _get_page_url(page.next_cursor),
+        "previous_page": _get_page_url(page.previous_cursor),
+        "items": [
+            cast_to.model_validate(item, from_attributes=True) for item in page.items
+        ],
+    }
+
+
+def set_cursor_headers(response: Response, page: CursorPage) -> None:
+    """
+    List endpoints keep returning plain arrays, cursors are exposed through headers.
+    """
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.previous_cursor:
+        response.headers["X-Previous-Cursor"] = page.previous_cursor
+    if page.total_count is not None:
+        response.headers["X-Total-Count"] = str(page.total_count)
 
 
-async def paginate(
-    db: AsyncSession, query: Select, cast_to: typing.Type[M], page: int, per_page: int
+async def paginate_by_cursor(
+    db: AsyncSession,
+    query: Select,
+    cast_to: typing.Type[M],
+    per_page: int,
+    cursor: typing.Optional[str],
+    *,
+    created_at_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    with_total_count: bool = False,
 ) -> dict:
-    paginator = Paginator(db, query, page, per_page)
+    paginator = CursorPaginator(
+        db,
+        query,
+        per_page,
+        cursor,
+        created_at_column=created_at_column,
+        id_column=id_column,
+        with_total_count=with_total_count,
+    )
     return await paginator.get_response(cast_to=cast_to)
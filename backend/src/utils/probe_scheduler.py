@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import json
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from logging import getLogger
+from typing import Any, Awaitable, Callable, Optional
+
+from src.core.settings import get_settings
+from src.utils.helpers import normalize_url
+
+logger = getLogger(__name__)
+settings = get_settings()
+
+# caps the int power, it would otherwise overflow the float conversion after ~1k
+# failures, max_backoff is reached long before
+MAX_BACKOFF_EXPONENT = 32
+
+
+@dataclass
+class ProbeTarget:
+    id: str
+    url: str
+    is_active: bool
+    content_hash: Optional[str] = None
+    etag: Optional[str] = None
+    failures: int = 0
+
+
+@dataclass
+class ProbeResult:
+    ok: bool
+    content_hash: Optional[str] = None
+    etag: Optional[str] = None
+    # MCPServerData or A2AAgentCardSchema, None when the content was not modified
+    payload: Any = None
+
+
+def content_fingerprint(content: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(content, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+class ProbeScheduler:
+    """
+    Health probing of remote MCP servers and A2A agents.
+
+    Healthy targets are probed on every scheduler tick, failing ones are backed off
+    exponentially (with jitter, so targets that failed together don't retry together)
+    up to `max_backoff` seconds. At most `concurrency` probes run at the same time.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        max_backoff: float,
+        jitter: float,
+        concurrency: int,
+        timeout: float,
+    ):
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    def backoff(self, failures: int) -> float:
+        delay = self.interval * 2 ** min(max(failures - 1, 0), MAX_BACKOFF_EXPONENT)
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return min(delay, self.max_backoff)
+
+    def is_changed(self, target: ProbeTarget, result: ProbeResult) -> bool:
+        """Whether the content (tools or card) has to be written."""
+        return result.ok and result.content_hash != target.content_hash
+
+    def state_update(
+        self,
+        target: ProbeTarget,
+        result: ProbeResult,
+        next_probe_at: Optional[datetime] = None,
+    ) -> Optional[dict[str, Any]]:
+        """
+        Probe state columns to write for the target, None when nothing changed so
+        healthy, unchanged targets cost no writes.
+        """
+        if result.ok:
+            if (
+                target.is_active
+                and not target.failures
+                and not self.is_changed(target, result)
+                and result.etag == target.etag
+            ):
+                return None
+            return {
+                "is_active": True,
+                "content_hash": result.content_hash,
+                "etag": result.etag,
+                "probe_failures": 0,
+                "next_probe_at": None,
+            }
+
+        failures = target.failures + 1
+        return {
+            "is_active": False,
+            "probe_failures": failures,
+            "next_probe_at": next_probe_at
+            or datetime.now() + timedelta(seconds=self.backoff(failures)),
+        }
+
+    def collect_updates(
+        self, results: list[tuple[ProbeTarget, ProbeResult]]
+    ) -> tuple[
+        list[tuple[ProbeResult, list[str]]], list[tuple[dict[str, Any], list[str]]]
+    ]:
+        """
+        Groups the writes of a probe cycle, so rows sharing a probe result are
+        written with set-based statements.
+
+        Returns: (changed content, target ids) and (probe state, target ids) pairs
+        """
+        changed: dict[int, tuple[ProbeResult, list[str]]] = {}
+        states: dict[tuple, tuple[dict[str, Any], list[str]]] = {}
+        # one backoff draw per shared result, rows of the same url stay in sync
+        retry_at: dict[tuple[int, int], datetime] = {}
+
+        for target, result in results:
+            if self.is_changed(target, result):
+                changed.setdefault(id(result), (result, []))[1].append(target.id)
+
+            failures = target.failures + 1
+            next_probe_at = retry_at.setdefault(
+                (id(result), failures),
+                datetime.now() + timedelta(seconds=self.backoff(failures)),
+            )
+            state = self.state_update(target, result, next_probe_at=next_probe_at)
+            if state:
+                key = tuple(sorted(state.items()))
+                states.setdefault(key, (state, []))[1].append(target.id)
+
+        return list(changed.values()), list(states.values())
+
+    @staticmethod
+    def _shared(values: list[Optional[str]]) -> Optional[str]:
+        return values[0] if len(set(values)) == 1 else None
+
+    async def run(
+        self,
+        targets: list[ProbeTarget],
+        probe: Callable[[ProbeTarget], Awaitable[ProbeResult]],
+    ) -> list[tuple[ProbeTarget, ProbeResult]]:
+        """
+        Probes every distinct normalized url once, the result is shared by all
+        targets registered with that url (e.g. the same server added by many users).
+        """
+        groups: dict[str, list[ProbeTarget]] = {}
+        for target in targets:
+            groups.setdefault(normalize_url(target.url), []).append(target)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _probe(group: list[ProbeTarget]) -> ProbeResult:
+            # conditional fetch only when all owners saw the same content
+            content_hash = self._shared([t.content_hash for t in group])
+            shared = ProbeTarget(
+                id=group[0].id,
+                url=group[0].url,
+                is_active=group[0].is_active,
+                content_hash=content_hash,
+                etag=self._shared([t.etag for t in group]) if content_hash else None,
+            )
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(probe(shared), self.timeout)
+                except Exception as e:
+                    logger.warning(f"Probe of {shared.url} failed. Details: {e!r}")
+                    return ProbeResult(ok=False)
+
+        results = await asyncio.gather(*(_probe(g) for g in groups.values()))
+        logger.debug(f"Probed {len(groups)} distinct urls for {len(targets)} targets")
+        return [
+            (target, result)
+            for group, result in zip(groups.values(), results)
+            for target in group
+        ]
+
+
+probe_scheduler = ProbeScheduler(
+    interval=settings.JOBS_LOOKUP_INTERVAL_MINUTES * 60,
+    max_backoff=settings.PROBE_MAX_BACKOFF_SECONDS,
+    jitter=settings.PROBE_JITTER_RATIO,
+    concurrency=settings.PROBE_MAX_CONCURRENCY,
+    timeout=settings.PROBE_TIMEOUT_SECONDS,
+)
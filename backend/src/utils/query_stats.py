@@ -0,0 +1,181 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from logging import getLogger
+from typing import Awaitable, Callable, Iterator, Optional, TypeVar
+
+from pydantic import BaseModel, computed_field
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.core.settings import get_settings
+
+logger = getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+# expanded IN lists differ in the number of placeholders only
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\$\d+(?:\s*,\s*\$\d+)*\s*\)")
+_PLACEHOLDER = re.compile(r"\$\d+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    shape = _PLACEHOLDER_LIST.sub("(?)", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class ScopeQueries:
+    """Statements issued within a single request or websocket message."""
+
+    name: str
+    count: int = 0
+    db_time: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.db_time += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def n_plus_one_suspects(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes repeated at least `threshold` times."""
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+class QueryScopeStats(BaseModel):
+    name: str
+    calls: int = 0
+    queries_total: int = 0
+    queries_max: int = 0
+    db_time_total: float = 0.0
+    db_time_max: float = 0.0
+    # calls with at least one repeated statement shape
+    n_plus_one_calls: int = 0
+    # repeated shape -> most repetitions seen in a single call
+    n_plus_one_suspects: dict[str, int] = {}
+
+    @computed_field
+    @property
+    def avg_queries(self) -> float:
+        return self.queries_total / self.calls if self.calls else 0.0
+
+    @computed_field
+    @property
+    def avg_db_time(self) -> float:
+        return self.db_time_total / self.calls if self.calls else 0.0
+
+
+class QueryStatsCollector:
+    """
+    Counts the SQL statements and the time spent in the database per scope, a request
+    or a websocket message. Statements are timed by engine events and attributed to
+    the scope of the running task, statements outside of a scope (background jobs)
+    are not counted.
+
+    A statement shape (the SQL with its placeholders collapsed) repeated at least
+    `n_plus_one_threshold` times within a scope is reported as an N+1 suspect.
+    Totals are aggregated per scope name, up to `max_suspects` shapes per name.
+    """
+
+    def __init__(self, enabled: bool, n_plus_one_threshold: int, max_suspects: int):
+        self.enabled = enabled
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.max_suspects = max_suspects
+        self._current: ContextVar[Optional[ScopeQueries]] = ContextVar(
+            "query_stats_scope", default=None
+        )
+        self._stats: dict[str, QueryScopeStats] = {}
+
+    def instrument(self, engine: Engine) -> None:
+        if self.enabled:
+            event.listen(engine, "before_cursor_execute", self._before_execute)
+            event.listen(engine, "after_cursor_execute", self._after_execute)
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[ScopeQueries]:
+        scope = ScopeQueries(name=name)
+        token = self._current.set(scope)
+        try:
+            yield scope
+        finally:
+            self._current.reset(token)
+            self._finish(scope)
+
+    def tracked(
+        self, name: str, handler: Callable[[], Awaitable[T]]
+    ) -> Callable[[], Awaitable[T]]:
+        """`handler` whose statements are counted under `name` when it runs."""
+
+        async def run() -> T:
+            with self.track(name):
+                return await handler()
+
+        return run
+
+    def headers(self, scope: ScopeQueries) -> dict[str, str]:
+        suspects = scope.n_plus_one_suspects(self.n_plus_one_threshold)
+        return {
+            "X-DB-Query-Count": str(scope.count),
+            "X-DB-Time-Ms": f"{scope.db_time * 1000:.1f}",
+            "X-DB-N-Plus-One-Suspects": str(len(suspects)),
+        }
+
+    def stats(self) -> list[QueryScopeStats]:
+        return [s.model_copy(deep=True) for s in self._stats.values()]
+
+    def _before_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        if self._current.get() is not None:
+            context._query_stats_started_at = time.perf_counter()
+
+    def _after_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        scope = self._current.get()
+        started_at: Optional[float] = getattr(context, "_query_stats_started_at", None)
+        if scope is not None and started_at is not None:
+            scope.record(statement, time.perf_counter() - started_at)
+
+    def _finish(self, scope: ScopeQueries) -> None:
+        if not scope.count:
+            return
+        stats = self._stats.setdefault(scope.name, QueryScopeStats(name=scope.name))
+        stats.calls += 1
+        stats.queries_total += scope.count
+        stats.queries_max = max(stats.queries_max, scope.count)
+        stats.db_time_total += scope.db_time
+        stats.db_time_max = max(stats.db_time_max, scope.db_time)
+
+        suspects = scope.n_plus_one_suspects(self.n_plus_one_threshold)
+        if not suspects:
+            return
+        stats.n_plus_one_calls += 1
+        for shape, count in suspects:
+            known = stats.n_plus_one_suspects
+            if shape in known or len(known) < self.max_suspects:
+                known[shape] = max(known.get(shape, 0), count)
+        shape, count = suspects[0]
+        logger.warning(
+            f"{scope.name} issued {scope.count} queries, N+1 suspect repeated "
+            f"{count} times: {shape[:200]}"
+        )
+
+
+query_stats = QueryStatsCollector(
+    enabled=settings.QUERY_STATS_ENABLED,
+    n_plus_one_threshold=settings.QUERY_STATS_N_PLUS_ONE_THRESHOLD,
+    max_suspects=settings.QUERY_STATS_MAX_SUSPECTS,
+)
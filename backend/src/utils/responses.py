@@ -0,0 +1,84 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import AnyUrl, BaseModel
+from pydantic_core import Url
+from src.core.settings import get_settings
+from starlette.responses import Response
+
+settings = get_settings()
+
+
+def _encode(obj: Any) -> Any:
+    # types orjson doesn't handle natively, dumped the same way jsonable_encoder does
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (AnyUrl, Url)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(ORJSONResponse):
+    """Default response class of the app, renders with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_encode, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_response(
+    content: Any, response: Optional[Response] = None, status_code: int = 200
+) -> FastJSONResponse:
+    """
+    Returned by routes whose content is already made of plain JSON types or
+    `orjson.Fragment`s, it skips the `jsonable_encoder` pass FastAPI does on returned
+    values. Headers set on the route's injected `response` are kept.
+    """
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse(content=content, status_code=status_code, headers=headers)
+
+
+class SchemaFragmentCache:
+    """
+    LRU of serialized agent schemas, embedded into responses as `orjson.Fragment`s so
+    unchanged catalog entries are neither rebuilt as DTOs nor serialized again.
+
+    Entries are built from the rows of one user and validated with the user's version
+    counter of the resource (bumped on every write), a stale entry is rebuilt.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[int, orjson.Fragment]] = (
+            OrderedDict()
+        )
+
+    def get_or_build(
+        self, key: Hashable, version: int, build: Callable[[], Any]
+    ) -> orjson.Fragment:
+        cached = self._entries.get(key)
+        if cached and cached[0] == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        fragment = orjson.Fragment(
+            orjson.dumps(build(), default=_encode, option=orjson.OPT_NON_STR_KEYS)
+        )
+        if self.max_entries > 0:
+            self._entries[key] = (version, fragment)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return fragment
+
+
+schema_fragment_cache = SchemaFragmentCache(
+    max_entries=settings.SCHEMA_FRAGMENT_CACHE_MAX_ENTRIES
+)
@@ -1,4 +1,6 @@
-from typing import Optional
+import asyncio
+from typing import Any, Optional
+
 from fastapi import Depends, Header, WebSocket, status
 
 from src.auth.jwt import TokenLifespanType, validate_token
@@ -85,3 +87,22 @@ async def get_current_ws_user(
     except jwt.DecodeError:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return None
+
+
+class FrontendConnection:
+    """
+    Frontend websocket shared by the concurrent requests of a connection and the
+    agent logs, frames are sent one at a time.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self._send_lock = asyncio.Lock()
+
+    async def send_text(self, data: str) -> None:
+        async with self._send_lock:
+            await self.websocket.send_text(data)
+
+    async def send_json(self, data: Any) -> None:
+        async with self._send_lock:
+            await self.websocket.send_json(data)
@@ -0,0 +1,230 @@
+"""
+Chat history across archived blocks. The paginated walks run against the configured
+Postgres and only when DATABASE_TESTS is set:
+
+    DATABASE_TESTS=1 python -m unittest tests.test_chat_archive
+"""
+
+import os
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete
+from src.db.session import async_session, engine
+from src.models import ChatConversation, ChatMessage, User
+from src.repositories.chat import chat_repo
+from src.repositories.chat_archive import (
+    chat_archive_repo,
+    compress_messages,
+    decompress_messages,
+)
+from src.utils.enums import SenderType
+
+MESSAGES = 250
+KEEP_RECENT = 50
+BLOCK_SIZE = 40
+# pages don't line up with the blocks, most of them start or end inside one
+PER_PAGE = 17
+
+
+class ArchiveCompressionTest(unittest.TestCase):
+    def test_round_trip(self):
+        created_at = datetime(2025, 1, 1, 12, 30, 15, 123456)
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "request_id": uuid.uuid4(),
+                "sender_type": SenderType.user,
+                "content": "question",
+                "extra_metadata": None,
+                "created_at": created_at,
+                "updated_at": created_at,
+            },
+            {
+                "id": uuid.uuid4(),
+                "request_id": None,
+                "sender_type": SenderType.master_agent,
+                "content": "answer",
+                "extra_metadata": {"files": [{"id": "1"}], "done": True},
+                "created_at": created_at + timedelta(seconds=1),
+                "updated_at": created_at + timedelta(seconds=2),
+            },
+        ]
+
+        messages = decompress_messages(compress_messages(rows))
+
+        self.assertEqual([vars(m) for m in messages], rows)
+        self.assertEqual(messages[1].key, (rows[1]["created_at"], rows[1]["id"]))
+
+    def test_empty_block(self):
+        self.assertEqual(decompress_messages(compress_messages([])), [])
+
+
+@unittest.skipUnless(os.environ.get("DATABASE_TESTS"), "DATABASE_TESTS is not set")
+class ChatArchivePaginationTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.user_id = uuid.uuid4()
+        self.session_id = uuid.uuid4()
+        started_at = datetime(2025, 1, 1)
+        # plain values, the rows are expired once they are committed
+        self.messages = [
+            {
+                "id": uuid.uuid4(),
+                "request_id": uuid.uuid4(),
+                "conversation_id": self.session_id,
+                "sender_type": SenderType.user,
+                "content": f"message {i}",
+                "created_at": started_at + timedelta(seconds=i),
+                "updated_at": started_at + timedelta(seconds=i),
+            }
+            for i in range(MESSAGES)
+        ]
+        self.contents = [m["content"] for m in self.messages]
+        # history pages are newest first
+        self.expected = self.contents[::-1]
+
+        async with async_session() as db:
+            db.add(
+                User(id=self.user_id, username=f"archive_{self.user_id}", password="")
+            )
+            db.add(
+                ChatConversation(
+                    session_id=self.session_id, title="archive", creator_id=self.user_id
+                )
+            )
+            await db.flush()
+            db.add_all(ChatMessage(**m) for m in self.messages)
+            await db.commit()
+
+        self.unarchived = await self._walk_older()
+        async with async_session() as db:
+            self.archived = await chat_archive_repo.archive_conversation(
+                db,
+                conversation_id=self.session_id,
+                keep_recent=KEEP_RECENT,
+                block_size=BLOCK_SIZE,
+            )
+
+    async def asyncTearDown(self):
+        async with async_session() as db:
+            # chats, messages and archived blocks are removed with the user
+            await db.execute(delete(User).where(User.id == self.user_id))
+            await db.commit()
+        await engine.dispose()
+
+    async def _page(self, cursor=None, offset=0, per_page=PER_PAGE) -> dict:
+        async with async_session() as db:
+            return await chat_repo.get_paginated_chat_history(
+                db=db,
+                user_id=self.user_id,
+                session_id=self.session_id,
+                per_page=per_page,
+                cursor=cursor,
+                # skips the context cache, the pages come from the paginator
+                with_total_count=True,
+                offset=offset,
+            )
+
+    async def _walk_older(self) -> list[dict]:
+        pages, cursor = [], None
+        while True:
+            page = await self._page(cursor)
+            pages.append(page)
+            cursor = page["next_cursor"]
+            if not cursor:
+                return pages
+
+    @staticmethod
+    def _contents(pages: list[dict]) -> list[str]:
+        return [m.content for page in pages for m in page["items"]]
+
+    def test_messages_are_archived(self):
+        self.assertEqual(self.archived, MESSAGES - KEEP_RECENT)
+        self.assertEqual(self._contents(self.unarchived), self.expected)
+
+    async def test_next_pages(self):
+        pages = await self._walk_older()
+
+        self.assertEqual(self._contents(pages), self.expected)
+        self.assertEqual(len(pages), len(self.unarchived))
+        for page in pages:
+            self.assertEqual(page["total_count"], MESSAGES)
+
+    async def test_previous_pages(self):
+        pages = await self._walk_older()
+
+        # back from the oldest page, through the archive into the hot rows
+        walked_back = pages[-1:]
+        cursor = pages[-1]["previous_cursor"]
+        while cursor:
+            page = await self._page(cursor)
+            walked_back.insert(0, page)
+            cursor = page["previous_cursor"]
+
+        self.assertEqual(self._contents(walked_back), self.expected)
+
+    async def test_offset(self):
+        for offset in (0, KEEP_RECENT - 5, KEEP_RECENT, KEEP_RECENT + 60, MESSAGES):
+            with self.subTest(offset=offset):
+                page = await self._page(offset=offset, per_page=10)
+                self.assertEqual(
+                    [m.content for m in page["items"]],
+                    self.expected[offset : offset + 10],
+                )
+
+    async def test_read_messages_inside_blocks(self):
+        boundary = self.messages[100]["created_at"], self.messages[100]["id"]
+        async with async_session() as db:
+            older = await chat_archive_repo.read_messages(
+                db,
+                conversation_id=self.session_id,
+                user_id=self.user_id,
+                boundary=boundary,
+                older=True,
+                limit=BLOCK_SIZE,
+            )
+            newer = await chat_archive_repo.read_messages(
+                db,
+                conversation_id=self.session_id,
+                user_id=self.user_id,
+                boundary=boundary,
+                older=False,
+                limit=BLOCK_SIZE,
+            )
+            # the archive holds the oldest messages only, newer ones stay hot
+            unbounded = await chat_archive_repo.read_messages(
+                db,
+                conversation_id=self.session_id,
+                user_id=self.user_id,
+                older=False,
+            )
+
+        self.assertEqual(
+            [m.content for m in older],
+            self.contents[100 - BLOCK_SIZE : 100][::-1],
+        )
+        self.assertEqual(
+            [m.content for m in newer],
+            self.contents[101 : 101 + BLOCK_SIZE],
+        )
+        self.assertEqual(
+            [m.content for m in unbounded],
+            self.contents[: self.archived],
+        )
+
+    async def test_archive_of_another_user(self):
+        async with async_session() as db:
+            messages = await chat_archive_repo.read_messages(
+                db, conversation_id=self.session_id, user_id=uuid.uuid4()
+            )
+            count = await chat_archive_repo.count_messages(
+                db, conversation_id=self.session_id, user_id=uuid.uuid4()
+            )
+
+        self.assertEqual(messages, [])
+        self.assertEqual(count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import asyncio
+import unittest
+
+from src.utils.event_dispatcher import BatchCoalescer, KeyedDispatcher
+
+
+class KeyedDispatcherTest(unittest.IsolatedAsyncioTestCase):
+    async def test_events_of_a_key_run_in_order(self):
+        dispatcher = KeyedDispatcher(max_concurrency=10)
+        handled = {"a": [], "b": []}
+
+        def handler(key: str, i: int):
+            async def handle():
+                # earlier events take longer, a concurrent run would reorder them
+                await asyncio.sleep(0.01 * (5 - i))
+                handled[key].append(i)
+
+            return handle
+
+        for i in range(5):
+            dispatcher.submit("a", handler("a", i))
+            dispatcher.submit("b", handler("b", i))
+        await dispatcher.join()
+
+        self.assertEqual(handled, {"a": [0, 1, 2, 3, 4], "b": [0, 1, 2, 3, 4]})
+
+    async def test_failed_event_doesnt_stop_its_key(self):
+        dispatcher = KeyedDispatcher(max_concurrency=1)
+        handled = []
+
+        async def fail():
+            raise ValueError("invalid event")
+
+        async def handle():
+            handled.append("handled")
+
+        with self.assertLogs("src.utils.event_dispatcher", "ERROR") as logs:
+            dispatcher.submit("a", fail)
+            dispatcher.submit("a", handle)
+            await dispatcher.join()
+
+        self.assertEqual(handled, ["handled"])
+        self.assertIn("invalid event", logs.output[0])
+
+    async def test_max_concurrency(self):
+        dispatcher = KeyedDispatcher(max_concurrency=2)
+        running, max_running, handled = 0, 0, 0
+
+        async def handle():
+            nonlocal running, max_running, handled
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            handled += 1
+
+        for i in range(6):
+            dispatcher.submit(str(i), handle)
+        await dispatcher.join()
+
+        self.assertEqual(max_running, 2)
+        self.assertEqual(handled, 6)
+
+
+class BatchCoalescerTest(unittest.IsolatedAsyncioTestCase):
+    def coalescer(self, max_size: int, window: float) -> BatchCoalescer[int]:
+        self.batches: list[list[int]] = []
+
+        async def process(items: list[int]):
+            self.batches.append(items)
+
+        return BatchCoalescer(process=process, max_size=max_size, window=window)
+
+    async def test_full_batch_is_flushed_right_away(self):
+        coalescer = self.coalescer(max_size=3, window=60)
+
+        await asyncio.wait_for(
+            asyncio.gather(*(coalescer.submit(i) for i in range(3))), timeout=1
+        )
+
+        self.assertEqual(self.batches, [[0, 1, 2]])
+
+    async def test_batch_is_flushed_after_the_window(self):
+        coalescer = self.coalescer(max_size=100, window=0.05)
+
+        await asyncio.gather(coalescer.submit(0), coalescer.submit(1))
+        # the first batch is gone, a later item starts the next one
+        await coalescer.submit(2)
+
+        self.assertEqual(self.batches, [[0, 1], [2]])
+
+    async def test_exception_reaches_every_submitter(self):
+        error = ValueError("batch failed")
+
+        async def process(items: list[int]):
+            raise error
+
+        coalescer = BatchCoalescer(process=process, max_size=100, window=0.01)
+
+        results = await asyncio.gather(
+            *(coalescer.submit(i) for i in range(3)), return_exceptions=True
+        )
+
+        self.assertEqual(results, [error, error, error])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Bulk log loading against the configured Postgres, only runs when DATABASE_TESTS is
+set:
+
+    DATABASE_TESTS=1 python -m unittest tests.test_log_copy
+"""
+
+import os
+import unittest
+import uuid
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from src.db.session import async_session, engine
+from src.models import Log
+from src.repositories.log import log_repo
+from src.schemas.ws.log import LogEntry
+
+
+@unittest.skipUnless(os.environ.get("DATABASE_TESTS"), "DATABASE_TESTS is not set")
+class LogCopyTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.session_id = str(uuid.uuid4())
+
+    async def asyncTearDown(self):
+        async with async_session() as db:
+            await db.execute(delete(Log).where(Log.session_id == self.session_id))
+            await db.commit()
+        await engine.dispose()
+
+    def _entry(self, message: str) -> LogEntry:
+        now = datetime.now()
+        return LogEntry(
+            session_id=self.session_id,
+            request_id=str(uuid.uuid4()),
+            agent_id="agent",
+            log_level="info",
+            message=message,
+            created_at=now,
+            updated_at=now,
+        )
+
+    async def _stored_messages(self) -> list[str]:
+        async with async_session() as db:
+            q = await db.scalars(
+                select(Log.message)
+                .where(Log.session_id == self.session_id)
+                .order_by(Log.message)
+            )
+            return list(q.all())
+
+    async def test_copy_many(self):
+        logs = [self._entry(f"log {i}") for i in range(3)]
+        async with async_session() as db:
+            self.assertEqual(await log_repo.copy_many(db=db, logs=logs), 3)
+
+        self.assertEqual(await self._stored_messages(), ["log 0", "log 1", "log 2"])
+
+    async def test_copy_many_drops_only_invalid_rows(self):
+        # Postgres text can't hold NUL, the whole COPY is rejected
+        logs = [self._entry("log 0"), self._entry("invalid \x00 log")]
+        logs += [self._entry(f"log {i}") for i in range(1, 3)]
+        async with async_session() as db:
+            self.assertEqual(await log_repo.copy_many(db=db, logs=logs), 3)
+
+        self.assertEqual(await self._stored_messages(), ["log 0", "log 1", "log 2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
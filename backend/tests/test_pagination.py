@@ -0,0 +1,58 @@
+import unittest
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from src.models import Agent, Log
+from src.utils.enums import CursorDirection
+from src.utils.pagination import CursorPaginator, encode_cursor
+
+
+def paginator(model, cursor: str) -> CursorPaginator:
+    return CursorPaginator(
+        None,
+        select(model),
+        10,
+        cursor,
+        created_at_column=model.created_at,
+        id_column=model.id,
+    )
+
+
+class CursorBoundaryTest(unittest.TestCase):
+    created_at = datetime(2025, 1, 1)
+
+    def test_id_has_the_type_of_the_id_column(self):
+        agent_id = uuid4()
+        cursor = encode_cursor(self.created_at, agent_id, CursorDirection.next)
+        self.assertEqual(
+            paginator(Agent, cursor)._boundary(), (self.created_at, agent_id)
+        )
+
+        cursor = encode_cursor(self.created_at, 42, CursorDirection.next)
+        self.assertEqual(paginator(Log, cursor)._boundary(), (self.created_at, 42))
+
+    def test_malformed_id_is_rejected(self):
+        for model, id_ in ((Agent, "1"), (Agent, "not a uuid"), (Log, "abc")):
+            cursor = encode_cursor(self.created_at, id_, CursorDirection.next)
+            with self.subTest(model=model.__name__, id_=id_):
+                with self.assertRaises(HTTPException) as e:
+                    paginator(model, cursor)._boundary()
+                self.assertEqual(e.exception.status_code, 400)
+
+    def test_boundary_is_bound_as_uuid(self):
+        agent_id = uuid4()
+        cursor = encode_cursor(self.created_at, agent_id, CursorDirection.next)
+        query = paginator(Agent, cursor)._build_query(CursorDirection.next)
+
+        bound = [
+            value
+            for value in query.compile().params.values()
+            if isinstance(value, UUID)
+        ]
+        self.assertEqual(bound, [agent_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
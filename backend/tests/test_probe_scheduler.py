@@ -0,0 +1,32 @@
+import unittest
+from datetime import datetime
+
+from src.utils.probe_scheduler import ProbeResult, ProbeScheduler, ProbeTarget
+
+
+class ProbeSchedulerBackoffTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = ProbeScheduler(
+            interval=60, max_backoff=3600, jitter=0.2, concurrency=1, timeout=1
+        )
+
+    def test_backoff_grows_with_failures(self):
+        self.assertLessEqual(self.scheduler.backoff(1), 60 * 1.2)
+        self.assertGreaterEqual(self.scheduler.backoff(3), 240 * 0.8)
+
+    def test_backoff_is_capped(self):
+        for failures in (20, 1025, 10_000, 10**9):
+            self.assertEqual(self.scheduler.backoff(failures), 3600)
+
+    def test_collect_updates_with_many_failures(self):
+        target = ProbeTarget(id="1", url="http://mcp", is_active=False, failures=5000)
+        _, states = self.scheduler.collect_updates([(target, ProbeResult(ok=False))])
+
+        [(state, ids)] = states
+        self.assertEqual(ids, ["1"])
+        self.assertEqual(state["probe_failures"], 5001)
+        self.assertGreater(state["next_probe_at"], datetime.now())
+
+
+if __name__ == "__main__":
+    unittest.main()
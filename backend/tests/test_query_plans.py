@@ -0,0 +1,309 @@
+"""
+Query plan regression suite.
+
+Seeds a large dataset (10k agents, 1M chat messages, ...) into the configured
+Postgres and runs the hot repository queries under EXPLAIN, a plan falling back to a
+sequential scan of a seeded table fails the test. The statements are the ones the
+repository methods issue, recorded by a session that doesn't run them. Everything is
+written in one transaction that is rolled back at the end, the database is left as
+it was.
+
+Seeding takes a while, the suite only runs when QUERY_PLAN_TESTS is set:
+
+    QUERY_PLAN_TESTS=1 python -m unittest tests.test_query_plans
+"""
+
+import json
+import os
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import Executable
+from src.db.session import engine
+from src.repositories.a2a import a2a_repo
+from src.repositories.agent import agent_repo
+from src.repositories.chat import chat_repo
+from src.repositories.files import files_repo
+from src.repositories.mcp import mcp_repo
+from src.utils.enums import CursorDirection
+from src.utils.pagination import encode_cursor
+
+USERS = 100
+AGENTS_PER_USER = 100
+MCP_SERVERS_PER_USER = 20
+TOOLS_PER_MCP_SERVER = 10
+A2A_CARDS_PER_USER = 20
+CHATS_PER_USER = 100
+MESSAGES_PER_CHAT = 100
+FILES_PER_USER = 1000
+
+SEEDED_TABLES = {
+    "agents",
+    "mcpservers",
+    "mcptools",
+    "a2acards",
+    "chatconversations",
+    "chatmessages",
+    "files",
+}
+
+SEED_STATEMENTS = [
+    """
+    CREATE TEMP TABLE qp_users ON COMMIT DROP AS
+    SELECT gen_random_uuid() AS id, n FROM generate_series(1, :users) n
+    """,
+    """
+    INSERT INTO users (id, username, password)
+    SELECT id, 'query_plans_' || id, 'not a hash' FROM qp_users
+    """,
+    """
+    INSERT INTO agents (
+        id, alias, name, description, jwt, creator_id, input_parameters, is_active,
+        created_at
+    )
+    SELECT
+        gen_random_uuid(), 'qp_' || u.n || '_' || i, 'agent ' || i, 'Seeded agent',
+        'jwt_' || u.id || '_' || i, u.id, '{}', i % 5 <> 0,
+        now() - make_interval(secs => i)
+    FROM qp_users u, generate_series(1, :agents_per_user) i
+    """,
+    """
+    INSERT INTO mcpservers (id, server_url, creator_id, is_active, created_at)
+    SELECT
+        gen_random_uuid(), 'http://mcp-' || i || '.example.com/mcp', u.id,
+        i % 5 <> 0, now() - make_interval(secs => i)
+    FROM qp_users u, generate_series(1, :mcp_servers_per_user) i
+    """,
+    """
+    INSERT INTO mcptools (id, name, "inputSchema", mcp_server_id)
+    SELECT gen_random_uuid(), 'tool_' || i, '{"type": "object"}', s.id
+    FROM mcpservers s
+    JOIN qp_users u ON u.id = s.creator_id, generate_series(1, :tools_per_mcp_server) i
+    """,
+    """
+    INSERT INTO a2acards (
+        id, server_url, card_content, is_active, creator_id, created_at
+    )
+    SELECT
+        gen_random_uuid(), 'http://a2a-' || i || '.example.com', '{}', i % 5 <> 0,
+        u.id, now() - make_interval(secs => i)
+    FROM qp_users u, generate_series(1, :a2a_cards_per_user) i
+    """,
+    """
+    CREATE TEMP TABLE qp_chats ON COMMIT DROP AS
+    SELECT gen_random_uuid() AS session_id, u.id AS creator_id, i
+    FROM qp_users u, generate_series(1, :chats_per_user) i
+    """,
+    """
+    INSERT INTO chatconversations (session_id, title, creator_id, created_at)
+    SELECT session_id, 'chat ' || i, creator_id, now() - make_interval(secs => i)
+    FROM qp_chats
+    """,
+    """
+    INSERT INTO chatmessages (
+        id, request_id, sender_type, content, conversation_id, created_at
+    )
+    SELECT
+        gen_random_uuid(), gen_random_uuid(), 'user', 'message ' || m, c.session_id,
+        now() - make_interval(secs => m)
+    FROM qp_chats c, generate_series(1, :messages_per_chat) m
+    """,
+    """
+    INSERT INTO files (
+        id, session_id, request_id, creator_id, mimetype, original_name,
+        internal_name, internal_id, from_agent, created_at
+    )
+    SELECT
+        gen_random_uuid(), gen_random_uuid(), gen_random_uuid(), u.id, 'text/plain',
+        'file_' || i || '.txt', 'file_' || i, gen_random_uuid(), false,
+        now() - make_interval(secs => i)
+    FROM qp_users u, generate_series(1, :files_per_user) i
+    """,
+]
+
+PARAMS_QUERY = """
+SELECT
+    u.id AS user_id,
+    (SELECT session_id FROM qp_chats WHERE creator_id = u.id LIMIT 1) AS session_id,
+    (SELECT request_id FROM files WHERE creator_id = u.id LIMIT 1) AS request_id
+FROM qp_users u
+LIMIT 1
+"""
+
+MAX_ID = "ffffffff-ffff-ffff-ffff-ffffffffffff"
+
+
+class _NoRows:
+    """Result of a recorded statement, shaped like both `Result` and `ScalarResult`"""
+
+    def scalars(self) -> "_NoRows":
+        return self
+
+    def all(self) -> list:
+        return []
+
+    def fetchall(self) -> list:
+        return []
+
+    def first(self) -> None:
+        return None
+
+    def __iter__(self):
+        return iter(())
+
+
+class RecordingSession:
+    """
+    Stands in for the `AsyncSession` of a repository call, the statements are
+    recorded instead of being run and none of them returns rows.
+    """
+
+    def __init__(self):
+        self.statements: list[Executable] = []
+
+    def _record(self, statement: Executable, params: dict | None) -> None:
+        # raw text statements are executed with their parameters separately
+        if params:
+            statement = statement.bindparams(**params)
+        self.statements.append(statement)
+
+    async def execute(self, statement: Executable, params: dict | None = None):
+        self._record(statement, params)
+        return _NoRows()
+
+    async def scalars(self, statement: Executable, params: dict | None = None):
+        self._record(statement, params)
+        return _NoRows()
+
+    async def scalar(self, statement: Executable, params: dict | None = None):
+        self._record(statement, params)
+        return None
+
+
+RepositoryCall = Callable[[RecordingSession, dict[str, Any]], Awaitable[Any]]
+
+
+def _first_page_cursor() -> str:
+    """Cursor past the newest rows, so paginated queries filter by their key"""
+    return encode_cursor(datetime.now(), MAX_ID, CursorDirection.next)
+
+
+def _user(params: dict[str, Any]) -> SimpleNamespace:
+    return SimpleNamespace(id=params["user_id"])
+
+
+# repository methods serving the hot listings, see backend/src/repositories
+QUERIES: dict[str, RepositoryCall] = {
+    "active agents": lambda db, p: agent_repo.query_active_agents(
+        db=db, user_id=p["user_id"], limit=100, offset=0
+    ),
+    "agents page by user": lambda db, p: agent_repo.get_page_by_user(
+        db=db, user_model=_user(p), per_page=100, cursor=_first_page_cursor()
+    ),
+    "active mcp servers": lambda db, p: mcp_repo.list_active_mcp_servers(
+        db=db, user_id=p["user_id"], limit=100, offset=0
+    ),
+    "active mcp tools page": lambda db, p: mcp_repo.get_all_mcp_tools_of_all_servers(
+        db=db, user_model=_user(p), limit=100, offset=0
+    ),
+    "active a2a cards": lambda db, p: a2a_repo.list_active_cards(
+        db=db, user_id=p["user_id"], limit=100, offset=0, version=0
+    ),
+    "active catalog": lambda db, p: agent_repo.query_all_platform_agents(
+        db=db, user_id=p["user_id"], offset=0, limit=100
+    ),
+    "chats page": lambda db, p: chat_repo.list_chats(
+        db=db, user_model=_user(p), limit=100
+    ),
+    "chat history page": lambda db, p: chat_repo.get_paginated_chat_history(
+        db=db,
+        user_id=p["user_id"],
+        session_id=p["session_id"],
+        per_page=100,
+        cursor=_first_page_cursor(),
+    ),
+    "files by request": lambda db, p: files_repo.list_files_by_request_id(
+        db=db, request_id=p["request_id"], user_model=_user(p)
+    ),
+    "files page by user": lambda db, p: files_repo.get_files_metadata_by_user(
+        db=db, user_model=_user(p), limit=100
+    ),
+}
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+async def _explain(conn: AsyncConnection, statement: Executable) -> dict:
+    sql = statement.compile(
+        dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+@unittest.skipUnless(os.environ.get("QUERY_PLAN_TESTS"), "QUERY_PLAN_TESTS is not set")
+class QueryPlanTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.conn = await engine.connect()
+        self.transaction = await self.conn.begin()
+        for statement in SEED_STATEMENTS:
+            await self.conn.execute(
+                text(statement),
+                {
+                    "users": USERS,
+                    "agents_per_user": AGENTS_PER_USER,
+                    "mcp_servers_per_user": MCP_SERVERS_PER_USER,
+                    "tools_per_mcp_server": TOOLS_PER_MCP_SERVER,
+                    "a2a_cards_per_user": A2A_CARDS_PER_USER,
+                    "chats_per_user": CHATS_PER_USER,
+                    "messages_per_chat": MESSAGES_PER_CHAT,
+                    "files_per_user": FILES_PER_USER,
+                },
+            )
+        # fresh statistics, the planner would otherwise still see empty tables
+        for table in sorted(SEEDED_TABLES):
+            await self.conn.execute(text(f"ANALYZE {table}"))
+        self.params = dict(
+            (await self.conn.execute(text(PARAMS_QUERY))).mappings().one()
+        )
+
+    async def asyncTearDown(self):
+        await self.transaction.rollback()
+        await self.conn.close()
+        await engine.dispose()
+
+    async def test_queries_have_no_seq_scan(self):
+        for query_name, call in QUERIES.items():
+            with self.subTest(query_name):
+                db = RecordingSession()
+                await call(db, self.params)
+                self.assertTrue(db.statements, f"'{query_name}' issued no statement")
+
+                for statement in db.statements:
+                    plan = await _explain(self.conn, statement)
+                    seq_scans = [
+                        node["Relation Name"]
+                        for node in _plan_nodes(plan)
+                        if node["Node Type"] == "Seq Scan"
+                        and node["Relation Name"] in SEEDED_TABLES
+                    ]
+                    self.assertFalse(
+                        seq_scans,
+                        f"'{query_name}' scans {seq_scans} sequentially:\n"
+                        f"{statement}\n{json.dumps(plan, indent=2)}",
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
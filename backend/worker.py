@@ -0,0 +1,32 @@
+import asyncio
+import logging
+import signal
+
+from src.utils.job_runner import job_runner
+from src.utils.jobs import register_shared_jobs
+from src.utils.setup_logger import init_logging
+
+init_logging()
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    """
+    Standalone jobs worker, for deployments that set JOBS_RUN_IN_BACKEND=false to
+    keep the shared jobs out of the backend processes.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    register_shared_jobs(job_runner)
+    await job_runner.start()
+    logger.info("Jobs worker started")
+    await stop.wait()
+    await job_runner.stop()
+    logger.info("Jobs worker stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -29,6 +29,7 @@ const FilePreviewCard: FC<FilePreviewCardProps> = ({
 }) => {
   const { clientId, id, name, type, loading, fromAgent } = fileData;
   const [fileUrl, setFileUrl] = useState<string | null>(null);
+  const [fileUrlExpiresAt, setFileUrlExpiresAt] = useState(0);
   const [isLoading, setIsLoading] = useState(false);
   const [metaData, setMetadata] = useState<{
     from_agent: boolean;
@@ -50,9 +51,10 @@ const FilePreviewCard: FC<FilePreviewCardProps> = ({
           const metadata = await fileService.getFileMetadata(id);
           setMetadata(metadata);
 
-          // Then get the file content
+          // Then get a direct link to the file content
           const response = await fileService.downloadFile(id);
           setFileUrl(response.url);
+          setFileUrlExpiresAt(response.expiresAt);
         } catch (error) {
           // Remove line 59: console.error('Failed to load file:', error);
         } finally {
@@ -62,28 +64,34 @@ const FilePreviewCard: FC<FilePreviewCardProps> = ({
     };
 
     loadFile();
-
-    return () => {
-      if (fileUrl) {
-        URL.revokeObjectURL(fileUrl);
-      }
-    };
   }, [id]);
 
+  // the direct link expires, a preview failing after that gets a fresh one
+  const refreshFileUrl = async (element: HTMLElement) => {
+    if (!id || Date.now() / 1000 < fileUrlExpiresAt) {
+      // Fallback to file icon if the preview fails to load
+      element.style.display = 'none';
+      return;
+    }
+    try {
+      const response = await fileService.downloadFile(id);
+      setFileUrl(response.url);
+      setFileUrlExpiresAt(response.expiresAt);
+    } catch (error) {
+      element.style.display = 'none';
+    }
+  };
+
   const handleDownload = async () => {
     if (id) {
       try {
-        const { url } = await fileService.downloadFile(id);
+        // served as an attachment, saved under the original file name
+        const { url } = await fileService.downloadFile(id, true);
         const a = document.createElement('a');
         a.href = url;
-        a.download = extractFileName(
-          metaData?.original_name || metaData?.internal_name,
-        );
         document.body.appendChild(a);
         a.click();
-        window.URL.revokeObjectURL(url);
         a.remove();
-        setFileUrl(url);
       } catch (error) {
         // Remove line 88: console.error('Failed to download file:', error);
       }
@@ -107,8 +115,7 @@ const FilePreviewCard: FC<FilePreviewCardProps> = ({
           className="absolute inset-0 w-full h-full object-cover"
           onError={e => {
             // Remove line 109: console.error('Failed to load image:', e);
-            // Fallback to file icon if image fails to load
-            e.currentTarget.style.display = 'none';
+            refreshFileUrl(e.currentTarget);
           }}
         />
       );
@@ -121,10 +128,7 @@ const FilePreviewCard: FC<FilePreviewCardProps> = ({
           className="absolute inset-0 w-full h-full object-cover"
           muted
           playsInline
-          onError={e => {
-            // Fallback to file icon if video fails to load
-            e.currentTarget.style.display = 'none';
-          }}
+          onError={e => refreshFileUrl(e.currentTarget)}
         />
       );
     }
@@ -137,7 +141,7 @@ const FilePreviewCard: FC<FilePreviewCardProps> = ({
         </span>
       </>
     );
-  }, [fileUrl, loading, isLoading, name, metaData]);
+  }, [fileUrl, fileUrlExpiresAt, loading, isLoading, name, metaData]);
 
   const formatFileSize = (bytes: number) => {
     if (bytes === 0) return '0 Bytes';
@@ -1,6 +1,4 @@
 import { apiService } from './apiService';
-import { environment } from '../common/environment';
-import { tokenService } from './apiService';
 
 export interface FileMetadata {
   id: string;
@@ -42,28 +40,22 @@ export const fileService = {
     return response.data.id;
   },
 
-  async downloadFile(fileId: string): Promise<{ url: string; fileId: string }> {
-    const token = tokenService.getToken();
-    const response = await fetch(`${environment.apiBaseUrl}/files/${fileId}`, {
-      method: 'GET',
-      headers: {
-        Authorization: `Bearer ${token}`,
-      },
-    });
-
-    if (!response.ok) {
-      throw new Error(`HTTP error! status: ${response.status}`);
-    }
-
-    // Get the blob
-    const blob = await response.blob();
-
-    // Create a download link
-    const url = window.URL.createObjectURL(blob);
+  async downloadFile(
+    fileId: string,
+    attachment = false,
+  ): Promise<{ url: string; fileId: string; expiresAt: number }> {
+    // short lived direct link, the content is fetched straight from the storage.
+    // the link is cross origin, browsers ignore the download attribute for it so an
+    // attachment link is requested to save the file under its name
+    const response = await apiService.get<{ url: string; expires_at: number }>(
+      `/files/${fileId}/url`,
+      { params: { attachment: String(attachment) } },
+    );
 
     return {
-      url,
+      url: response.data.url,
       fileId,
+      expiresAt: response.data.expires_at,
     };
   },
 
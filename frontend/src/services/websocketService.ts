@@ -4,6 +4,37 @@ import { authService } from './authService';
 // Message types
 export interface UserMessage {
   message: string;
+  // echoed back as client_request_id, matches the responses of this message when
+  // several requests are in flight
+  client_request_id?: string;
+  // final answer arrives in agent_response_chunk frames before the agent_response
+  stream?: boolean;
+}
+
+export interface AgentResponseChunk {
+  type: 'agent_response_chunk';
+  request_id: string;
+  client_request_id: string | null;
+  session_id: string;
+  chunk: string;
+  // text received so far for the request is not the final answer
+  reset: boolean;
+}
+
+export interface AgentTraceEvent {
+  type: 'agent_trace_event';
+  request_id: string;
+  client_request_id: string | null;
+  session_id: string;
+  event: {
+    step_id: string;
+    step: string;
+    name: string;
+    args_digest: string | null;
+    status: 'started' | 'finished';
+    is_success: boolean | null;
+    latency: number | null;
+  };
 }
 
 export interface AgentResponse {
@@ -97,6 +128,7 @@ export interface AgentResponse {
       is_success: boolean;
     };
     request_id: string;
+    client_request_id: string | null;
     session_id: string;
     files: Array<{
       id: string;
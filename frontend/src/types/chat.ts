@@ -6,7 +6,9 @@ export interface IChat {
 }
 
 export interface ChatHistory {
-  total_count: number;
+  total_count: number | null;
+  next_cursor: string | null;
+  previous_cursor: string | null;
   items: {
     content: string;
     sender_type: string;
@@ -13,6 +13,7 @@ from models.enums import Nodes
 from models.exceptions import UnknownAgentTypeException
 from models.states import MasterAgentState
 from utils.common import filter_and_order_by_ids, remove_last_underscore_segment
+from utils.tracing import trace_step
 
 
 class BaseMasterAgent(ABC):
@@ -37,6 +38,7 @@ class BaseMasterAgent(ABC):
     async def execute_agent(self, state: MasterAgentState, config: RunnableConfig):
         """
         Calls remote agent selected by Supervisor using AIConnector library.
+        The call is reported to `on_trace` from the config, if any.
         """
         from connectors.entities import AgentTypeEnum, GenAIConfig, GenAIFlowConfig, MCPConfig, A2AConfig
         from connectors.factory import ConnectorFactory
@@ -48,74 +50,78 @@ class BaseMasterAgent(ABC):
         agent_to_execute = [agent for agent in self.agents if agent["name"] == agent_name][0]
         agent_type = agent_to_execute["type"]
 
-        try:
-            if agent_type == AgentTypeEnum.gen_ai.value:
-                agent_config = GenAIConfig(
-                    id=agent_to_execute.get("id"),
-                    name=remove_last_underscore_segment(agent_name),
-                    arguments=agent_call["args"],
-                    session=config.get("configurable", {}).get("session")
+        on_trace = config.get("configurable", {}).get("on_trace")
+        async with trace_step(on_trace, step=Nodes.execute_agent.value, name=agent_name, args=agent_call["args"]) as step:
+            try:
+                if agent_type == AgentTypeEnum.gen_ai.value:
+                    agent_config = GenAIConfig(
+                        id=agent_to_execute.get("id"),
+                        name=remove_last_underscore_segment(agent_name),
+                        arguments=agent_call["args"],
+                        session=config.get("configurable", {}).get("session")
+                    )
+                elif agent_type == AgentTypeEnum.flow.value:
+                    agent_config = GenAIFlowConfig(
+                        id=agent_to_execute.get("id"),
+                        name=remove_last_underscore_segment(agent_name),
+                        agents=filter_and_order_by_ids(
+                            ids=agent_to_execute.get("flow", []),
+                            items=self.agents
+                        ),
+                        model=self.model,
+                        messages=messages[:-1].copy(),  # exclude last AI message
+                        session=config.get("configurable", {}).get("session")
+                    )
+                elif agent_type == AgentTypeEnum.mcp.value:
+                    agent_config = MCPConfig(
+                        id=agent_to_execute.get("id"),
+                        name=remove_last_underscore_segment(agent_name),
+                        endpoint=agent_to_execute.get("url", ""),
+                        arguments=agent_call["args"]
+                    )
+                elif agent_type == AgentTypeEnum.a2a.value:
+                    agent_config = A2AConfig(
+                        id=agent_to_execute.get("id"),
+                        name=remove_last_underscore_segment(agent_name),
+                        endpoint=agent_to_execute.get("url"),
+                        task=agent_call["args"]["task"],
+                        text=agent_call["args"]["text"]
+                    )
+                else:
+                    raise UnknownAgentTypeException(f"Unknown agent type: {agent_type}")
+
+                connector = ConnectorFactory.get_connector(agent_config)
+
+                logger.info(f"Invoking {agent_name} ({agent_type}) with parameters: {agent_call["args"]}")
+                response, trace = await connector.invoke()
+                logger.success(f"Agent {agent_name} response: {response}")
+                step["is_success"] = trace.get("is_success", True)
+
+                agent_call_message = ToolMessage(
+                    content=json.dumps(response),
+                    name=agent_to_execute.get("name"),
+                    tool_call_id=agent_call["id"],
                 )
-            elif agent_type == AgentTypeEnum.flow.value:
-                agent_config = GenAIFlowConfig(
-                    id=agent_to_execute.get("id"),
-                    name=remove_last_underscore_segment(agent_name),
-                    agents=filter_and_order_by_ids(
-                        ids=agent_to_execute.get("flow", []),
-                        items=self.agents
+                return {"messages": [agent_call_message], "trace": [trace]}
+
+            except Exception as e:
+                error_message = f"Unexpected error while invoking {agent_name}: {e}"
+                logger.exception(error_message)
+                step["is_success"] = False
+
+                trace = {
+                    "name": "MasterAgent",
+                    "input": messages[-1].model_dump(),
+                    "output": error_message,
+                    "is_success": False
+                }
+                return {
+                    "messages": ToolMessage(
+                        content=error_message,
+                        name=agent_to_execute.get("name")
                     ),
-                    model=self.model,
-                    messages=messages[:-1].copy(),  # exclude last AI message
-                    session=config.get("configurable", {}).get("session")
-                )
-            elif agent_type == AgentTypeEnum.mcp.value:
-                agent_config = MCPConfig(
-                    id=agent_to_execute.get("id"),
-                    name=remove_last_underscore_segment(agent_name),
-                    endpoint=agent_to_execute.get("url", ""),
-                    arguments=agent_call["args"]
-                )
-            elif agent_type == AgentTypeEnum.a2a.value:
-                agent_config = A2AConfig(
-                    id=agent_to_execute.get("id"),
-                    name=remove_last_underscore_segment(agent_name),
-                    endpoint=agent_to_execute.get("url"),
-                    task=agent_call["args"]["task"],
-                    text=agent_call["args"]["text"]
-                )
-            else:
-                raise UnknownAgentTypeException(f"Unknown agent type: {agent_type}")
-
-            connector = ConnectorFactory.get_connector(agent_config)
-
-            logger.info(f"Invoking {agent_name} ({agent_type}) with parameters: {agent_call["args"]}")
-            response, trace = await connector.invoke()
-            logger.success(f"Agent {agent_name} response: {response}")
-
-            agent_call_message = ToolMessage(
-                content=json.dumps(response),
-                name=agent_to_execute.get("name"),
-                tool_call_id=agent_call["id"],
-            )
-            return {"messages": [agent_call_message], "trace": [trace]}
-
-        except Exception as e:
-            error_message = f"Unexpected error while invoking {agent_name}: {e}"
-            logger.exception(error_message)
-
-            trace = {
-                "name": "MasterAgent",
-                "input": messages[-1].model_dump(),
-                "output": error_message,
-                "is_success": False
-            }
-            return {
-                "messages": ToolMessage(
-                    content=error_message,
-                    name=agent_to_execute.get("name")
-                ),
-                "trace": [trace]
-            }
+                    "trace": [trace]
+                }
 
     @property
     def graph(self) -> CompiledStateGraph:
@@ -2,12 +2,14 @@ from typing import Any
 
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
 from loguru import logger
 
 from agents.base import BaseMasterAgent
+from models.enums import Nodes
 from models.states import MasterAgentState
 from utils.agents import select_agent_and_resolve_parameters
-from utils.tracing import trace_execution_time
+from utils.tracing import trace_execution_time, trace_step
 
 
 class ReActMasterAgent(BaseMasterAgent):
@@ -27,10 +29,12 @@ class ReActMasterAgent(BaseMasterAgent):
         super().__init__(model, agents)
         self._agents_to_bind_to_llm = [item["agent_schema"] for item in agents]
 
-    async def select_agent(self, state: MasterAgentState):
+    async def select_agent(self, state: MasterAgentState, config: RunnableConfig):
         """
         Selects agent/flow to execute, determine input parameters for the agent/flow.
         Acts as main supervisor node.
+        Tokens of the final answer are passed to `on_token` and the step is reported
+        to `on_trace` from the config, if any.
         """
         messages = state.messages
         trace = {
@@ -38,36 +42,40 @@ class ReActMasterAgent(BaseMasterAgent):
             "input": messages[-1].model_dump(),
         }
         logger.info("Selecting agent to execute")
+        configurable = config.get("configurable", {})
 
-        try:
-            async with trace_execution_time(trace=trace):
-                response = await select_agent_and_resolve_parameters(
-                    model=self.model,
-                    messages=messages,
-                    agents=self._agents_to_bind_to_llm
-                )
+        async with trace_step(configurable.get("on_trace"), step=Nodes.supervisor.value, name="MasterAgent") as step:
+            try:
+                async with trace_execution_time(trace=trace):
+                    response = await select_agent_and_resolve_parameters(
+                        model=self.model,
+                        messages=messages,
+                        agents=self._agents_to_bind_to_llm,
+                        on_token=configurable.get("on_token")
+                    )
 
-            if response.tool_calls:
-                logger.success(f"Selected {response.tool_calls[0]["name"]} with args {response.tool_calls[0]["args"]}")
-            else:
-                logger.success(f"No agent is selected, generating final response")
+                if response.tool_calls:
+                    logger.success(f"Selected {response.tool_calls[0]["name"]} with args {response.tool_calls[0]["args"]}")
+                else:
+                    logger.success(f"No agent is selected, generating final response")
 
-            trace.update(
-                {
-                    "output": response.model_dump(),
-                    "is_success": True
-                }
-            )
-            return {"messages": [response], "trace": [trace]}
+                trace.update(
+                    {
+                        "output": response.model_dump(),
+                        "is_success": True
+                    }
+                )
+                return {"messages": [response], "trace": [trace]}
 
-        except Exception as e:
-            error_message = f"Unexpected error while selecting agent: {e}"
-            logger.exception(error_message)
+            except Exception as e:
+                error_message = f"Unexpected error while selecting agent: {e}"
+                logger.exception(error_message)
+                step["is_success"] = False
 
-            trace = {
-                "name": "MasterAgent",
-                "input": messages[-1].model_dump(),
-                "output": error_message,
-                "is_success": False
-            }
-            return {"messages": [AIMessage(content=error_message)],"trace": [trace]}
+                trace = {
+                    "name": "MasterAgent",
+                    "input": messages[-1].model_dump(),
+                    "output": error_message,
+                    "is_success": False
+                }
+                return {"messages": [AIMessage(content=error_message)],"trace": [trace]}
@@ -1,4 +1,5 @@
 import asyncio
+import json
 from typing import Any, Optional
 
 from genai_session.session import GenAISession
@@ -16,6 +17,9 @@ from utils.common import attach_files_to_message
 
 app_settings = Settings()
 
+AGENT_RESPONSE_CHUNK = "agent_response_chunk"
+AGENT_TRACE_EVENT = "agent_trace_event"
+
 session = GenAISession(
     api_key=app_settings.MASTER_AGENT_API_KEY,
     ws_url=app_settings.ROUTER_WS_URL
@@ -29,11 +33,33 @@ async def receive_message(
         user_id: str,
         configs: dict[str, Any],
         files: Optional[list[dict[str, Any]]],
-        timestamp: str
+        timestamp: str,
+        request_id: Optional[str] = None,
+        stream: Optional[bool] = False
 ):
     try:
         graph_config = {"configurable": {"session": session}, "recursion_limit": 100}  # recursion_limit can be adjusted
 
+        if stream and request_id:
+            # final answer tokens and steps go out live, the full response still follows
+            async def send_chunk(chunk: str, reset: bool = False):
+                await agent_context.websocket.send(json.dumps({
+                    "message_type": AGENT_RESPONSE_CHUNK,
+                    "request_id": request_id,
+                    "chunk": chunk,
+                    "reset": reset
+                }))
+
+            async def send_trace_event(event: dict[str, Any]):
+                await agent_context.websocket.send(json.dumps({
+                    "message_type": AGENT_TRACE_EVENT,
+                    "request_id": request_id,
+                    "event": event
+                }))
+
+            graph_config["configurable"]["on_token"] = send_chunk
+            graph_config["configurable"]["on_trace"] = send_trace_event
+
         base_system_prompt = configs.get("system_prompt")
         user_system_prompt = configs.get("user_prompt")
 
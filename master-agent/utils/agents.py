@@ -1,33 +1,74 @@
-from typing import Any
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
 
 import httpx
 from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import BaseMessage, AIMessage
+from langchain_core.messages import BaseMessage, AIMessage, message_chunk_to_message
 
 from utils.common import bind_tools_safely
 
 
+# (url, agent_type, user_id) -> (etag, agents), most recently used last
+_agents_cache: OrderedDict[tuple[str, str, str], tuple[str, list[dict[str, Any]]]] = OrderedDict()
+AGENTS_CACHE_MAX_ENTRIES = 1024
+
+
 async def get_agents(url: str, agent_type: str, api_key: str, user_id: str):
+    key = (url, agent_type, str(user_id))
+    headers = {"X-API-KEY": api_key}
+    if cached := _agents_cache.get(key):
+        # unchanged agents are answered with 304 after a version check only
+        headers["If-None-Match"] = cached[0]
+
     async with httpx.AsyncClient() as client:
         response = await client.get(
             url,
-            headers={"X-API-KEY": api_key},
+            headers=headers,
             params={"agent_type": agent_type, "user_id": user_id},
         )
 
+        if response.status_code == 304 and cached:
+            _agents_cache.move_to_end(key)
+            return cached[1]
+
         response.raise_for_status()
-        agents = response.json()
+        agents = response.json()["active_connections"]
+
+    if etag := response.headers.get("etag"):
+        _agents_cache[key] = (etag, agents)
+        _agents_cache.move_to_end(key)
+        if len(_agents_cache) > AGENTS_CACHE_MAX_ENTRIES:
+            _agents_cache.popitem(last=False)
 
-    return agents["active_connections"]
+    return agents
 
 
 async def select_agent_and_resolve_parameters(
         model: BaseChatModel,
         messages: list[BaseMessage],
         agents: list[dict[str, Any]],
-        agent_choice: bool = False
+        agent_choice: bool = False,
+        on_token: Optional[Callable[..., Awaitable[None]]] = None
 ) -> AIMessage:
     model_with_agents = bind_tools_safely(model=model, tools=agents, tool_choice=agent_choice)
 
-    response = await model_with_agents.ainvoke(messages)
-    return response
+    if not on_token:
+        response = await model_with_agents.ainvoke(messages)
+        return response
+
+    response, streamed = None, False
+    async for chunk in model_with_agents.astream(messages):
+        response = chunk if response is None else response + chunk
+
+        # text of a message that calls an agent is not a part of the final answer
+        if response.tool_call_chunks:
+            if streamed:
+                await on_token("", reset=True)
+                streamed = False
+            continue
+
+        if isinstance(chunk.content, str) and chunk.content:
+            await on_token(chunk.content)
+            streamed = True
+
+    return message_chunk_to_message(response)
@@ -1,6 +1,11 @@
+import hashlib
+import json
 import time
 from contextlib import asynccontextmanager
-from typing import Any
+from typing import Any, Awaitable, Callable, Optional
+from uuid import uuid4
+
+from loguru import logger
 
 
 @asynccontextmanager
@@ -11,3 +16,62 @@ async def trace_execution_time(trace: dict[str, Any]):
     finally:
         end = time.perf_counter()
         trace["execution_time"] = end - start
+
+
+def args_digest(args: Any) -> Optional[str]:
+    if args is None:
+        return None
+    return hashlib.sha256(
+        json.dumps(args, sort_keys=True, default=str).encode()
+    ).hexdigest()[:16]
+
+
+async def _emit(
+    on_trace: Callable[[dict[str, Any]], Awaitable[None]], event: dict[str, Any]
+):
+    # live events are best effort, the run must not fail because of them
+    try:
+        await on_trace(event)
+    except Exception as e:
+        logger.warning(f"Could not send trace event: {e}")
+
+
+@asynccontextmanager
+async def trace_step(
+    on_trace: Optional[Callable[[dict[str, Any]], Awaitable[None]]],
+    step: str,
+    name: str,
+    args: Any = None,
+):
+    """
+    Reports a graph step to `on_trace` when it starts and when it finishes, with its latency.
+    The yielded dict is sent with the finish event, steps set `is_success` to False on handled errors.
+    """
+    result = {"is_success": True}
+    if not on_trace:
+        yield result
+        return
+
+    event = {
+        "step_id": uuid4().hex,
+        "step": step,
+        "name": name,
+        "args_digest": args_digest(args),
+    }
+    await _emit(on_trace, {**event, "status": "started"})
+    start = time.perf_counter()
+    try:
+        yield result
+    except Exception:
+        result["is_success"] = False
+        raise
+    finally:
+        await _emit(
+            on_trace,
+            {
+                **event,
+                **result,
+                "status": "finished",
+                "latency": time.perf_counter() - start,
+            },
+        )
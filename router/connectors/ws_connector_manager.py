@@ -2,7 +2,7 @@ import json
 import logging
 import jwt
 
-from typing import Dict
+from typing import Dict, Tuple
 
 from fastapi import WebSocket
 from settings import get_settings
@@ -28,6 +28,8 @@ class WSConnectionManager:
         Initializes the WebSocket connection manager with an empty active connections dictionary.
         """
         self.active_connections: Dict[str, WebSocket] = {}
+        # (invoked agent, request_id) -> invoker, routes live chunks and trace events
+        self.stream_routes: Dict[Tuple[str, str], str] = {}
 
     async def process_message(
         self, client_id: str, message: str, agent_jwt: str
@@ -132,8 +134,23 @@ class WSConnectionManager:
                         await self.send_message(agent_uuid, payload)
                     else:
                         data["invoked_by"] = client_id
+                        if request_id := (data.get("request_metadata") or {}).get(
+                            "request_id"
+                        ):
+                            self.stream_routes[(agent_uuid, request_id)] = client_id
                         await self.send_message(agent_uuid, data)
 
+            elif message_type in (
+                WSMessageType.AGENT_RESPONSE_CHUNK.value,
+                WSMessageType.AGENT_TRACE_EVENT.value,
+            ):
+                # live progress of a request, the final response still arrives as agent_response
+                if invoked_by := self.stream_routes.get(
+                    (client_id, data.get("request_id"))
+                ):
+                    data["message_type"] = message_type
+                    await self.send_message(invoked_by, data)
+
             elif message_type == WSMessageType.AGENT_LOG.value:
                 await self.send_message(
                     client_id=MasterServerName.MASTER_SERVER_BE.value,
@@ -212,6 +229,11 @@ class WSConnectionManager:
             return
 
         del self.active_connections[client_id]
+        self.stream_routes = {
+            key: invoked_by
+            for key, invoked_by in self.stream_routes.items()
+            if invoked_by != client_id
+        }
 
         if not client_id.startswith(
             app_settings.MASTER_BE_API_KEY
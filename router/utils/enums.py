@@ -6,6 +6,8 @@ class WSMessageType(Enum):
     AGENT_UNREGISTER = "agent_unregister"
     AGENT_INVOKE = "agent_invoke"
     AGENT_RESPONSE = "agent_response"
+    AGENT_RESPONSE_CHUNK = "agent_response_chunk"
+    AGENT_TRACE_EVENT = "agent_trace_event"
     AGENT_ERROR = "agent_error"
     AGENT_LOG = "agent_log"
     ML_INVOKE = "ml_invoke"
@@ -0,0 +1,159 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from tests.http_client.AsyncHTTPClient import AsyncHTTPClient
+
+CHATS = "/api/chats"
+CHAT = "/api/chat"
+
+MESSAGES_AMOUNT = 7
+
+http_client = AsyncHTTPClient(timeout=10)
+
+
+async def create_chat(user_jwt_token: str, title: str = "Cursor test") -> str:
+    session_id = str(uuid.uuid4())
+    await http_client.post(
+        path=CHATS,
+        json={"session_id": session_id, "title": title},
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+    )
+    return session_id
+
+
+async def insert_messages(
+    async_db_engine: AsyncEngine, session_id: str, amount: int
+) -> list[str]:
+    """Messages one second apart, returned newest first as the history is paginated"""
+    created_at = datetime(2025, 1, 1)
+    async with async_db_engine.begin() as conn:
+        for i in range(amount):
+            await conn.execute(
+                text(
+                    """
+                    INSERT INTO chatmessages (
+                        id, request_id, sender_type, content, conversation_id,
+                        created_at, updated_at
+                    )
+                    VALUES (
+                        :id, :request_id, 'user', :content, :session_id,
+                        :created_at, :created_at
+                    )
+                    """
+                ),
+                {
+                    "id": uuid.uuid4(),
+                    "request_id": uuid.uuid4(),
+                    "content": f"message {i}",
+                    "session_id": uuid.UUID(session_id),
+                    "created_at": created_at + timedelta(seconds=i),
+                },
+            )
+    return [f"message {i}" for i in reversed(range(amount))]
+
+
+async def get_history(user_jwt_token: str, session_id: str, **params) -> dict:
+    return await http_client.get(
+        path=CHAT,
+        params={"session_id": session_id, **params},
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+    )
+
+
+def contents(page: dict) -> list[str]:
+    return [message["content"] for message in page["items"]]
+
+
+@pytest.mark.asyncio
+async def test_chat_history_walks_pages_by_cursor(
+    user_jwt_token: str, async_db_engine: AsyncEngine
+):
+    session_id = await create_chat(user_jwt_token)
+    expected = await insert_messages(async_db_engine, session_id, MESSAGES_AMOUNT)
+
+    seen, pages, cursor = [], [], None
+    while True:
+        params = {"per_page": 3}
+        if cursor:
+            params["cursor"] = cursor
+        page = await get_history(user_jwt_token, session_id, **params)
+        pages.append(page)
+        seen += contents(page)
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == expected, "Pages don't cover the history newest first"
+    assert [len(page["items"]) for page in pages] == [3, 3, 1]
+    assert pages[0]["previous_cursor"] is None
+
+    previous = await get_history(
+        user_jwt_token, session_id, per_page=3, cursor=pages[-1]["previous_cursor"]
+    )
+    assert contents(previous) == contents(pages[1]), "Invalid previous page"
+
+
+@pytest.mark.asyncio
+async def test_chat_history_total_count_and_deprecated_page(
+    user_jwt_token: str, async_db_engine: AsyncEngine
+):
+    session_id = await create_chat(user_jwt_token)
+    expected = await insert_messages(async_db_engine, session_id, MESSAGES_AMOUNT)
+
+    first = await get_history(
+        user_jwt_token, session_id, per_page=3, with_total_count="true"
+    )
+    assert first["total_count"] == MESSAGES_AMOUNT
+    assert contents(first) == expected[:3]
+
+    second = await get_history(user_jwt_token, session_id, per_page=3, page=2)
+    assert contents(second) == expected[3:6], "Page number isn't honoured"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "cursor",
+    ["not a cursor", "WyIyMDI1LTAxLTAxVDAwOjAwOjAwIiwiMSIsIm5leHQiXQ"],
+    ids=["undecodable cursor", "cursor with a non uuid id"],
+)
+async def test_chat_history_invalid_cursor(
+    cursor: str, user_jwt_token: str, async_db_engine: AsyncEngine
+):
+    session_id = await create_chat(user_jwt_token)
+    await insert_messages(async_db_engine, session_id, MESSAGES_AMOUNT)
+
+    response = await http_client.get(
+        path=CHAT,
+        params={"session_id": session_id, "per_page": 3, "cursor": cursor},
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+        expected_status_codes=[400],
+    )
+    assert response == {"detail": "Invalid pagination cursor"}
+
+
+@pytest.mark.asyncio
+async def test_chats_walk_pages_by_cursor(user_jwt_token: str):
+    created = [await create_chat(user_jwt_token, title=f"Chat {i}") for i in range(3)]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = await http_client.get(
+            path=CHATS,
+            params=params,
+            headers={"Authorization": f"Bearer {user_jwt_token}"},
+        )
+        assert len(page["chats"]) <= 2
+        seen += [chat["session_id"] for chat in page["chats"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert sorted(seen) == sorted(created), "Pages don't cover all chats"
+    assert len(seen) == len(set(seen)), "Chat listed on more than one page"
@@ -17,6 +17,7 @@ from reportlab.lib.pagesizes import letter
 from PIL import Image, ImageDraw, ImageFont
 from tests.http_client.AsyncHTTPClient import AsyncHTTPClient
 from tests.constants import TEST_FILES_FOLDER
+from tests.utils import stored_file_metadata
 from pathlib import Path
 
 FILES = "/files"
@@ -564,10 +565,11 @@ async def test_files_file_id_metadata_get(
         "request_id": None,
         "original_name": original_name,
         "mimetype": mime_type,
-        "internal_id": file_id,
-        "internal_name": f"{file_id}.{file_extension}",
         "from_agent": False,
         "creator_id": await get_user(user_jwt_token),
+        **stored_file_metadata(
+            content=await read_test_file(filename), extension=f".{file_extension}"
+        ),
     }
 
     assert file_metadata == expected_file_metadata, "Received invalid metadata"
@@ -0,0 +1,141 @@
+from typing import Awaitable, Callable
+
+import pytest
+
+from tests.http_client.AsyncHTTPClient import AsyncHTTPClient
+from tests.utils import stored_file_metadata
+
+UPLOADS = "/files/uploads"
+UPLOAD_ID = "/files/uploads/{upload_id}"
+
+CONTENT = b"Resumable upload test file\n" * 1_000
+FIRST_CHUNK_SIZE = 10_000
+
+http_client = AsyncHTTPClient(timeout=10)
+
+
+async def create_upload(user_jwt_token: str, size: int) -> dict:
+    response = await http_client.request(
+        "POST",
+        UPLOADS,
+        json={"original_name": "resumable.txt", "mimetype": "text/plain", "size": size},
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+        expected_status_codes=[201],
+    )
+    return await response.json()
+
+
+async def put_chunk(
+    user_jwt_token: str,
+    upload_id: str,
+    offset: int,
+    chunk: bytes,
+    expected_status_codes: list[int] = [200],
+) -> dict:
+    response = await http_client.request(
+        "PUT",
+        UPLOAD_ID.format(upload_id=upload_id),
+        params={"offset": offset},
+        data=chunk,
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+        expected_status_codes=expected_status_codes,
+    )
+    return await response.json()
+
+
+@pytest.mark.asyncio
+async def test_files_uploads_in_chunks(
+    user_jwt_token: str, get_user: Callable[[str], Awaitable[str]]
+):
+    upload = await create_upload(user_jwt_token, size=len(CONTENT))
+    upload_id = upload["id"]
+    assert upload["offset"] == 0
+
+    status = await put_chunk(user_jwt_token, upload_id, 0, CONTENT[:FIRST_CHUNK_SIZE])
+    assert status["offset"] == FIRST_CHUNK_SIZE
+
+    # a client resuming after a lost response asks where to continue from
+    status = await http_client.get(
+        path=UPLOAD_ID.format(upload_id=upload_id),
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+    )
+    assert status["offset"] == FIRST_CHUNK_SIZE
+
+    status = await put_chunk(
+        user_jwt_token, upload_id, FIRST_CHUNK_SIZE, CONTENT[FIRST_CHUNK_SIZE:]
+    )
+    assert status["offset"] == len(CONTENT)
+
+    response = await http_client.request(
+        "POST",
+        f"{UPLOAD_ID.format(upload_id=upload_id)}/complete",
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+        expected_status_codes=[201],
+    )
+    file_id = (await response.json())["id"]
+
+    file_metadata = await http_client.get(
+        path=f"/files/{file_id}/metadata",
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+    )
+
+    expected_file_metadata = {
+        "id": file_id,
+        "session_id": None,
+        "request_id": None,
+        "original_name": "resumable.txt",
+        "mimetype": "text/plain",
+        "from_agent": False,
+        "creator_id": await get_user(user_jwt_token),
+        **stored_file_metadata(content=CONTENT, extension=".txt"),
+    }
+
+    assert file_metadata == expected_file_metadata, "Received invalid metadata"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "offset",
+    [0, FIRST_CHUNK_SIZE + 1],
+    ids=["chunk sent twice", "chunk past the received bytes"],
+)
+async def test_files_uploads_offset_conflict(offset: int, user_jwt_token: str):
+    upload = await create_upload(user_jwt_token, size=len(CONTENT))
+    upload_id = upload["id"]
+    await put_chunk(user_jwt_token, upload_id, 0, CONTENT[:FIRST_CHUNK_SIZE])
+
+    response = await put_chunk(
+        user_jwt_token,
+        upload_id,
+        offset,
+        CONTENT[offset:],
+        expected_status_codes=[409],
+    )
+
+    assert response == {
+        "detail": f"Upload {upload_id} expects the next chunk at offset {FIRST_CHUNK_SIZE}"  # noqa: E501
+    }
+
+    status = await http_client.get(
+        path=UPLOAD_ID.format(upload_id=upload_id),
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+    )
+    assert status["offset"] == FIRST_CHUNK_SIZE, "Rejected chunk moved the offset"
+
+
+@pytest.mark.asyncio
+async def test_files_uploads_complete_incomplete_upload(user_jwt_token: str):
+    upload = await create_upload(user_jwt_token, size=len(CONTENT))
+    upload_id = upload["id"]
+    await put_chunk(user_jwt_token, upload_id, 0, CONTENT[:FIRST_CHUNK_SIZE])
+
+    response = await http_client.request(
+        "POST",
+        f"{UPLOAD_ID.format(upload_id=upload_id)}/complete",
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+        expected_status_codes=[409],
+    )
+
+    assert await response.json() == {
+        "detail": f"Upload {upload_id} is incomplete, received {FIRST_CHUNK_SIZE} of {len(CONTENT)} bytes"  # noqa: E501
+    }
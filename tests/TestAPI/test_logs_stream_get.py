@@ -0,0 +1,157 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from tests.http_client.AsyncHTTPClient import AsyncHTTPClient
+
+CHATS = "/api/chats"
+LOGS_STREAM = "/api/logs/stream"
+
+LOG_LEVELS = ["info", "error", "info", "warning", "info", "error"]
+FIRST_LOG_AT = datetime(2025, 1, 1)
+
+http_client = AsyncHTTPClient(timeout=10)
+
+
+async def insert_logs(async_db_engine: AsyncEngine, session_id: str) -> None:
+    """Logs one second apart, written without a creator as the ingestion does"""
+    async with async_db_engine.begin() as conn:
+        for i, log_level in enumerate(LOG_LEVELS):
+            await conn.execute(
+                text(
+                    """
+                    INSERT INTO logs (
+                        session_id, request_id, agent_id, message, log_level,
+                        created_at, updated_at
+                    )
+                    VALUES (
+                        :session_id, :request_id, :agent_id, :message, :log_level,
+                        :created_at, :created_at
+                    )
+                    """
+                ),
+                {
+                    "session_id": uuid.UUID(session_id),
+                    "request_id": uuid.uuid4(),
+                    "agent_id": str(uuid.uuid4()),
+                    "message": f"log {i}",
+                    "log_level": log_level,
+                    "created_at": FIRST_LOG_AT + timedelta(seconds=i),
+                },
+            )
+
+
+async def create_chat_with_logs(
+    user_jwt_token: str, async_db_engine: AsyncEngine
+) -> str:
+    session_id = str(uuid.uuid4())
+    await http_client.post(
+        path=CHATS,
+        json={"session_id": session_id, "title": "Log stream test"},
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+    )
+    await insert_logs(async_db_engine, session_id)
+    return session_id
+
+
+async def stream_logs(user_jwt_token: str, params: list[tuple]) -> list[dict]:
+    body = await http_client.get(
+        path=LOGS_STREAM,
+        params=params,
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+    )
+    return [json.loads(line) for line in body.splitlines() if line]
+
+
+@pytest.mark.asyncio
+async def test_logs_stream_all_logs_oldest_first(
+    user_jwt_token: str, async_db_engine: AsyncEngine
+):
+    session_id = await create_chat_with_logs(user_jwt_token, async_db_engine)
+
+    # batches smaller than the log set, the stream has to continue across them
+    entries = await stream_logs(
+        user_jwt_token, [("session_id", session_id), ("batch_size", 4)]
+    )
+
+    assert [entry["message"] for entry in entries] == [
+        f"log {i}" for i in range(len(LOG_LEVELS))
+    ]
+    assert all(entry["cursor"] for entry in entries), "Entry without a cursor"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "filters, expected_messages",
+    [
+        (
+            [("log_level", "error"), ("log_level", "warning")],
+            ["log 1", "log 3", "log 5"],
+        ),
+        (
+            [
+                ("since", (FIRST_LOG_AT + timedelta(seconds=2)).isoformat()),
+                ("until", (FIRST_LOG_AT + timedelta(seconds=4)).isoformat()),
+            ],
+            ["log 2", "log 3"],
+        ),
+    ],
+    ids=["filter by log levels", "filter by time range"],
+)
+async def test_logs_stream_filters(
+    filters: list[tuple],
+    expected_messages: list[str],
+    user_jwt_token: str,
+    async_db_engine: AsyncEngine,
+):
+    session_id = await create_chat_with_logs(user_jwt_token, async_db_engine)
+
+    entries = await stream_logs(user_jwt_token, [("session_id", session_id), *filters])
+
+    assert [entry["message"] for entry in entries] == expected_messages
+
+
+@pytest.mark.asyncio
+async def test_logs_stream_resumes_after_cursor(
+    user_jwt_token: str, async_db_engine: AsyncEngine
+):
+    session_id = await create_chat_with_logs(user_jwt_token, async_db_engine)
+    entries = await stream_logs(user_jwt_token, [("session_id", session_id)])
+
+    resumed = await stream_logs(
+        user_jwt_token, [("session_id", session_id), ("cursor", entries[2]["cursor"])]
+    )
+
+    assert resumed == entries[3:], "Stream didn't resume right after the cursor"
+
+
+@pytest.mark.asyncio
+async def test_logs_stream_skips_sessions_of_other_users(
+    user_jwt_token: str, async_db_engine: AsyncEngine
+):
+    # logs of a session without a chat of the user
+    session_id = str(uuid.uuid4())
+    await insert_logs(async_db_engine, session_id)
+
+    entries = await stream_logs(user_jwt_token, [("session_id", session_id)])
+
+    assert entries == []
+
+
+@pytest.mark.asyncio
+async def test_logs_stream_invalid_cursor(
+    user_jwt_token: str, async_db_engine: AsyncEngine
+):
+    session_id = await create_chat_with_logs(user_jwt_token, async_db_engine)
+
+    response = await http_client.get(
+        path=LOGS_STREAM,
+        params={"session_id": session_id, "cursor": "not a cursor"},
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+        expected_status_codes=[400],
+    )
+    assert response == {"detail": "Invalid pagination cursor"}
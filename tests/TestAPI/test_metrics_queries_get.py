@@ -0,0 +1,60 @@
+"""
+The X-DB-* headers are only sent by a backend running with
+QUERY_STATS_HEADERS_ENABLED=True.
+"""
+
+import pytest
+
+from tests.http_client.AsyncHTTPClient import AsyncHTTPClient
+
+CHATS = "/api/chats"
+QUERY_STATS = "/api/metrics/queries"
+
+QUERY_STATS_HEADERS = ("X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-N-Plus-One-Suspects")
+
+http_client = AsyncHTTPClient(timeout=10)
+
+
+async def get_scope_stats(user_jwt_token: str, name: str) -> dict:
+    stats = await http_client.get(
+        path=QUERY_STATS,
+        headers={"Authorization": f"Bearer {user_jwt_token}"},
+    )
+    scope = next((scope for scope in stats if scope["name"] == name), None)
+    return scope or {"calls": 0, "queries_total": 0}
+
+
+@pytest.mark.asyncio
+async def test_query_stats_headers(user_jwt_token: str):
+    response = await http_client.request(
+        "GET", CHATS, headers={"Authorization": f"Bearer {user_jwt_token}"}
+    )
+
+    missing = [
+        header for header in QUERY_STATS_HEADERS if header not in response.headers
+    ]
+    assert not missing, f"Response without the {missing} headers"
+
+    # at least the lookup of the authenticated user and the chats page
+    assert int(response.headers["X-DB-Query-Count"]) >= 2
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
+    assert response.headers["X-DB-N-Plus-One-Suspects"] == "0"
+
+
+@pytest.mark.asyncio
+async def test_query_stats_aggregated_per_route(user_jwt_token: str):
+    before = await get_scope_stats(user_jwt_token, f"GET {CHATS}")
+
+    query_counts = []
+    for _ in range(2):
+        response = await http_client.request(
+            "GET", CHATS, headers={"Authorization": f"Bearer {user_jwt_token}"}
+        )
+        query_counts.append(int(response.headers["X-DB-Query-Count"]))
+
+    after = await get_scope_stats(user_jwt_token, f"GET {CHATS}")
+
+    # the counters are global, other tests may call the route meanwhile
+    assert after["calls"] - before["calls"] >= 2
+    assert after["queries_total"] - before["queries_total"] >= sum(query_counts)
+    assert after["queries_max"] >= max(query_counts)
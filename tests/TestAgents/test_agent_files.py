@@ -26,6 +26,7 @@ from genai_session.utils.context import GenAIContext
 from tests.conftest import DummyAgent
 from tests.http_client.AsyncHTTPClient import AsyncHTTPClient
 from tests.constants import URI, TEST_FILES_FOLDER, WS_HEADERS, WS_MESSAGE
+from tests.utils import stored_file_metadata
 from pathlib import Path
 
 cwd = Path().cwd()
@@ -441,10 +442,12 @@ async def test_agent_get_file_metadata(
                     "request_id": None,
                     "original_name": original_name,
                     "mimetype": mimetype,
-                    "internal_id": file_id,
-                    "internal_name": f"{file_id}{file_extension}",
                     "from_agent": False,
                     "creator_id": await get_user(user_jwt_token),
+                    **stored_file_metadata(
+                        content=await read_test_file(filename),
+                        extension=file_extension,
+                    ),
                 },
                 "message_type": "agent_response",
             }
@@ -798,10 +801,11 @@ async def test_agent_save_file(
                     "request_id": request_id,
                     "original_name": original_name,
                     "mimetype": mimetype,
-                    "internal_id": file_id,
-                    "internal_name": f"{file_id}.{file_extension}",
                     "from_agent": True,
                     "creator_id": await get_user(user_jwt_token),
+                    **stored_file_metadata(
+                        content=content, extension=f".{file_extension}"
+                    ),
                 },
                 "message_type": "agent_response",
             }
@@ -302,6 +302,62 @@ class AsyncHTTPClient:
                 # logging.info(f"Response: {response_json}")
                 return response_json
 
+    async def request(
+        self,
+        method,
+        path,
+        params=None,
+        data=None,
+        json=None,
+        headers=None,
+        timeout=None,
+        expected_status_codes=[200],
+        **kwargs,
+    ):
+        """
+        Sends an HTTP request with any method, for tests that check the response status
+        or headers in addition to the body.
+
+        Args:
+            method (str): The HTTP method of the request.
+            path (str): The path for the request.
+            params (dict, optional): Query parameters to include in the URL. Defaults to None.
+            data (bytes, dict or str, optional): The request body. Defaults to None.
+            json (dict, optional): The JSON data to send in the request body. Defaults to None.
+            headers (dict, optional): Request-specific headers. Defaults to None.
+            timeout (int or float, optional): Request-specific timeout (in seconds). Defaults to None.
+            **kwargs: Additional keyword arguments to pass to the aiohttp.ClientSession.request() method.
+
+        Returns:
+            aiohttp.ClientResponse: The response object, its body is already read.
+        """
+        url = self._build_url(path)
+        merged_headers = self.headers.copy()
+        if headers:
+            merged_headers.update(headers)
+        req_timeout = timeout if timeout is not None else self.timeout
+
+        async with aiohttp.ClientSession() as session:
+            request_info = dict(url=url, params=params, headers=merged_headers)
+            logging.info(f"Sending '{method}': {request_info}")
+
+            async with session.request(
+                method,
+                url,
+                params=params,
+                data=data,
+                json=json,
+                headers=merged_headers,
+                timeout=req_timeout,
+                **kwargs,
+            ) as response:
+                # read before the connection is released, the body stays available
+                body = await response.read()
+                msg = f"Unexpected status code {response.status} received: {body!r}"
+                assert response.status in expected_status_codes, msg
+
+                return response
+
     async def upload_file(
         self,
         path,
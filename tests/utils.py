@@ -1,3 +1,4 @@
+import hashlib
 import random
 import string
 from datetime import datetime
@@ -78,3 +79,17 @@ def mcp_tool_to_json_schema(
     if not tool_dict.get("properties", {}):
         tool_dict["required"] = []
     return tool_dict
+
+
+def stored_file_metadata(content: bytes, extension: str) -> dict[str, Any]:
+    """
+    Metadata the backend derives from the content of an uploaded file, files are
+    stored by the sha256 of their content. `extension` includes the leading dot.
+    """
+    content_hash = hashlib.sha256(content).hexdigest()
+    return {
+        "internal_id": str(UUID(content_hash[:32])),
+        "internal_name": f"{content_hash}{extension}",
+        "content_hash": content_hash,
+        "size": len(content),
+    }